@@ -0,0 +1,8 @@
+"""
+Offline benchmarks of the pipeline's parsing and cleaning steps,
+run against hand-made pages/files mimicking the data providers' ones
+(or pages saved from the websites), e.g:
+    python -m benchmarks.bench_table_extraction
+or all of them, saving the results as JSON:
+    python -m benchmarks.run_benchmarks --output benchmark_results.json
+"""
@@ -0,0 +1,196 @@
+"""
+Benchmark of parsing the fbref pages the scrapers read: the previous
+BeautifulSoup parsing (html.parser, or lxml for match reports, with
+pd.read_html for the match report tables) against the single lxml parse
+and xpath extraction fb_ref now does. Both must extract the same data.
+
+Reports the CPU time per page of parsing and extracting, and the memory
+held per parsed document (BeautifulSoup object or lxml tree), measured as
+the growth of the resident set size of a forked process holding the
+parsed documents (Linux only, as it reads /proc/self/statm), which
+includes lxml's C allocations that tracemalloc can't see. e.g:
+    python -m benchmarks.bench_html_parsing
+"""
+
+import argparse
+import gc
+from io import StringIO
+import multiprocessing
+import os
+import statistics
+import time
+import typing
+from unittest import mock
+
+from bs4 import BeautifulSoup as bs
+import pandas as pd
+
+from football_pipeline import html_tables
+from football_pipeline.expected_goals import fb_ref
+from tests import fbref_pages
+
+SEASON_URL = "https://fbref.com/en/comps/9/schedule/Premier-League-Scores-and-Fixtures"
+MATCH_URL = "https://fbref.com/en/matches/00000000/Crystal-Palace-Arsenal"
+LEAGUE_URL = "https://fbref.com/en/comps/9/Premier-League-Stats"
+
+
+def _legacy_season_page(html: str) -> dict:
+    soup = bs(html, "html.parser")
+    header = [h2 for h2 in soup.find_all('h2') if 'Fixtures' in h2.text][0].span.text
+    return {
+        "is_current_season": not soup.find_all("a", href=True, string="Next Season"),
+        "header": header,
+        "match_level_urls": ["https://fbref.com" + div.a["href"]
+                             for div in soup.find_all(attrs={"data-stat": "score", "class": "center"})
+                             if div.a is not None],
+    }
+
+
+def _season_page(html: str) -> dict:
+    season = fb_ref.FBrefSeasonResultsPage(SEASON_URL, html=html)
+    return {
+        "is_current_season": season.is_current_season,
+        "header": season.html_tree.xpath(fb_ref.FIXTURES_HEADER_XPATH)[0].find(".//span").text_content(),
+        "match_level_urls": season.match_level_urls,
+    }
+
+
+def _legacy_match_report(html: str) -> dict:
+    match_soup = bs(html, "lxml")
+    all_match_tables = pd.read_html(StringIO(str(match_soup.find_all("table"))))
+    scorebox = match_soup.find_all(attrs={"class": "scorebox"})
+    scorebox_meta = match_soup.find_all(attrs={"class": "scorebox_meta"})
+    return {
+        "home_lineup": all_match_tables[0][:11].iloc[:, 1].values.tolist(),
+        "away_lineup": all_match_tables[1][:11].iloc[:, 1].values.tolist(),
+        "date": scorebox_meta[0].div.span["data-venue-date"],
+        "home_manager": scorebox[0].find_all(attrs={"class": "datapoint"})[0].text.replace("\xa0", " ").replace("Manager: ", ""),
+        "away_manager": scorebox[0].find_all(attrs={"class": "datapoint"})[2].text.replace("\xa0", " ").replace("Manager: ", ""),
+    }
+
+
+def _match_report(html: str) -> dict:
+    info = fb_ref.parse_match_report(MATCH_URL, html)
+    return {key: info[key] for key in ("home_lineup", "away_lineup", "date", "home_manager", "away_manager")}
+
+
+def _legacy_league_page(html: str) -> dict:
+    soup = bs(html, "html.parser")
+    league_table = soup.find('table')
+    return {
+        "team_name_map": {link['href'].split("/")[-1].replace("-Stats", ""): link.text.replace(" vs", "")
+                          for row in league_table.select('tbody tr')
+                          for link in row.find_all('a', href=True)
+                          if 'squads' in link['href']},
+        "team_squad_links": sorted({"https://fbref.com" + link['href']
+                                    for row in soup.select('tbody tr')
+                                    for link in row.find_all('a', href=True)
+                                    if 'squads' in link['href']}),
+    }
+
+
+def _league_page(html: str) -> dict:
+    with mock.patch.object(fb_ref, "_get_page", return_value=html), mock.patch("builtins.print"):
+        crawler = fb_ref.FbrefLeagueHomePageCrawler(LEAGUE_URL)
+    return {"team_name_map": crawler.team_name_map, "team_squad_links": sorted(crawler.team_squad_links)}
+
+
+def _rss_kb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+
+
+def _measure_memory(parse_document: typing.Callable, pages: typing.List[str], conn):
+    parse_document(pages[0])  # warm up, so one-off allocations aren't counted
+    gc.collect()
+    rss_before = _rss_kb()
+    # hold at least 50 documents, so small pages stand out from the allocator's noise
+    pages = pages * max(1, 50 // len(pages))
+    documents = [parse_document(html) for html in pages]  # noqa: F841, held until measured
+    conn.send((_rss_kb() - rss_before) / len(pages))
+
+
+def _memory_kb_per_page(parse_document: typing.Callable, pages: typing.List[str]) -> float:
+    """Growth of the resident set size per page, while holding every parsed document, in a forked process."""
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_measure_memory, args=(parse_document, pages, sender))
+    process.start()
+    kb_per_page = receiver.recv()
+    process.join()
+    return kb_per_page
+
+
+def _cpu_ms_per_page(parse: typing.Callable, pages: typing.List[str], repeat: int) -> float:
+    timings = []
+    for html in pages:
+        runs = []
+        for _ in range(repeat):
+            start = time.process_time()
+            parse(html)
+            runs.append(time.process_time() - start)
+        timings.append(min(runs))
+    return 1000 * statistics.mean(timings)
+
+
+def benchmark_pages(name: str, pages: typing.List[str], legacy_parse: typing.Callable, parse: typing.Callable,
+                    soup_features: str, repeat: int = 3) -> dict:
+    """
+    Time both parsers on each page, measure the memory of their parsed
+    documents and check they extract the same data.
+
+    Args:
+        name: name of the page type
+        pages: html of the pages
+        legacy_parse: the previous BeautifulSoup extraction
+        parse: fb_ref's extraction
+        soup_features: BeautifulSoup parser the previous extraction used for the page type
+        repeat: runs per page, the fastest is kept
+
+    Returns:
+        CPU milliseconds and memory KB per page of both parsers
+    """
+    for html in pages:
+        assert legacy_parse(html) == parse(html), f"{name}: the parsers extracted different data"
+    result = {
+        "pages": len(pages),
+        "page_kb": round(statistics.mean(len(html.encode("utf-8")) for html in pages) / 1024, 1),
+        "beautifulsoup_ms_per_page": round(_cpu_ms_per_page(legacy_parse, pages, repeat), 3),
+        "lxml_ms_per_page": round(_cpu_ms_per_page(parse, pages, repeat), 3),
+        "beautifulsoup_kb_per_page": round(_memory_kb_per_page(lambda html: bs(html, soup_features), pages), 1),
+        "lxml_kb_per_page": round(_memory_kb_per_page(html_tables.parse_html, pages), 1),
+    }
+    result["speedup"] = round(result["beautifulsoup_ms_per_page"] / result["lxml_ms_per_page"], 2)
+    print(f"{name:<14} {result['pages']:>3} pages of {result['page_kb']:>6} KB  "
+          f"beautifulsoup {result['beautifulsoup_ms_per_page']:>8.2f} ms {result['beautifulsoup_kb_per_page']:>8.0f} KB  "
+          f"lxml {result['lxml_ms_per_page']:>7.2f} ms {result['lxml_kb_per_page']:>7.0f} KB  x{result['speedup']}")
+    return result
+
+
+def run(repeat: int = 3) -> dict:
+    """
+    Run the parsing benchmark for each fbref page type.
+
+    Args:
+        repeat: runs per page, the fastest is kept
+
+    Returns:
+        results per page type
+    """
+    return {
+        "season_page": benchmark_pages(
+            "season_page", [fbref_pages.season_page(seed=seed) for seed in range(3)],
+            _legacy_season_page, _season_page, "html.parser", repeat),
+        "match_report": benchmark_pages(
+            "match_report", [fbref_pages.match_report(seed=seed) for seed in range(10)],
+            _legacy_match_report, _match_report, "lxml", repeat),
+        "league_page": benchmark_pages(
+            "league_page", [fbref_pages.league_stats_page(seed=seed) for seed in range(5)],
+            _legacy_league_page, _league_page, "html.parser", repeat),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per page, the fastest is kept")
+    run(repeat=parser.parse_args().repeat)
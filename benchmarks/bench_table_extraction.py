@@ -0,0 +1,129 @@
+"""
+Benchmark of the per-page CPU time of extracting the fbref tables the
+scrapers need: pd.read_html over every table of the page (the previous
+approach) against the targeted lxml extraction of football_pipeline.html_tables.
+Both must give identical DataFrames.
+
+Runs on the hand-made pages of tests.fbref_pages, or on saved match
+report pages (.html, or .html.gz as stored by the page cache), e.g:
+    python -m benchmarks.bench_table_extraction
+    python -m benchmarks.bench_table_extraction --match-reports /tmp/fbref_cache/pages
+"""
+
+import argparse
+import gzip
+from io import StringIO
+from pathlib import Path
+import statistics
+import time
+import typing
+
+from bs4 import BeautifulSoup as bs
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from football_pipeline import html_tables
+from football_pipeline.expected_goals import fb_ref
+from tests import fbref_pages
+
+
+def _read_saved_pages(directory: str) -> typing.List[str]:
+    pages = []
+    for path in sorted(Path(directory).rglob("*")):
+        if path.name.endswith(".html.gz"):
+            pages.append(gzip.decompress(path.read_bytes()).decode("utf-8"))
+        elif path.name.endswith(".html"):
+            pages.append(path.read_text(encoding="utf-8"))
+    return pages
+
+
+def _read_html_tables(soup: bs, indexes: typing.List[int]) -> typing.List[pd.DataFrame]:
+    """The previous approach: serialise every table of the page and parse them all with pd.read_html."""
+    all_tables = pd.read_html(StringIO(str(soup.find_all("table"))))
+    return [all_tables[i] for i in indexes]
+
+
+def _best_cpu_time(func: typing.Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        func()
+        timings.append(time.process_time() - start)
+    return min(timings)
+
+
+def benchmark_pages(name: str, pages: typing.List[str], soup_features: str, indexes: typing.List[int],
+                    targeted: typing.Callable, repeat: int = 3) -> dict:
+    """
+    Time both extractions on each page and check they give the same tables.
+
+    Args:
+        name: name of the page type
+        pages: html of the pages
+        soup_features: BeautifulSoup parser the scraper uses for the page type
+        indexes: positions of the needed tables in pd.read_html's output
+        targeted: extracts the needed tables from the page's lxml tree
+        repeat: runs per page, the fastest is kept
+
+    Returns:
+        mean milliseconds of CPU per page of both approaches and the speedup
+    """
+    read_html_ms, targeted_ms = [], []
+    for html in pages:
+        soup = bs(html, soup_features)
+        expected = _read_html_tables(soup, indexes)
+        actual = targeted(html_tables.parse_html(html))
+        assert len(expected) == len(actual), f"{name}: {len(actual)} tables extracted, expected {len(expected)}"
+        for expected_table, actual_table in zip(expected, actual):
+            assert_frame_equal(expected_table, actual_table)
+
+        read_html_ms.append(1000 * _best_cpu_time(lambda: _read_html_tables(soup, indexes), repeat))
+        targeted_ms.append(1000 * _best_cpu_time(lambda: targeted(html_tables.parse_html(html)), repeat))
+
+    result = {
+        "pages": len(pages),
+        "read_html_ms_per_page": round(statistics.mean(read_html_ms), 3),
+        "targeted_ms_per_page": round(statistics.mean(targeted_ms), 3),
+    }
+    result["speedup"] = round(result["read_html_ms_per_page"] / result["targeted_ms_per_page"], 2)
+    print(f"{name:<14} {result['pages']:>5} pages  pd.read_html {result['read_html_ms_per_page']:>8.2f} ms/page  "
+          f"targeted {result['targeted_ms_per_page']:>7.2f} ms/page  x{result['speedup']}")
+    return result
+
+
+def run(match_report_pages: typing.Optional[typing.List[str]] = None, repeat: int = 3) -> dict:
+    """
+    Run the table extraction benchmark for each fbref page type.
+
+    Args:
+        match_report_pages: html of saved match reports, defaults to hand-made ones
+        repeat: runs per page, the fastest is kept
+
+    Returns:
+        results per page type
+    """
+    if not match_report_pages:
+        match_report_pages = [fbref_pages.match_report(seed=seed) for seed in range(20)]
+    season_pages = [fbref_pages.season_page(), fbref_pages.season_page("2024-2025", current=True, n_played=100, n_fixtures=280)]
+    goal_log_pages = [fbref_pages.goal_log_page(seed=seed) for seed in range(10)]
+
+    return {
+        "match_report": benchmark_pages(
+            "match_report", match_report_pages, "lxml", [0, 1],
+            lambda tree: html_tables.read_tables(tree.xpath(fb_ref.LINEUP_TABLES_XPATH), limit=2), repeat),
+        "season_page": benchmark_pages(
+            "season_page", season_pages, "html.parser", [0],
+            lambda tree: [html_tables.read_first_table(tree, fb_ref.SCHEDULE_TABLE_XPATH)], repeat),
+        "goal_log_page": benchmark_pages(
+            "goal_log_page", goal_log_pages, "html.parser", [0, 1],
+            lambda tree: [html_tables.read_first_table(tree, fb_ref.GOALS_FOR_TABLE_XPATH),
+                          html_tables.read_first_table(tree, fb_ref.GOALS_AGAINST_TABLE_XPATH)], repeat),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--match-reports", help="directory of saved match report pages (.html or .html.gz)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per page, the fastest is kept")
+    args = parser.parse_args()
+    run(_read_saved_pages(args.match_reports) if args.match_reports else None, repeat=args.repeat)
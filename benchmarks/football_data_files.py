@@ -0,0 +1,91 @@
+"""
+Hand-made raw football-data.co.uk season files, with the quirks the
+cleaning has to handle: utf-8 files (with and without a BOM), Windows
+(cp1252) encoded files, excess comma delimiters in the header and data
+rows (a varying number of them per row, or only in the data rows), an
+unnamed column between the real ones, 'Surname, Forename' referee names,
+two and four digit years and the empty rows at the end of some files.
+
+They scale to any size, the real files recorded by
+benchmarks.record_fixtures are used alongside them when present.
+"""
+
+import random
+import typing
+
+TEAMS = [
+    "Alavés", "Athletic Club", "Atlético Madrid", "Barcelona", "Betis", "Celta", "Cádiz", "Espanyol",
+    "Getafe", "Girona", "Granada", "Las Palmas", "Leganés", "Mallorca", "Osasuna", "Real Madrid",
+    "Sevilla", "Sociedad", "Valencia", "Villarreal",
+]
+
+REFEREES = ["Mateu Lahoz", "Gil Manzano", "Martínez Munuera", "Hernández Hernández", "Sánchez Martínez"]
+
+MATCH_COLUMNS = ["Div", "Date", "Time", "HomeTeam", "AwayTeam", "FTHG", "FTAG", "FTR", "HTHG", "HTAG", "HTR", "Referee"]
+STAT_COLUMNS = ["HS", "AS", "HST", "AST", "HF", "AF", "HC", "AC", "HY", "AY", "HR", "AR"]
+# prices, some of them aren't kept by the cleaning
+PRICE_COLUMNS = [f"{bookmaker}{outcome}" for bookmaker in ["B365", "BW", "IW", "PS", "WH", "VC", "Max", "Avg", "Bb"]
+                 for outcome in ["H", "D", "A", "CH", "CD", "CA"]]
+
+
+def season_file(n_matches: int = 380, encoding: str = "utf-8", bom: bool = False, excess_commas: int = 0,
+                ragged_rows: bool = False, unnamed_column: bool = False, two_digit_years: bool = False,
+                comma_referees: bool = False, blank_rows: int = 0, seed: int = 0) -> bytes:
+    """
+    Raw season csv file.
+
+    Args:
+        n_matches: number of match rows
+        encoding: encoding of the file, e.g. 'utf-8' or 'cp1252'
+        bom: start the file with a utf-8 BOM
+        excess_commas: empty trailing fields on the header and every row
+        ragged_rows: give each data row between 0 and excess_commas + 3 empty trailing fields
+            instead, so some rows have more fields than the header
+        unnamed_column: an empty column name, with values, between the match and stats columns
+        two_digit_years: dates as dd/mm/yy, instead of dd/mm/yyyy
+        comma_referees: quoted 'Surname, Forename' referee names
+        blank_rows: rows of empty fields at the end of the file
+        seed: random seed of the generated results
+    """
+    rnd = random.Random(seed)
+    columns = MATCH_COLUMNS + [""] * unnamed_column + STAT_COLUMNS + PRICE_COLUMNS
+    trailing = "," * excess_commas
+    lines = [",".join(columns) + trailing]
+    for i in range(n_matches):
+        home, away = rnd.sample(TEAMS, 2)
+        home_goals, away_goals = rnd.randint(0, 4), rnd.randint(0, 3)
+        result = "H" if home_goals > away_goals else "A" if home_goals < away_goals else "D"
+        day, month = 1 + i % 28, 1 + (i // 28 + 7) % 12
+        year = 2023 if month >= 8 else 2024
+        date = f"{day:02d}/{month:02d}/{year % 100:02d}" if two_digit_years else f"{day:02d}/{month:02d}/{year}"
+        referee = rnd.choice(REFEREES)
+        if comma_referees:
+            forename, surname = referee.split(" ", 1)
+            referee = f'"{surname}, {forename}"'
+        values = ["SP1", date, f"{rnd.randint(12, 21)}:00", home, away, home_goals, away_goals, result,
+                  min(home_goals, 1), min(away_goals, 1), result, referee]
+        values += [rnd.randint(1, 9)] * unnamed_column
+        values += [rnd.randint(0, 20) for _ in STAT_COLUMNS]
+        values += [f"{rnd.uniform(1.1, 12):.2f}" for _ in PRICE_COLUMNS]
+        row_trailing = "," * rnd.randint(0, excess_commas + 3) if ragged_rows else trailing
+        lines.append(",".join(str(value) for value in values) + row_trailing)
+    lines += ["," * (len(columns) - 1) + trailing] * blank_rows
+    file_bytes = ("\r\n".join(lines) + "\r\n").encode(encoding)
+    return b"\xef\xbb\xbf" + file_bytes if bom else file_bytes
+
+
+def quirky_season_files() -> typing.Dict[str, bytes]:
+    """
+    One season file per known quirk, by file name.
+    """
+    return {
+        "utf8.csv": season_file(seed=0),
+        "utf8_bom.csv": season_file(bom=True, seed=1),
+        "cp1252.csv": season_file(encoding="cp1252", seed=2),
+        "excess_commas.csv": season_file(excess_commas=6, blank_rows=3, seed=3),
+        "cp1252_excess_commas.csv": season_file(encoding="cp1252", excess_commas=6, seed=4),
+        "ragged_excess_commas.csv": season_file(excess_commas=6, ragged_rows=True, blank_rows=3, seed=6),
+        "row_excess_commas.csv": season_file(ragged_rows=True, seed=7),
+        "unnamed_column.csv": season_file(unnamed_column=True, seed=8),
+        "two_digit_years_comma_referees.csv": season_file(two_digit_years=True, comma_referees=True, seed=5),
+    }
@@ -0,0 +1,182 @@
+"""
+Record real fbref.com pages and raw football-data.co.uk files into
+benchmarks/fixtures, gzipped, for the benchmarks to run on alongside the
+hand-made ones of tests.fbref_pages and benchmarks.football_data_files,
+which stay as the size-scaling extras.
+
+Requests go through the pipeline's own rate limited clients, and each
+recording is checked to still show what it's recorded for (e.g. a cp1252
+encoded file) before it's saved, trying the next candidate url otherwise.
+Run it from the repository root, with network access, and check in the
+files it writes:
+    python -m benchmarks.record_fixtures
+    python -m benchmarks.record_fixtures --only fbref --force
+"""
+
+import argparse
+import gzip
+import io
+from pathlib import Path
+import typing
+
+import pandas as pd
+
+from football_pipeline import html_tables
+from football_pipeline.expected_goals import fb_ref
+from football_pipeline.match_results import football_data_co_uk
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+FBREF_DIR = FIXTURES_DIR / "fbref"
+FOOTBALL_DATA_DIR = FIXTURES_DIR / "football_data"
+
+FOOTBALL_DATA_URL = "https://www.football-data.co.uk/mmz4281/{}"
+
+
+def _has_table(xpath: str) -> typing.Callable[[str], bool]:
+    return lambda html: bool(html_tables.parse_html(html).xpath(xpath))
+
+
+def _has_shootout_score(html: str) -> bool:
+    scores = html_tables.read_first_table(html_tables.parse_html(html), fb_ref.SCHEDULE_TABLE_XPATH)["Score"]
+    return fb_ref.parse_scores(scores.dropna())["home_penalties"].notna().any()
+
+
+def _has_squad_links(html: str) -> bool:
+    return bool(html_tables.parse_html(html).xpath('//tbody//tr//a[contains(@href, "/squads/")]'))
+
+
+def _is_utf8(file_bytes: bytes) -> bool:
+    return football_data_co_uk.detect_encoding(file_bytes).startswith("utf-8") and not _has_excess_commas(file_bytes)
+
+
+def _is_cp1252(file_bytes: bytes) -> bool:
+    return football_data_co_uk.detect_encoding(file_bytes) == "cp1252"
+
+
+def _has_excess_commas(file_bytes: bytes) -> bool:
+    encoding = football_data_co_uk.detect_encoding(file_bytes)
+    if football_data_co_uk.has_excess_delimiters(file_bytes.split(b"\n", 1)[0].decode(encoding).rstrip("\r")):
+        return True
+    try:
+        pd.read_csv(io.BytesIO(file_bytes), encoding=encoding)
+    except pd.errors.ParserError:
+        return True
+    return False
+
+
+# file name: (candidate urls, check of the recording)
+FBREF_RECORDINGS = {
+    "season_page-2022-2023-Premier-League.html.gz": (
+        ["https://fbref.com/en/comps/9/2022-2023/schedule/2022-2023-Premier-League-Scores-and-Fixtures"],
+        _has_table(fb_ref.SCHEDULE_TABLE_XPATH)),
+    "season_page-2023-Major-League-Soccer.html.gz": (
+        ["https://fbref.com/en/comps/22/2023/schedule/2023-Major-League-Soccer-Scores-and-Fixtures",
+         "https://fbref.com/en/comps/22/2022/schedule/2022-Major-League-Soccer-Scores-and-Fixtures"],
+        _has_shootout_score),
+    "match_report-Nottingham-Forest-Brentford.html.gz": (
+        ["https://fbref.com/en/matches/12251835/Nottingham-Forest-Brentford-November-5-2022-Premier-League"],
+        _has_table(fb_ref.LINEUP_TABLES_XPATH)),
+    "goal_log-2023-2024-West-Ham-United.html.gz": (
+        ["https://fbref.com/en/squads/7c21e445/2023-2024/goallogs/all_comps/West-Ham-United-Goal-Logs-All-Competitions"],
+        _has_table(fb_ref.GOALS_FOR_TABLE_XPATH)),
+    "league_stats-2022-2023-Premier-League.html.gz": (
+        ["https://fbref.com/en/comps/9/2022-2023/2022-2023-Premier-League-Stats"],
+        _has_squad_links),
+}
+
+FOOTBALL_DATA_RECORDINGS = {
+    "utf8-2324-E0.csv.gz": ([FOOTBALL_DATA_URL.format("2324/E0.csv")], _is_utf8),
+    "cp1252.csv.gz": (
+        [FOOTBALL_DATA_URL.format(path) for path in ["1718/SP1.csv", "1819/F1.csv", "0506/E0.csv", "0203/E0.csv"]],
+        _is_cp1252),
+    "excess_commas.csv.gz": (
+        [FOOTBALL_DATA_URL.format(path) for path in ["0405/E0.csv", "0304/E0.csv", "0102/E0.csv", "0001/E0.csv"]],
+        _has_excess_commas),
+}
+
+
+def _get_fbref_page(url: str) -> bytes:
+    response = fb_ref.http_client.get(url)
+    response.raise_for_status()
+    return response.content
+
+
+def _get_football_data_file(url: str) -> bytes:
+    response = football_data_co_uk.http_client.get(url)
+    response.raise_for_status()
+    return response.content
+
+
+def record(recordings: typing.Dict[str, typing.Tuple[typing.List[str], typing.Callable]], directory: Path,
+           get: typing.Callable[[str], bytes], decode: bool, force: bool = False) -> typing.List[str]:
+    """
+    Download and save the recordings, gzipped.
+
+    Args:
+        recordings: candidate urls and check of each file name
+        directory: directory the recordings are saved to
+        get: downloads the bytes of a url
+        decode: check the recording as decoded text (pages) rather than bytes (csv files)
+        force: record again the files already recorded
+
+    Returns:
+        file names that couldn't be recorded
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    failed = []
+    for file_name, (urls, check) in recordings.items():
+        path = directory / file_name
+        if path.exists() and not force:
+            continue
+        for url in urls:
+            try:
+                content = get(url)
+            except Exception as e:
+                print(f"Failed to download {url}: {e!r}")
+                continue
+            if check(content.decode("utf-8") if decode else content):
+                path.write_bytes(gzip.compress(content, mtime=0))
+                print(f"Recorded {url} to {path} ({len(content) / 1024:.0f} KB).")
+                break
+            print(f"{url} isn't a {file_name} recording, trying the next candidate.")
+        else:
+            failed.append(file_name)
+    return failed
+
+
+def missing_recordings() -> typing.List[Path]:
+    """Paths of the recordings that haven't been recorded (and checked in) yet."""
+    return [directory / file_name
+            for recordings, directory in [(FBREF_RECORDINGS, FBREF_DIR), (FOOTBALL_DATA_RECORDINGS, FOOTBALL_DATA_DIR)]
+            for file_name in recordings if not (directory / file_name).exists()]
+
+
+def read_recordings(directory: Path, prefix: str = "") -> typing.Dict[str, bytes]:
+    """
+    The checked in recordings of a directory.
+
+    Args:
+        directory: FBREF_DIR or FOOTBALL_DATA_DIR
+        prefix: only the recordings whose file name starts with it, e.g. 'match_report-'
+
+    Returns:
+        decompressed recordings by file name, without the .gz
+    """
+    return {path.name[:-len(".gz")]: gzip.decompress(path.read_bytes())
+            for path in sorted(directory.glob(f"{prefix}*.gz"))}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", choices=["fbref", "football-data"], help="only record the pages or the csv files")
+    parser.add_argument("--force", action="store_true", help="record again the files already recorded")
+    args = parser.parse_args()
+
+    not_recorded = []
+    if args.only != "football-data":
+        not_recorded += record(FBREF_RECORDINGS, FBREF_DIR, _get_fbref_page, decode=True, force=args.force)
+    if args.only != "fbref":
+        not_recorded += record(FOOTBALL_DATA_RECORDINGS, FOOTBALL_DATA_DIR, _get_football_data_file, decode=False,
+                               force=args.force)
+    for file_name in not_recorded:
+        print(f"Not recorded: {file_name}, add a candidate url showing its quirk.")
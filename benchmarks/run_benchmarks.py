@@ -0,0 +1,268 @@
+"""
+Offline benchmark suite of the pipeline's parsers and cleaners, run on
+the real fbref pages and raw football-data.co.uk files recorded in
+benchmarks/fixtures by benchmarks.record_fixtures, and on the hand-made
+ones of tests.fbref_pages and benchmarks.football_data_files, which
+scale to any size, with no network or AWS access (page fetches and s3
+reads are patched).
+
+Times, in CPU milliseconds per call (the fastest of the repeats):
+    - FBrefSeasonResultsPage.preprocess_fbref_xg_results
+    - extract_lineup_manaager_info and convert_to_df
+    - parse_goal_log (extract_and_load_goal_log's parsing)
+    - FbrefLeagueHomePageCrawler's reading of the league stats pages
+    - clean_raw_football_data_co_uk_csv_file, per file quirk
+checking each of their outputs, then runs the table extraction and html
+parsing benchmarks. The results are saved as JSON, and can be compared
+to a previous run's to catch regressions, e.g:
+    python -m benchmarks.run_benchmarks --output baseline.json
+    python -m benchmarks.run_benchmarks --output new.json --baseline baseline.json
+It fails when recordings are missing, unless --generated-only is passed.
+"""
+
+import argparse
+import datetime as dt
+import json
+import platform
+import sys
+import time
+import typing
+from unittest import mock
+
+import pandas as pd
+
+from benchmarks import bench_html_parsing, bench_table_extraction, football_data_files, record_fixtures
+from football_pipeline.expected_goals import fb_ref
+from football_pipeline.match_results import football_data_co_uk
+from tests import fbref_pages
+
+SEASON_URL = "https://fbref.com/en/comps/9/2022-2023/schedule/2022-2023-Premier-League-Scores-and-Fixtures"
+MATCH_URL = "https://fbref.com/en/matches/{:08x}/Crystal-Palace-Arsenal"
+LEAGUE_URL = "https://fbref.com/en/comps/9/Premier-League-Stats"
+RAW_BUCKET = "benchmark-raw-files"
+# timings compared to the baseline's, the others are the previous implementations
+COMPARED_TIMINGS = ("ms_per_call", "targeted_ms_per_page", "lxml_ms_per_page")
+
+
+def _best_cpu_ms(func: typing.Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        func()
+        timings.append(time.process_time() - start)
+    return 1000 * min(timings)
+
+
+def _result(name: str, timings: typing.List[float], **details) -> dict:
+    result = {"calls": len(timings), "ms_per_call": round(sum(timings) / len(timings), 3), **details}
+    print(f"{name:<56} {result['calls']:>3} calls  {result['ms_per_call']:>8.2f} ms/call")
+    return result
+
+
+def _recorded_pages(prefix: str) -> typing.List[str]:
+    """The recorded fbref pages of a kind, e.g. 'match_report-'."""
+    return [html.decode("utf-8") for html in record_fixtures.read_recordings(record_fixtures.FBREF_DIR, prefix).values()]
+
+
+def benchmark_preprocess_xg_results(repeat: int) -> dict:
+    """preprocess_fbref_xg_results of played, current and penalty shootout season pages."""
+    pages = [(html, None) for html in _recorded_pages("season_page-")]
+    pages += [
+        (fbref_pages.season_page(seed=0), 380),
+        (fbref_pages.season_page("2024-2025", current=True, n_played=100, n_fixtures=280, seed=1), 100),
+        (fbref_pages.season_page(seed=2).replace("1&ndash;1</a>", "(4) 1&ndash;1 (3)</a>"), 380),
+    ]
+    timings = []
+    for html, n_played in pages:
+        page = fb_ref.FBrefSeasonResultsPage(SEASON_URL, html=html)
+        page.html_tree  # parsed once by the scraper, not part of the preprocessing
+        df = page.preprocess_fbref_xg_results()
+        if n_played is None:  # recorded page
+            assert len(df), "preprocess_fbref_xg_results kept no played matches of a recorded page"
+        else:
+            assert len(df) == n_played, f"preprocess_fbref_xg_results kept {len(df)} of {n_played} played matches"
+        assert df["home_goals"].notna().all() and not df["score"].str.contains(r"\(").any()
+        timings.append(_best_cpu_ms(page.preprocess_fbref_xg_results, repeat))
+    return _result("preprocess_fbref_xg_results", timings)
+
+
+def benchmark_match_reports(match_report_pages: typing.List[str], repeat: int) -> typing.Dict[str, dict]:
+    """extract_lineup_manaager_info of the match reports, then convert_to_df of their messages."""
+    pages = {MATCH_URL.format(i): html for i, html in enumerate(match_report_pages)}
+    extract_timings, convert_timings = [], []
+    with mock.patch.object(fb_ref, "_get_page", side_effect=pages.__getitem__):
+        for url in pages:
+            info = fb_ref.extract_lineup_manaager_info(url)
+            assert len(info["home_lineup"]) >= 11 and len(info["away_lineup"]) >= 11, f"{url}: lineups too short"
+            extract_timings.append(_best_cpu_ms(lambda: fb_ref.extract_lineup_manaager_info(url), repeat))
+
+            message = {**info, "league": "Premier-League", "season_code": "2022-2023"}
+            assert len(fb_ref.convert_to_df(message)) >= 11
+            convert_timings.append(_best_cpu_ms(lambda: fb_ref.convert_to_df(message), repeat))
+    return {
+        "extract_lineup_manaager_info": _result("extract_lineup_manaager_info", extract_timings),
+        "convert_to_df": _result("convert_to_df", convert_timings),
+    }
+
+
+def benchmark_parse_goal_log(repeat: int) -> dict:
+    """parse_goal_log of goal log pages, including the early season ones without goals."""
+    pages = [(html, None) for html in _recorded_pages("goal_log-")]
+    pages += [(fbref_pages.goal_log_page(seed=seed), 50) for seed in range(8)]
+    pages += [(fbref_pages.goal_log_page(n_goals_for=0, seed=8), 20),
+              (fbref_pages.goal_log_page(n_goals_for=0, n_goals_against=0, seed=9), 0)]
+    timings = []
+    for html, n_goals in pages:
+        df = fb_ref.parse_goal_log(html)
+        assert df.columns.tolist() == fb_ref.GOAL_LOG_COLUMNS
+        assert len(df) == n_goals if n_goals is not None else len(df), f"parse_goal_log read {len(df)} goals"
+        timings.append(_best_cpu_ms(lambda: fb_ref.parse_goal_log(html), repeat))
+    return _result("parse_goal_log", timings)
+
+
+def benchmark_league_stats_pages(repeat: int) -> dict:
+    """FbrefLeagueHomePageCrawler's reading of the squads and season of league stats pages."""
+    pages = _recorded_pages("league_stats-") + [fbref_pages.league_stats_page(seed=seed) for seed in range(4)]
+    timings = []
+    for html in pages:
+        with mock.patch.object(fb_ref, "_get_page", return_value=html):
+            crawler = fb_ref.FbrefLeagueHomePageCrawler(LEAGUE_URL)
+            assert len(crawler.team_squad_links) >= 12, f"{len(crawler.team_squad_links)} squads found"
+            timings.append(_best_cpu_ms(lambda: fb_ref.FbrefLeagueHomePageCrawler(LEAGUE_URL), repeat))
+    return _result("FbrefLeagueHomePageCrawler", timings)
+
+
+def benchmark_clean_football_data_files(repeat: int) -> typing.Dict[str, dict]:
+    """clean_raw_football_data_co_uk_csv_file of a file of each known quirk, recorded and hand-made."""
+    recorded = {f"recorded/{file_name}": file_bytes for file_name, file_bytes
+                in record_fixtures.read_recordings(record_fixtures.FOOTBALL_DATA_DIR).items()}
+    files = {**recorded, **football_data_files.quirky_season_files()}
+    results = {}
+    with mock.patch.object(football_data_co_uk.s3_utils, "get_object_bytes",
+                           side_effect=lambda bucket_name, file_key: files[file_key]):
+        for file_name, file_bytes in files.items():
+            df = football_data_co_uk.clean_raw_football_data_co_uk_csv_file(RAW_BUCKET, file_name)
+            if file_name in recorded:
+                assert len(df) and df["HomeTeam"].notna().all(), f"{file_name}: {len(df)} matches cleaned"
+            else:
+                assert len(df) == 380, f"{file_name}: {len(df)} of 380 matches cleaned"
+                assert set(df["HomeTeam"]) <= set(football_data_files.TEAMS), f"{file_name}: team names decoded wrongly"
+                assert not df["Referee"].str.contains(",").any(), f"{file_name}: referee names not flipped"
+            assert set(df.columns) == set(football_data_co_uk.CLEAN_FOOTBALL_DATA_CO_UK_COLUMNS)
+            timing = _best_cpu_ms(
+                lambda: football_data_co_uk.clean_raw_football_data_co_uk_csv_file(RAW_BUCKET, file_name), repeat)
+            results[file_name] = _result(f"clean_raw_football_data_co_uk_csv_file {file_name}", [timing],
+                                         file_kb=round(len(file_bytes) / 1024, 1))
+    return results
+
+
+def run(match_report_pages: typing.Optional[typing.List[str]] = None, repeat: int = 5,
+        comparisons: bool = True, generated_only: bool = False) -> dict:
+    """
+    Run every benchmark.
+
+    Args:
+        match_report_pages: html of saved match reports, defaults to the recorded and hand-made ones
+        repeat: runs per call, the fastest is kept
+        comparisons: also run the benchmarks against the previous implementations
+        generated_only: allow running on the hand-made pages and files alone, when the
+            recordings are missing
+
+    Returns:
+        results, with the environment they were measured in
+
+    Raises:
+        FileNotFoundError: some recordings are missing, and generated_only isn't set
+    """
+    missing = record_fixtures.missing_recordings()
+    if missing and not generated_only:
+        raise FileNotFoundError(
+            f"Missing {len(missing)} recordings: {', '.join(str(path) for path in missing)}. Record them with "
+            f"'python -m benchmarks.record_fixtures', or pass --generated-only to only benchmark the hand-made ones.")
+    if not match_report_pages:
+        match_report_pages = _recorded_pages("match_report-") + [fbref_pages.match_report(seed=seed) for seed in range(10)]
+    results = {
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "recordings": not missing,
+    }
+    # the scrapers' own progress messages would drown the results
+    with mock.patch.object(fb_ref, "print", lambda *args, **kwargs: None, create=True):
+        results["preprocess_fbref_xg_results"] = benchmark_preprocess_xg_results(repeat)
+        results.update(benchmark_match_reports(match_report_pages, repeat))
+        results["FbrefLeagueHomePageCrawler"] = benchmark_league_stats_pages(repeat)
+    results["parse_goal_log"] = benchmark_parse_goal_log(repeat)
+    results["clean_raw_football_data_co_uk_csv_file"] = benchmark_clean_football_data_files(repeat)
+    if comparisons:
+        results["table_extraction"] = bench_table_extraction.run(match_report_pages, repeat=repeat)
+        results["html_parsing"] = bench_html_parsing.run(repeat=repeat)
+    return results
+
+
+def _timings(results: dict, path: str = "") -> typing.Dict[str, float]:
+    """The compared timings of nested results, by their path, e.g. parse_goal_log.ms_per_call."""
+    timings = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            timings.update(_timings(value, f"{path}{key}."))
+        elif key in COMPARED_TIMINGS:
+            timings[f"{path}{key}"] = value
+    return timings
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float = 1.5) -> typing.List[str]:
+    """
+    Compare the timings to a previous run's.
+
+    Args:
+        results: output of run
+        baseline: output of a previous run, on the same machine
+        tolerance: slowdown ratio above which a timing is a regression
+
+    Returns:
+        descriptions of the regressed timings
+    """
+    baseline_timings = _timings(baseline)
+    regressions = []
+    for path, timing in _timings(results).items():
+        previous = baseline_timings.get(path)
+        if previous and timing / previous > tolerance:
+            regressions.append(f"{path}: {previous} -> {timing} ms (x{timing / previous:.2f})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file the results are saved to")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare to")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="slowdown ratio reported as a regression")
+    parser.add_argument("--match-reports", help="directory of saved match report pages (.html or .html.gz)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per call, the fastest is kept")
+    parser.add_argument("--no-comparisons", action="store_true",
+                        help="skip the benchmarks against the previous implementations")
+    parser.add_argument("--generated-only", action="store_true",
+                        help="run without the recorded pages and files of benchmarks/fixtures, when they're missing")
+    args = parser.parse_args()
+
+    match_reports = bench_table_extraction._read_saved_pages(args.match_reports) if args.match_reports else None
+    try:
+        benchmark_results = run(match_reports, repeat=args.repeat, comparisons=not args.no_comparisons,
+                                generated_only=args.generated_only)
+    except FileNotFoundError as e:
+        print(e)
+        sys.exit(1)
+    with open(args.output, "w") as f:
+        json.dump(benchmark_results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = find_regressions(benchmark_results, json.load(f), args.tolerance)
+        for regression in found:
+            print(f"Regression: {regression}")
+        if found:
+            sys.exit(1)
+        print(f"No regressions over x{args.tolerance} of {args.baseline}")
@@ -9,6 +9,8 @@ select
   time as time_fbref,
   home,
   away,
+  home_football_data,
+  away_football_data,
   score,
   attendance,
   venue,
@@ -34,16 +34,21 @@ from
 ),
 
 xg_results_with_fd_names as (
-select * from
+select
+  xg.*,
+  -- names resolved when the files were standardised, the seed mapping for files standardised before that
+  coalesce(xg.home_football_data, home_team_mapping.hometeam) as hometeam,
+  coalesce(xg.away_football_data, away_team_mapping.awayteam) as awayteam
+from
 {{ ref('dim_match_expected_goals')}} xg 
 left join 
   home_team_mapping 
-using 
-  (home)
+on
+  xg.home = home_team_mapping.home
 left join 
   away_team_mapping
-using
-  (away)
+on
+  xg.away = away_team_mapping.away
 )
   
 select 
@@ -5,6 +5,8 @@ processing of data from FBref.com.
 Author: Padraig Cleary
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import datetime as dt
 from functools import cached_property
 import io
@@ -12,16 +14,15 @@ import json
 import os
 import re
 import sys
-import time
 import typing
-import urllib.parse
 
 import boto3
+from botocore.exceptions import ClientError
 import numpy as np
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup as bs
-from football_pipeline import s3_utils
+import pyarrow as pa
+import pyarrow.parquet as pq
+from football_pipeline import html_tables, http_utils, page_cache, s3_utils, sqs_utils, team_names, url_ledger
 
 FB_REF_COLUMNS = [
     "insertion_date",
@@ -70,6 +71,73 @@ BASE_URL = "https://fbref.com"
 
 QUEUE_URL = os.environ.get("SQS_QUEUE_URL")
 
+XG_RESULTS_BUCKET = 'football-xg-results'
+CLEAN_XG_RESULTS_BUCKET = 'football-xg-results-clean'
+# Identifies a match across runs of the current season scraper
+XG_MATCH_KEY = ['date', 'home', 'away']
+# In incremental mode the current season's new matches are written next to the season file as
+# <season file>.delta-<timestamp>.csv, and merged into the season file once there are this many
+XG_DELTA_COMPACTION_THRESHOLD = 14
+
+# fbref scorelines, e.g. 2–1, or (4) 1–1 (3) with the penalty shootout score
+SCORE_PATTERN = (r"^\s*(?:\((?P<home_penalties>\d+)\)\s*)?(?P<home_goals>\d+)\s*[–-]\s*(?P<away_goals>\d+)"
+                 r"(?:\s*\((?P<away_penalties>\d+)\))?\s*$")
+# season code at the start of the season files' names, e.g. 2023-2024, or 2024 for MLS
+SEASON_CODE_PATTERN = re.compile(r"\d{4}(?:-\d{4})?")
+
+# Per-match lineups csv files written by team_lineups_loader_handler, at <league>/<season_code>/<date>-<home>-<away>.csv
+LINEUPS_BUCKET = 'football-lineups-and-managers'
+# The same rows compacted into parquet files at league=<league>/season=<season_code>/
+COMPACTED_LINEUPS_BUCKET = 'football-lineups-and-managers-clean'
+LINEUPS_SEASON_FILE_NAME = 'lineups.parquet'
+# Athena skips files starting with an underscore
+LINEUPS_MANIFEST_FILE_NAME = '_processed_sources.json'
+LINEUPS_MATCH_KEY = ['date', 'home_team', 'away_team']
+# league and season are partition keys, so aren't in the files
+LINEUPS_SCHEMA = pa.schema([
+    ('date', pa.date32()),
+    ('home_team', pa.string()),
+    ('away_team', pa.string()),
+    ('home_manager', pa.string()),
+    ('away_manager', pa.string()),
+    ('home_player', pa.string()),
+    ('away_player', pa.string()),
+])
+LINEUPS_COMPACTION_MAX_WORKERS = 8
+
+# Stages of the match report crawler, fetching is still limited to REQUESTS_PER_SECOND
+LINEUPS_CRAWL_FETCH_WORKERS = 2
+LINEUPS_CRAWL_PARSE_WORKERS = 2
+LINEUPS_CRAWL_QUEUE_SIZE = 20
+# League seasons whose lineups have all been pushed to the queue, at <prefix><league>/<season_code>.json
+LINEUPS_CHECKPOINT_BUCKET = 'football-misc'
+LINEUPS_CHECKPOINT_PREFIX = 'lineups_crawl/checkpoints/'
+
+# Raw goal logs, at team=<display name>/<season_code>-<team>-goals-log.parquet
+GOAL_LOGS_BUCKET = 'football-goal-logs-raw'
+# Object metadata set to "true" once a goal log was written after its season ended
+GOAL_LOG_FINALISED_METADATA = 'finalised'
+# Goal logs fetched concurrently, still limited to REQUESTS_PER_SECOND
+GOAL_LOG_FETCH_WORKERS = 4
+
+# fbref.com blocks clients making more than ~20 requests a minute
+REQUESTS_PER_SECOND = float(os.environ.get("FB_REF_REQUESTS_PER_SECOND", 1 / 3.1))
+# One pooled, rate limited client for every fbref.com request made by the module
+http_client = http_utils.HttpClient(http_utils.HostRateLimiter(rate=REQUESTS_PER_SECOND))
+
+# Optional cache of the downloaded pages, in a local directory or s3://bucket/prefix.
+# In replay mode pages are only read from the cache, never downloaded.
+PAGE_CACHE_LOCATION = os.environ.get("FB_REF_PAGE_CACHE")
+PAGE_CACHE_REPLAY = os.environ.get("FB_REF_PAGE_CACHE_REPLAY", "").lower() in ("1", "true", "yes")
+# How long pages that can still change (e.g. current season pages) are cached for
+CURRENT_PAGE_CACHE_TTL = dt.timedelta(hours=float(os.environ.get("FB_REF_PAGE_CACHE_TTL_HOURS", 6)))
+html_cache = page_cache.PageCache(PAGE_CACHE_LOCATION, replay=PAGE_CACHE_REPLAY) if PAGE_CACHE_LOCATION else None
+
+# Season and match links that have already been scraped
+scraped_links_ledger = url_ledger.ScrapedUrlLedger()
+# Match links sent to the lineups queue and not yet loaded by team_lineups_loader_handler
+pending_lineup_links = url_ledger.PendingUrlIndex()
+
 COMPETITION_NUMBER_LEAGUE_MAP = {
     "9": "Premier-League",
     "10": "Championship",
@@ -81,6 +149,22 @@ COMPETITION_NUMBER_LEAGUE_MAP = {
     "15": "League-One",
 }
 
+# The tables read from each page, the others are never parsed
+SCHEDULE_TABLE_XPATH = '//table[starts-with(@id, "sched_")]'
+LINEUP_TABLES_XPATH = '//div[@class="lineup"]/table'
+GOALS_FOR_TABLE_XPATH = '//table[@id="goallogs_for"]'
+GOALS_AGAINST_TABLE_XPATH = '//table[@id="goallogs_against"]'
+
+# The other elements read from the pages
+NEXT_SEASON_LINK_XPATH = '//a[@href][. = "Next Season"]'
+PREVIOUS_SEASON_LINK_XPATH = '//a[@href][. = "Previous Season"]'
+LEAGUE_HEADING_XPATH = '//div[@id="info"]//h1'
+FIXTURES_HEADER_XPATH = '//h2[contains(., "Fixtures")]'
+MATCH_SCORE_CELLS_XPATH = '//*[@data-stat="score"][contains(concat(" ", normalize-space(@class), " "), " center ")]'
+SCOREBOX_XPATH = '//*[contains(concat(" ", normalize-space(@class), " "), " scorebox ")]'
+SCOREBOX_META_XPATH = '//*[contains(concat(" ", normalize-space(@class), " "), " scorebox_meta ")]'
+DATAPOINTS_XPATH = './/*[contains(concat(" ", normalize-space(@class), " "), " datapoint ")]'
+
 # These URLs are the current season results pages for each league
 SCORES_HOME_PAGE_URLS = {
     "Premier-League": "https://fbref.com/en/comps/9/schedule/Premier-League-Scores-and-Fixtures",
@@ -98,24 +182,52 @@ class FBrefSeasonResultsPage:
     """
     Class to handle a fbref.com season results
     page url.
+
+    The page is only downloaded, parsed and processed as far as the
+    attributes that are used need it: each derived attribute is computed
+    on first access and memoized, e.g. reading match_level_urls doesn't
+    build processed_xg_df.
     """
     #TODO: apply access protection to the derived attributes
 
-    def __init__(self, season_results_url: str):
+    def __init__(self, season_results_url: str, html: typing.Optional[str] = None):
         """
         Initialise FBrefSeasonResultsPage handler object.
 
         Args:
             season_results_url: fbref.com season results page,
             e.g: https://fbref.com/en/comps/9/2022-2023/schedule/2022-2023-Premier-League-Scores-and-Fixtures
+            html: html of the page if already at hand, otherwise it's downloaded when first needed
         """
         self.link = season_results_url
-        self.url_soup = self._get_soup_object()
-        self.is_current_season = self._is_current_season()
-        self.league_name = self._get_league_name_from_url()
         self._output_file_name = None
-        self.processed_xg_df = self.preprocess_fbref_xg_results()
-        self.match_level_urls = self.get_match_links_from_dom()
+        if html is not None:
+            self.html = html
+
+    @cached_property
+    def html(self) -> str:
+        """html of the page."""
+        return self._get_html()
+
+    @cached_property
+    def is_current_season(self) -> bool:
+        """Whether the page is the current season, i.e. it has no 'Next Season' link."""
+        return self._is_current_season()
+
+    @cached_property
+    def league_name(self) -> str:
+        """Full league name, e.g. 'Premier-League'."""
+        return self._get_league_name_from_url()
+
+    @cached_property
+    def processed_xg_df(self) -> pd.DataFrame:
+        """Preprocessed xg results of the played matches."""
+        return self.preprocess_fbref_xg_results()
+
+    @cached_property
+    def match_level_urls(self) -> typing.List[str]:
+        """Links to the match report of each played match."""
+        return self.get_match_links_from_dom()
 
     @cached_property
     def output_file_name(self) -> str:
@@ -129,7 +241,7 @@ class FBrefSeasonResultsPage:
 
         if self.is_current_season:
             # season string of current seasons is not encoded in the URL, unlike previous seasons, workaround for now
-            header = [h2 for h2 in self.url_soup.find_all('h2') if 'Fixtures' in h2.text][0].span.text
+            header = self.html_tree.xpath(FIXTURES_HEADER_XPATH)[0].find(".//span").text_content()
             try:
                 season_string = re.search(r"(\d{4}-\d{4})", header).group(1)
             except AttributeError:  # catch MLS season
@@ -139,20 +251,31 @@ class FBrefSeasonResultsPage:
             self._output_file_name = self.link.split("/")[-1] 
         return self._output_file_name
 
-    def _get_soup_object(self) -> bs:
+    @cached_property
+    def season_code(self) -> str:
+        """
+        Season of the page, e.g. '2022-2023', or '2022' for MLS.
         """
-        Get the BeautifulSoup object for the given season
-        level URL.
+        return re.match(r"(\d{4}(?:-\d{4})?)", self.output_file_name).group(1)
+
+    def _get_html(self) -> str:
+        """
+        Get the html of the season level URL.
 
         Returns:
-            url_soup
+            html
         """
         print(f"Scraping: {self.link}")
-        response = requests.get(self.link)
-        time.sleep(3.2)
-        # can re-use this soup object for more efficient crawling, fewer requests
-        url_soup = bs(response.text, "html.parser")
-        return url_soup
+        return _get_page(self.link)
+
+    @cached_property
+    def html_tree(self):
+        """
+        lxml tree of the page, every element and table of the page is read
+        from this one parse.
+        """
+        # can re-use this tree for more efficient crawling, fewer requests
+        return html_tables.parse_html(self.html)
 
     def _get_league_name_from_url(self) -> str:
         """
@@ -168,37 +291,34 @@ class FBrefSeasonResultsPage:
         return league_name
 
     def get_match_links_from_dom(self):
-        """Get the links to the detailed match stat pages for a given season soup object"""
-        match_link_divs = self.url_soup.findAll(
-            attrs={"data-stat": "score", "class": "center"}
-        )
+        """Get the links to the detailed match stat pages for a given season page"""
+        match_link_divs = self.html_tree.xpath(MATCH_SCORE_CELLS_XPATH)
         links = [
-            "https://fbref.com" + div.a["href"]
+            "https://fbref.com" + div.find(".//a").attrib["href"]
             for div in match_link_divs
-            if div.a is not None
+            if div.find(".//a") is not None
         ]
         return links
 
     def _is_current_season(self):
         """Utility func to check if current page is the current season."""
-        links = self.url_soup.findAll("a", href=True, text="Next Season")
+        links = self.html_tree.xpath(NEXT_SEASON_LINK_XPATH)
         current_season = True if not links else False
         return current_season
 
     def preprocess_fbref_xg_results(self) -> pd.DataFrame:
         """
-        Take the 'soup' object of an fbref season xg results URL and apply
+        Take the schedule table of an fbref season xg results URL and apply
         the necessary cleaning and preprocessing before later storing as a
         file for further analysis and transformation.
-        Args:
-            url_soup:
 
         Returns:
-
+            xg_results_df
         """
 
-        table = self.url_soup.find_all("table")
-        xg_results_df = pd.read_html(str(table))[0]
+        xg_results_df = html_tables.read_first_table(self.html_tree, SCHEDULE_TABLE_XPATH)
+        if xg_results_df is None:
+            raise ValueError(f"No scores and fixtures table found in {self.link}")
 
         # TODO: fix for now, but verify why there would be rows with no fields except home, away team...(fixtures?)
         xg_results_df = xg_results_df[~xg_results_df["Score"].isnull()]
@@ -212,17 +332,11 @@ class FBrefSeasonResultsPage:
         ]
         xg_results_df["league_name"] = self.league_name
         # Preprocessing
-        xg_results_df["Score"] = xg_results_df["Score"].str.replace(
-            r"\(.*\) ", ""
-        )
-        xg_results_df["Score"] = xg_results_df["Score"].str.replace(
-            r" \(.*\)", ""
-        )
-        scoreline = xg_results_df["Score"].str.split("–", n=1, expand=True)
-        # TODO: EFL matches can go to extra time in playoffs, and can have (3) 1 - 1 (4) scorelines for penalties...need to clean
-
-        xg_results_df.loc[:, "home_goals"] = scoreline[0]
-        xg_results_df.loc[:, "away_goals"] = scoreline[1]
+        # e.g. EFL playoffs and MLS can have (3) 1–1 (4) scorelines for penalty shootouts, only keep the 1–1
+        scores = parse_scores(xg_results_df["Score"])
+        xg_results_df["Score"] = strip_shootout_scores(xg_results_df["Score"], scores)
+        xg_results_df.loc[:, "home_goals"] = scores["home_goals"]
+        xg_results_df.loc[:, "away_goals"] = scores["away_goals"]
         xg_results_df.rename(
             columns={"xG": "home_xg", "xG.1": "away_xg", "Wk": "week"}, inplace=True
         )
@@ -245,16 +359,212 @@ class FBrefSeasonResultsPage:
 
         return xg_results_df
 
-    def save_to_s3(self):
+    def save_to_s3(self, record_link: bool = True):
         """
         Save the processed season file to the football-xg-results
-        S3 bucket and update the S3 scraped_links file with the new link.
-        Returns:
+        S3 bucket and add the link to the scraped links ledger.
+
+        Args:
+            record_link: add the link to the scraped links ledger (when it's not the current season)
         """
-        s3_utils.upload_df_to_s3('football-xg-results', self.output_file_name+".csv", self.processed_xg_df)
-        if not self.is_current_season:  # we always want to keep trying the current season link for freshly completed matches
+        s3_utils.upload_df_to_s3(XG_RESULTS_BUCKET, self.output_file_name+".csv", self.processed_xg_df)
+        # a full season file supersedes any delta files
+        _delete_xg_results_deltas(self.league_name, self.season_code, _list_xg_results_deltas(self.output_file_name))
+        if record_link and not self.is_current_season:  # we always want to keep trying the current season link for freshly completed matches
             # so the current season NEVER gets inserted into the 'scraped season table' until new season starts.
-            s3_utils.update_scraped_url_list('football-misc', 'scraped_links.txt', [self.link])
+            scraped_links_ledger.add(self.link)
+
+    def save_delta_to_s3(self) -> str:
+        """
+        Incremental version of save_to_s3 for the current season: compare the
+        processed results with the stored season file and its delta files on
+        the (date, home, away) match key, and only write the new matches, as
+        a small delta file.
+
+        Matches whose stored row has changed (e.g. a corrected xg) can't be
+        superseded by a delta file without leaving both versions in the clean
+        bucket, so they, like reaching XG_DELTA_COMPACTION_THRESHOLD delta
+        files, make the whole season file be rewritten instead.
+
+        Returns:
+            what was written: 'full', 'delta' or 'unchanged'
+        """
+        snapshot, delta_keys = _read_xg_results_snapshot(self.output_file_name)
+        if snapshot is None:
+            self.save_to_s3()
+            return 'full'
+
+        latest = _as_csv_strings(self.processed_xg_df)
+        if list(latest.columns) != list(snapshot.columns):
+            self.save_to_s3()
+            return 'full'
+        stored = snapshot.drop_duplicates(XG_MATCH_KEY, keep='last').set_index(XG_MATCH_KEY)
+        latest_keys = pd.MultiIndex.from_frame(latest[XG_MATCH_KEY])
+        is_new = ~latest_keys.isin(stored.index)
+
+        existing = latest[~is_new].drop_duplicates(XG_MATCH_KEY, keep='last').set_index(XG_MATCH_KEY)
+        changed = (existing != stored.loc[existing.index, existing.columns]).any(axis=1)
+        if changed.any() or len(delta_keys) + bool(is_new.any()) > XG_DELTA_COMPACTION_THRESHOLD:
+            print(f"{self.output_file_name}: {int(changed.sum())} changed matches, {len(delta_keys)} delta files, "
+                  f"rewriting the season file.")
+            self.save_to_s3()
+            return 'full'
+        if not is_new.any():
+            return 'unchanged'
+
+        timestamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        delta_key = f"{_xg_results_delta_prefix(self.output_file_name)}{timestamp}.csv"
+        s3_utils.upload_df_to_s3(XG_RESULTS_BUCKET, delta_key, self.processed_xg_df[is_new])
+        print(f"{self.output_file_name}: {int(is_new.sum())} new matches written to {delta_key}.")
+        return 'delta'
+
+
+def parse_scores(score: pd.Series) -> pd.DataFrame:
+    """
+    Parse fbref scorelines, e.g. '2–1' or '(4) 1–1 (3)' after a penalty
+    shootout, in one vectorized pass.
+
+    Args:
+        score: scorelines
+
+    Returns:
+        home_penalties, home_goals, away_goals and away_penalties (Int64,
+        penalties missing when there was no shootout, and every column when
+        the score couldn't be parsed)
+    """
+    return score.str.extract(SCORE_PATTERN).astype("Int64")
+
+
+def strip_shootout_scores(score: pd.Series, scores: pd.DataFrame) -> pd.Series:
+    """
+    Scorelines without their penalty shootout scores, e.g. '1–1' for '(4) 1–1 (3)'.
+
+    Args:
+        score: scorelines
+        scores: the scorelines parsed by parse_scores
+
+    Returns:
+        scorelines, unchanged where they couldn't be parsed
+    """
+    return score.where(scores["home_goals"].isna(),
+                       scores["home_goals"].astype(str) + "–" + scores["away_goals"].astype(str))
+
+
+def _xg_results_delta_prefix(output_file_name: str) -> str:
+    return f"{output_file_name}.delta-"
+
+
+def _clean_xg_results_key(league_name: str, season_code: str, file_key: str) -> str:
+    """Key of the standardised parquet file of a raw xg results file."""
+    # adopt the '=' in the folders to help Glue infer the partition key column names:
+    return f"league={league_name}/season={season_code}/{file_key}.parquet"
+
+
+def _as_csv_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """The DataFrame as it reads back from its csv file, with every value as a string, for comparisons."""
+    return pd.read_csv(io.StringIO(df.to_csv(index=False)), dtype=str).fillna("")
+
+
+def _list_xg_results_deltas(output_file_name: str) -> typing.List[str]:
+    """Keys of the delta files of a season file, oldest first."""
+    return sorted(s3_utils.list_object_keys(XG_RESULTS_BUCKET, prefix=_xg_results_delta_prefix(output_file_name),
+                                            suffix=".csv"))
+
+
+def _read_xg_results_snapshot(output_file_name: str) -> typing.Tuple[typing.Optional[pd.DataFrame], typing.List[str]]:
+    """
+    Read the stored results of a season: its season file followed by its
+    delta files, every value as a string.
+
+    Returns:
+        (stored rows, None if there's no season file yet; keys of the delta files)
+    """
+    delta_keys = _list_xg_results_deltas(output_file_name)
+    try:
+        frames = list(s3_utils.iter_object_frames(XG_RESULTS_BUCKET, [output_file_name + ".csv"] + delta_keys, dtype=str))
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "NoSuchKey":
+            raise
+        return None, delta_keys
+    return pd.concat(frames, ignore_index=True).fillna(""), delta_keys
+
+
+def _is_xg_results_delta(file_key: str) -> bool:
+    return ".delta-" in file_key
+
+
+def _object_exists(bucket_name: str, file_key: str) -> bool:
+    try:
+        s3.head_object(Bucket=bucket_name, Key=file_key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+    return True
+
+
+def _delete_xg_results_deltas(league_name: str, season_code: str, delta_keys: typing.List[str]):
+    """Delete delta files, and their standardised parquet files, once merged into the season file."""
+    for delta_key in delta_keys:
+        s3.delete_object(Bucket=XG_RESULTS_BUCKET, Key=delta_key)
+        s3.delete_object(Bucket=CLEAN_XG_RESULTS_BUCKET, Key=_clean_xg_results_key(league_name, season_code, delta_key))
+
+
+def compact_xg_results_deltas(season_results_url: str):
+    """
+    Merge the delta files of a current season into its season file, without
+    scraping the season page again, e.g. before the season's archival.
+
+    Args:
+        season_results_url: fbref.com current season results page
+    """
+    season = FBrefSeasonResultsPage(season_results_url)
+    snapshot, delta_keys = _read_xg_results_snapshot(season.output_file_name)
+    if snapshot is None or not delta_keys:
+        return
+    merged = snapshot.drop_duplicates(XG_MATCH_KEY, keep='last')
+    s3_utils.upload_df_to_s3(XG_RESULTS_BUCKET, season.output_file_name + ".csv", merged)
+    _delete_xg_results_deltas(season.league_name, season.season_code, delta_keys)
+
+
+def _page_cache_ttl(url: str, html: str) -> typing.Optional[dt.timedelta]:
+    """
+    How long to cache a page for. Played match reports and pages of past
+    seasons (which link to the next season) won't change again, so they
+    never expire, while anything else may still be updated.
+
+    Returns:
+        time to live, None if the page never expires
+    """
+    if "/en/matches/" in url:
+        finished = '<div class="score">' in html
+    else:
+        finished = ">Next Season<" in html
+    return None if finished else CURRENT_PAGE_CACHE_TTL
+
+
+def _get_page(url: str) -> str:
+    """
+    Get the html of a fbref.com page, from the page cache if it's enabled
+    and has a fresh copy, otherwise through the module's shared client,
+    which paces the requests and retries rate limited ones.
+
+    Args:
+        url: fbref.com page url
+
+    Returns:
+        page html
+    """
+    if html_cache is not None:
+        html = html_cache.get(url)
+        if html is not None:
+            return html
+    response = http_client.get(url)
+    response.raise_for_status()
+    html = response.text
+    if html_cache is not None:
+        html_cache.put(url, html, ttl=_page_cache_ttl(url, html))
+    return html
 
 
 def _generate_scores_url(comp_no, year, league_name):
@@ -276,10 +586,9 @@ def get_previous_season_url(starting_url):
     Returns:
 
     """
-    req = requests.get(starting_url)
-    soup = bs(req.text, "html.parser")
-    links = soup.findAll("a", href=True, text="Previous Season")
-    previous_season_link = links[0]["href"]
+    tree = html_tables.parse_html(_get_page(starting_url))
+    links = tree.xpath(PREVIOUS_SEASON_LINK_XPATH)
+    previous_season_link = links[0].attrib["href"]
     return f"{BASE_URL}{previous_season_link}"
 
 
@@ -290,6 +599,227 @@ def create_season_code(league_name, year):
         return f"{year-1}-{year}"
 
 
+def _team_lineups_seasons() -> typing.List[typing.Tuple[str, str, str]]:
+    """(season results url, league, season code) of every league season to scrape, most recent first."""
+    return [
+        (_generate_scores_url(comp_no, year, league_name), league_name, create_season_code(league_name, year))
+        for comp_no, league_name in COMPETITION_NUMBER_LEAGUE_MAP.items()
+        for year in range(2024, 2013, -1)
+    ]
+
+
+def _lineups_checkpoint_key(league: str, season_code: str) -> str:
+    return f"{LINEUPS_CHECKPOINT_PREFIX}{league}/{season_code}.json"
+
+
+def _completed_lineups_seasons() -> typing.Set[str]:
+    """Checkpoint keys of the league seasons whose lineups have all been pushed to the queue."""
+    return set(s3_utils.list_object_keys(LINEUPS_CHECKPOINT_BUCKET, prefix=LINEUPS_CHECKPOINT_PREFIX, suffix=".json"))
+
+
+class _SeasonProgress:
+    """Match links of a league season still going through the crawler's stages."""
+
+    def __init__(self, league: str, season_code: str, is_current_season: bool, match_count: int):
+        self.league = league
+        self.season_code = season_code
+        self.is_current_season = is_current_season
+        self.remaining = match_count
+        self.sent_links = set()
+        self.failed = 0
+
+
+async def _await_while_stages_run(awaitable: typing.Awaitable, stages: typing.List[asyncio.Task]):
+    """
+    Await the awaitable, unless one of a pipeline's stage tasks dies first,
+    as the stages feeding it would then block forever on its full queue.
+
+    Args:
+        awaitable: coroutine putting items on, or stopping, the stages' queues
+        stages: tasks of the pipeline's stages
+
+    Raises:
+        the exception of the stage that died, after cancelling the awaitable
+    """
+    task = asyncio.ensure_future(awaitable)
+    running = {task, *stages}
+    while not task.done():
+        done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for stage in done:
+            if stage is not task and not stage.cancelled() and stage.exception() is not None:
+                task.cancel()
+                raise stage.exception()
+    return task.result()
+
+
+async def crawl_team_lineups(
+    seasons: typing.Optional[typing.List[typing.Tuple[str, str, str]]] = None,
+    fetch_workers: int = LINEUPS_CRAWL_FETCH_WORKERS,
+    parse_workers: int = LINEUPS_CRAWL_PARSE_WORKERS,
+    queue_size: int = LINEUPS_CRAWL_QUEUE_SIZE,
+):
+    """
+    Crawl the match reports of league seasons and push their lineups and
+    managers to the SQS queue, with the fetching, parsing and publishing of
+    the match reports as separate stages joined by bounded queues.
+
+    Requests are only ever made at the shared http_client's rate limit, the
+    blocking fetches and CPU-heavy parsing run in worker threads, off the
+    event loop. Match links are recorded as scraped as soon as their batch
+    is acknowledged by SQS, and a past season is checkpointed once all its
+    matches have been pushed, so a restarted crawl skips it without even
+    fetching its results page. If a stage dies, the other stages are
+    cancelled and its exception raised, instead of blocking on its queue.
+
+    Args:
+        seasons: (season results url, league, season code) to crawl, defaults to every league season
+        fetch_workers: match reports fetched concurrently (still at the rate limit)
+        parse_workers: match reports parsed concurrently
+        queue_size: bound of each queue between the stages
+    """
+    if seasons is None:
+        seasons = _team_lineups_seasons()
+    await asyncio.gather(
+        asyncio.to_thread(scraped_links_ledger.load),
+        asyncio.to_thread(pending_lineup_links.load),
+    )
+    completed_seasons = await asyncio.to_thread(_completed_lineups_seasons)
+
+    # items are (season progress, match link, payload), with a None payload once the match has failed,
+    # and a None item tells a worker to stop
+    fetch_queue = asyncio.Queue(maxsize=queue_size)
+    parse_queue = asyncio.Queue(maxsize=queue_size)
+    publish_queue = asyncio.Queue(maxsize=queue_size)
+
+    async def checkpoint(progress: _SeasonProgress):
+        summary = f"{progress.league} {progress.season_code}: pushed {len(progress.sent_links)}, {progress.failed} failed"
+        if progress.is_current_season or progress.failed:
+            # the current season will have more matches, and failed matches should be tried again
+            print(f"{summary}.")
+            return
+        try:
+            await asyncio.to_thread(
+                s3_utils.s3.put_object, Bucket=LINEUPS_CHECKPOINT_BUCKET,
+                Key=_lineups_checkpoint_key(progress.league, progress.season_code),
+                Body=json.dumps({"pushed": len(progress.sent_links),
+                                 "completed_at": dt.datetime.now(dt.timezone.utc).isoformat()}),
+            )
+            print(f"{summary}, season complete.")
+        except Exception as e:
+            print(f"{summary}, failed to checkpoint the season: {e!r}")
+
+    async def list_match_links(producer: sqs_utils.BatchedQueueProducer):
+        for season_url, league, season_code in seasons:
+            if _lineups_checkpoint_key(league, season_code) in completed_seasons:
+                continue
+            print(f"Season: {league} {season_code}")
+            season_object = FBrefSeasonResultsPage(season_url)
+            try:
+                match_links, is_current_season = await asyncio.to_thread(
+                    lambda: (season_object.match_level_urls, season_object.is_current_season))
+            except Exception as e:
+                print(f"Failed to read the matches of {season_url}: {e!r}")
+                continue
+            # We don't want to re-scrape links that are already in the message queue (or waiting to be sent to it)
+            # OR in the list of already processed links
+            match_links = [
+                link for link in scraped_links_ledger.filter_new(match_links)
+                if link not in pending_lineup_links and link not in producer
+            ]
+            progress = _SeasonProgress(league, season_code, is_current_season, len(match_links))
+            if not match_links:
+                await checkpoint(progress)
+            for link in match_links:
+                await fetch_queue.put((progress, link, None))
+
+    async def fetch():
+        while True:
+            item = await fetch_queue.get()
+            if item is None:
+                return
+            progress, link, _ = item
+            try:
+                html = await asyncio.to_thread(_get_page, link)
+            except Exception as e:
+                print(f"Failed to fetch {link}: {e!r}")
+                html = None
+            await parse_queue.put((progress, link, html))
+
+    async def parse():
+        while True:
+            item = await parse_queue.get()
+            if item is None:
+                return
+            progress, link, html = item
+            match_info = None
+            if html is not None:
+                try:
+                    match_info = await asyncio.to_thread(parse_match_report, link, html)
+                    match_info['league'] = progress.league
+                    match_info['season_code'] = progress.season_code
+                except Exception as e:
+                    print(f"Failed to parse {link}: {e!r}")
+            await publish_queue.put((progress, link, match_info))
+
+    async def publish(producer: sqs_utils.BatchedQueueProducer):
+        # the only stage touching the producer and the seasons' progress, so neither needs a lock
+        while True:
+            item = await publish_queue.get()
+            if item is None:
+                return
+            progress, link, match_info = item
+            if match_info is None:
+                progress.failed += 1
+            else:
+                try:
+                    # Buffer the message, it's sent to the queue with the next batch
+                    await asyncio.to_thread(producer.send, json.dumps(match_info), link)
+                    progress.sent_links.add(link)
+                except Exception as e:
+                    print(f"Failed to push {link}: {e!r}")
+                    progress.failed += 1
+            progress.remaining -= 1
+            if progress.remaining == 0:
+                # make sure all the season's messages are acknowledged before checkpointing it
+                try:
+                    await asyncio.to_thread(producer.flush)
+                except Exception as e:
+                    print(f"Failed to push the last matches of {progress.league} {progress.season_code}: {e!r}")
+                    progress.failed += 1
+                not_sent = progress.sent_links.intersection(producer.failed_keys)
+                progress.sent_links -= not_sent
+                progress.failed += len(not_sent)
+                await checkpoint(progress)
+
+    async def stop(queue: asyncio.Queue, workers: list):
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+    async def drain():
+        await stop(fetch_queue, fetchers)
+        await stop(parse_queue, parsers)
+        await stop(publish_queue, [publisher])
+
+    with sqs_utils.BatchedQueueProducer(QUEUE_URL, on_sent=_record_pushed_lineup_links) as producer:
+        fetchers = [asyncio.create_task(fetch()) for _ in range(fetch_workers)]
+        parsers = [asyncio.create_task(parse()) for _ in range(parse_workers)]
+        publisher = asyncio.create_task(publish(producer))
+        stages = [*fetchers, *parsers, publisher]
+        try:
+            try:
+                await _await_while_stages_run(list_match_links(producer), stages)
+            finally:
+                # let the matches already listed go through every stage, unless one of them has died
+                # (the stages only return once told to stop)
+                if not any(stage.done() for stage in stages):
+                    await _await_while_stages_run(drain(), stages)
+        finally:
+            for stage in stages:
+                stage.cancel()
+    await asyncio.to_thread(scraped_links_ledger.compact_if_needed)
+
+
 def scrape_team_lineups():
     """
     For each league, season, iterate through each
@@ -301,52 +831,17 @@ def scrape_team_lineups():
     Returns:
 
     """
+    asyncio.run(crawl_team_lineups())
 
-    sqs = boto3.client('sqs')
-    scraped_links = s3_utils.get_scraped_urls()
-
-    queue_links = read_links_from_queue()
-
-    for comp_no, league_name in COMPETITION_NUMBER_LEAGUE_MAP.items():
-        competition_season_links = [
-            (_generate_scores_url(comp_no, year, league_name), league_name, create_season_code(league_name, year))
-            for year in range(2024, 2013, -1)
-        ]
-
-        print(f"League: {league_name}")
-
-        for season_link in competition_season_links:
-            season_object = FBrefSeasonResultsPage(season_link[0])
-            league = season_link[1]
-            season_code = season_link[2]
 
-            print(f"Season: {season_link}")
-            # We don't want to re-scrape links that are already in the message queue OR in the list of already processed links
-            match_links_to_scrape = [
-                link for link in season_object.match_level_urls if link not in scraped_links and link not in queue_links
-            ]
-
-            for match_link in match_links_to_scrape:
-                try:
-                    match_info = extract_lineup_manaager_info(match_link)
-                    match_info['league'] = league
-                    match_info['season_code'] = season_code
-
-                    # Write the dict to the buffer file
-                    message_json = json.dumps(match_info)
-                    # Send the message to the queue
-                    response = sqs.send_message(
-                        QueueUrl=QUEUE_URL,
-                        MessageBody=message_json,
-                    )
-                    print("MessageId:", response['MessageId'])
-                    print(f"Message body: \n\n{message_json}")
-                    s3_utils.update_scraped_url_list('football-misc', 'scraped_links.txt', [match_link])
-                    print(f"Pushed {match_link} to queue.")
-                except Exception as e:  # TODO: fix this better later
-                    print("Exception:")
-                    print(e)
-    return
+def _record_pushed_lineup_links(match_links: typing.List[str]):
+    """
+    Record the match links of a batch of lineup messages SQS acknowledged,
+    as pending until loaded and as scraped.
+    """
+    pending_lineup_links.add_many(match_links)
+    scraped_links_ledger.add_many(match_links)
+    print(f"Pushed {len(match_links)} match links to queue.")
 
 
 def extract_lineup_manaager_info(match_link: str) -> dict:
@@ -361,12 +856,23 @@ def extract_lineup_manaager_info(match_link: str) -> dict:
     Returns:
         info: dict containing the extracted players, manager details
     """
-    # match_link =
-    match_soup = bs(requests.get(match_link).text, 'lxml')
-    time.sleep(3.1)
-    table = match_soup.find_all("table")
-    # all the tables in the html doc:
-    all_match_tables = pd.read_html(str(table))
+    return parse_match_report(match_link, _get_page(match_link))
+
+
+def parse_match_report(match_link: str, match_html: str) -> dict:
+    """
+    Extract the team lineups and manager details for the home,
+    away teams from the html of a fbref.com match report.
+
+    Args:
+        match_link: URL of the match report
+        match_html: html of the match report
+    Returns:
+        info: dict containing the extracted players, manager details
+    """
+    match_tree = html_tables.parse_html(match_html)
+    # the home and away lineup tables:
+    all_match_tables = html_tables.read_tables(match_tree.xpath(LINEUP_TABLES_XPATH), limit=2)
 
     regex_pattern = r"^[^\(]+(?= \()"
     match = re.search(regex_pattern, all_match_tables[0].columns[0])
@@ -377,19 +883,18 @@ def extract_lineup_manaager_info(match_link: str) -> dict:
     home_lineup = all_match_tables[0][:11].iloc[:, 1].values.tolist()
     away_lineup = all_match_tables[1][:11].iloc[:, 1].values.tolist()
 
-    scorebox = match_soup.findAll(attrs={"class": "scorebox"})
-    scorebox_meta = match_soup.findAll(attrs={"class": "scorebox_meta"})
-    date_str_str = scorebox_meta[0].div.span["data-venue-date"]
+    scorebox = match_tree.xpath(SCOREBOX_XPATH)
+    scorebox_meta = match_tree.xpath(SCOREBOX_META_XPATH)
+    date_str_str = scorebox_meta[0].find(".//div").find(".//span").attrib["data-venue-date"]
+    datapoints = scorebox[0].xpath(DATAPOINTS_XPATH)
     home_manager = (
-        scorebox[0]
-        .findAll(attrs={"class": "datapoint"})[0]
-        .text.replace("\xa0", " ")
+        datapoints[0]
+        .text_content().replace("\xa0", " ")
         .replace("Manager: ", "")
     )
     away_manager = (
-        scorebox[0]
-        .findAll(attrs={"class": "datapoint"})[2]
-        .text.replace("\xa0", " ")
+        datapoints[2]
+        .text_content().replace("\xa0", " ")
         .replace("Manager: ", "")
     )
 
@@ -406,6 +911,50 @@ def extract_lineup_manaager_info(match_link: str) -> dict:
     return info
 
 
+def parse_goal_log(goal_log_html: str) -> pd.DataFrame:
+    """
+    Extract the goals for and against tables of a fbref.com
+    squad goal logs page into one dataframe of GOAL_LOG_COLUMNS.
+
+    Args:
+        goal_log_html: html of the goal logs page
+    Returns:
+        df: goals for and against, labelled by the for_or_against column
+    """
+    goal_log_tree = html_tables.parse_html(goal_log_html)
+
+    # in cases at start of seasons if no goals are recorded:
+    goals_for = html_tables.read_first_table(goal_log_tree, GOALS_FOR_TABLE_XPATH)
+    if goals_for is None:
+        goals_for = pd.DataFrame(columns=GOAL_LOG_COLUMNS)
+
+    for col in GOAL_LOG_COLUMNS:
+        if col.lower() not in [c.lower() for c in goals_for.columns.tolist()]:
+            goals_for[col] = None
+    goals_for['for_or_against'] = 'for'
+
+    goals_against = html_tables.read_first_table(goal_log_tree, GOALS_AGAINST_TABLE_XPATH)
+    if goals_against is None:
+        goals_against = pd.DataFrame(columns=GOAL_LOG_COLUMNS)
+
+    for col in GOAL_LOG_COLUMNS:
+        if col.lower() not in [c.lower() for c in goals_against.columns.tolist()]:
+            goals_against[col] = None
+    goals_against['for_or_against'] = 'against'
+
+    df = pd.concat([goals_for[GOAL_LOG_COLUMNS], goals_against[GOAL_LOG_COLUMNS]])
+
+    for col in GOAL_LOG_COLUMNS:
+        if col.lower() == 'rk':
+            df[col] = df[col].astype(int)
+        elif col.lower() in ['xg','psxg', 'distance']:
+            df[col] = df[col].astype(float)
+        else:
+            df[col] = df[col].astype(str)
+
+    return df
+
+
 def convert_to_df(message_body: dict) -> pd.DataFrame:
     """
     Process the lineups/managers message payload into
@@ -430,31 +979,6 @@ def convert_to_df(message_body: dict) -> pd.DataFrame:
     return staging_df
 
 
-def read_links_from_queue():
-
-    links = []
-    sqs = boto3.client('sqs')
-
-    while True:
-        response = sqs.receive_message(
-            QueueUrl=QUEUE_URL,
-            MaxNumberOfMessages=10,  # Maximum is 10
-            WaitTimeSeconds=20  # Enable long polling
-        )
-
-        # Check if any messages are returned
-        if 'Messages' in response:
-            for message in response['Messages']:
-                # Process the message here...
-                message_body = json.loads(message['Body'])
-                links.append(message_body['match_link'])
-        else:
-            # No messages to process, break the loop
-            break
-
-    return links
-
-
 def scrape_xg_result_seasons(league_name: str = None):
     #TODO: NEED TO LOOK AT AN UPDATE/BACKFILL CHOICE SIMILAR TO THE RESULTS LOADER
     """
@@ -470,7 +994,7 @@ def scrape_xg_result_seasons(league_name: str = None):
     Returns:
 
     """
-    scraped_links = s3_utils.get_scraped_urls()
+    scraped_links_ledger.load()
 
     all_league_links = []
     # Take advantage of the nice regularity in the fbref link structure
@@ -481,9 +1005,7 @@ def scrape_xg_result_seasons(league_name: str = None):
         ]
         all_league_links = all_league_links + links
 
-    all_links_to_scrape = [
-        link for link in all_league_links if link not in scraped_links
-    ]
+    all_links_to_scrape = scraped_links_ledger.filter_new(all_league_links)
 
     for link in all_links_to_scrape:
         try:
@@ -510,21 +1032,231 @@ def team_lineups_loader_handler(event, context):
         message = record["body"]
         print(f"printing message: {message}\n\n")
         message = json.loads(str(message))
-        df = convert_to_df(message)
-        league = df['league'].values[0]
-        season_code = df['season_code'].values[0]
-        date = df['date'].values[0]
-        home = df['home_team'].values[0]
-        away = df['away_team'].values[0]
-
-        # Build the object key:
-        file_key = f"{league}/{season_code}/{date}-{home}-{away}.csv"
-        bucket = 'football-lineups-and-managers'
-        s3_utils.upload_df_to_s3(bucket, file_key, df)
+        load_team_lineups(message)
         print("Called upload_to_s3. Exiting")
     return
 
 
+def load_team_lineups(message: dict):
+    """
+    Upload the lineups/managers of one match to the
+    football-lineups-and-managers bucket, and clear
+    its link from the pending lineup links.
+
+    Args:
+        message: match info from extract_lineup_manaager_info, with the league and season_code
+    """
+    df = convert_to_df(message)
+    league = df['league'].values[0]
+    season_code = df['season_code'].values[0]
+    date = df['date'].values[0]
+    home = df['home_team'].values[0]
+    away = df['away_team'].values[0]
+
+    # Build the object key:
+    file_key = f"{league}/{season_code}/{date}-{home}-{away}.csv"
+    s3_utils.upload_df_to_s3(LINEUPS_BUCKET, file_key, df)
+    if 'match_link' in message:
+        pending_lineup_links.remove(message['match_link'])
+
+
+def _list_lineups_sources(bucket_name: str) -> typing.Dict[typing.Tuple[str, str], typing.Dict[str, str]]:
+    """
+    List the per-match lineups csv files, by (league, season_code) partition.
+
+    Returns:
+        {(league, season_code): {file key: etag}}
+    """
+    partitions = {}
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket_name):
+        for obj in page.get("Contents", []):
+            parts = obj["Key"].split("/")
+            if len(parts) == 3 and parts[2].endswith(".csv"):
+                partitions.setdefault((parts[0], parts[1]), {})[obj["Key"]] = obj["ETag"]
+    return partitions
+
+
+def _read_lineups_csvs(bucket_name: str, file_keys: typing.List[str]) -> pd.DataFrame:
+    """Read per-match lineups csv files concurrently into one DataFrame, with the match dates as dates."""
+    df = pd.concat(s3_utils.iter_object_frames(bucket_name, file_keys, dtype=str,
+                                               max_workers=LINEUPS_COMPACTION_MAX_WORKERS), ignore_index=True)
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d").dt.date
+    return df
+
+
+def _read_compacted_lineups(bucket_name: str, file_keys: typing.List[str]) -> pd.DataFrame:
+    frames = [pq.read_table(io.BytesIO(s3_utils.get_object_bytes(bucket_name, file_key))).to_pandas()
+              for file_key in file_keys]
+    return pd.concat(frames, ignore_index=True) if frames else LINEUPS_SCHEMA.empty_table().to_pandas()
+
+
+def _replace_matches(existing_df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """Rows of the new matches, plus those of the existing matches that aren't in the new ones."""
+    new_matches = pd.MultiIndex.from_frame(new_df[LINEUPS_MATCH_KEY])
+    is_replaced = pd.MultiIndex.from_frame(existing_df[LINEUPS_MATCH_KEY]).isin(new_matches)
+    return (
+        pd.concat([existing_df[~is_replaced], new_df[LINEUPS_SCHEMA.names]], ignore_index=True)
+        .sort_values(LINEUPS_MATCH_KEY, kind="stable")  # stable, keeping the order of each lineup's players
+    )
+
+
+def compact_lineups_partition(league: str, season_code: str, sources: typing.Dict[str, str], current_season: bool,
+                              source_bucket: str = LINEUPS_BUCKET,
+                              output_bucket: str = COMPACTED_LINEUPS_BUCKET) -> int:
+    """
+    Fold the new per-match lineups csv files of a league and season into the
+    partition's parquet files: one lineups.parquet for a past season, or one
+    file per match day for the current season (so a day's new matches only
+    rewrite that day's file). Once a season is no longer the current one its
+    daily files are folded into a single lineups.parquet.
+
+    The partition's manifest records the etag of every source file folded in,
+    so reruns only read new or changed files. Rows are replaced by match, so
+    re-folding a file after an interrupted run gives the same result.
+
+    Args:
+        league: league name, e.g. Premier-League
+        season_code: season code, e.g. 2023-2024
+        sources: {file key: etag} of the partition's csv files
+        current_season: whether it's the league's current season
+        source_bucket: bucket of the per-match csv files
+        output_bucket: bucket of the compacted parquet files
+
+    Returns:
+        number of source files folded in
+    """
+    prefix = f"league={league}/season={season_code}/"
+    manifest_key = prefix + LINEUPS_MANIFEST_FILE_NAME
+    try:
+        manifest = json.loads(s3_utils.get_object_bytes(output_bucket, manifest_key))
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "NoSuchKey":
+            raise
+        manifest = {"sources": {}}
+    new_keys = sorted(key for key, etag in sources.items() if manifest["sources"].get(key) != etag)
+
+    existing_files = list(s3_utils.list_object_keys(output_bucket, prefix=prefix, suffix=".parquet"))
+    daily_files = [key for key in existing_files if not key.endswith(LINEUPS_SEASON_FILE_NAME)]
+    if not new_keys and (current_season or not daily_files):
+        return 0
+
+    new_df = _read_lineups_csvs(source_bucket, new_keys) if new_keys else LINEUPS_SCHEMA.empty_table().to_pandas()
+    if current_season:
+        outputs = {f"{prefix}{date}.parquet": day_df for date, day_df in new_df.groupby("date")}
+    else:
+        outputs = {prefix + LINEUPS_SEASON_FILE_NAME: new_df}
+
+    for file_key, file_df in outputs.items():
+        # a past season's file absorbs any daily files left from when it was the current season
+        inputs = [file_key] if current_season else existing_files
+        existing_df = _read_compacted_lineups(output_bucket, [key for key in inputs if key in existing_files])
+        table = pa.Table.from_pandas(_replace_matches(existing_df, file_df), schema=LINEUPS_SCHEMA, preserve_index=False)
+        s3_utils.upload_table_to_s3(output_bucket, file_key, table)
+
+    if not current_season:
+        for file_key in daily_files:
+            s3.delete_object(Bucket=output_bucket, Key=file_key)
+
+    manifest["sources"].update({key: sources[key] for key in new_keys})
+    s3.put_object(Bucket=output_bucket, Key=manifest_key, Body=json.dumps(manifest).encode("utf-8"))
+    print(f"{league} {season_code}: folded {len(new_keys)} lineups files into {len(outputs)} parquet files.")
+    return len(new_keys)
+
+
+def compact_team_lineups(source_bucket: str = LINEUPS_BUCKET, output_bucket: str = COMPACTED_LINEUPS_BUCKET) -> int:
+    """
+    Compact the per-match lineups csv files into typed parquet files,
+    partitioned by league and season (league=<league>/season=<season_code>/)
+    so Athena reads a few files per season instead of one per match.
+
+    The latest season of each league is treated as its current season.
+
+    Args:
+        source_bucket: bucket of the per-match csv files
+        output_bucket: bucket of the compacted parquet files
+
+    Returns:
+        number of source files folded in
+    """
+    partitions = _list_lineups_sources(source_bucket)
+    current_seasons = {}
+    for league, season_code in partitions:
+        current_seasons[league] = max(current_seasons.get(league, season_code), season_code)
+
+    folded = 0
+    for (league, season_code), sources in sorted(partitions.items()):
+        folded += compact_lineups_partition(league, season_code, sources, season_code == current_seasons[league],
+                                            source_bucket, output_bucket)
+    print(f"Folded {folded} lineups files from {len(partitions)} league seasons.")
+    return folded
+
+
+def compact_team_lineups_handler(event, context):
+    """
+    AWS Lambda handler func to compact the per-match team lineups
+    files into (league, season) partitioned parquet files.
+    Args:
+        event:
+        context:
+
+    Returns:
+
+    """
+    folded = compact_team_lineups()
+    return {
+        "statusCode": 200,
+        "folded_files": folded,
+    }
+
+
+def _cached_season_results_pages() -> typing.List[str]:
+    """Urls of the season results pages in the page cache, for replaying crawls offline."""
+    if html_cache is None:
+        raise ValueError("FB_REF_PAGE_CACHE must be set to replay from the page cache.")
+    # never fall back to the network while replaying
+    html_cache.replay = True
+    return sorted(url for url in html_cache.urls() if url.endswith("-Scores-and-Fixtures"))
+
+
+def replay_xg_result_seasons():
+    """
+    Rebuild the xg results file of every season results page in the page
+    cache, without any network access, e.g. after changing the parsing.
+    """
+    for link in _cached_season_results_pages():
+        try:
+            print(f"Replaying: {link}")
+            FBrefSeasonResultsPage(link).save_to_s3(record_link=False)
+        except Exception as e:
+            print(e)
+
+
+def replay_team_lineups():
+    """
+    Rebuild the lineups/managers file of every match report in the page
+    cache, without any network access, e.g. after changing the parsing.
+    """
+    for link in _cached_season_results_pages():
+        season_object = FBrefSeasonResultsPage(link)
+        try:
+            match_links = season_object.match_level_urls
+        except Exception as e:
+            print(e)
+            continue
+        for match_link in match_links:
+            try:
+                match_info = extract_lineup_manaager_info(match_link)
+            except page_cache.PageNotCachedError:
+                continue
+            except Exception as e:
+                print(e)
+                continue
+            match_info['league'] = season_object.league_name
+            match_info['season_code'] = season_object.season_code
+            load_team_lineups(match_info)
+
+
 def scrape_xg_results_handler(event, context):
     version = os.environ['APP_VERSION']
     scrape_xg_result_seasons()
@@ -542,21 +1274,28 @@ def scrape_current_season_xg_results_handler(event, context):
     Lambda function handler that scrapes the current season
     xg results for a given league and stores the results in
     the football-xg-results S3 bucket.
+
+    By default only the new matches of each season are written, as delta
+    files (see FBrefSeasonResultsPage.save_delta_to_s3), {"mode": "full"}
+    rewrites every season file.
     Args:
-        event:
+        event: optional {"mode": "incremental" | "full"}
         context:
 
     Returns:
 
     """
+    mode = (event or {}).get("mode", "incremental")
     for league, url in SCORES_HOME_PAGE_URLS.items():
         try:
             fb_ref_season = FBrefSeasonResultsPage(url)
+            if mode == "full":
+                fb_ref_season.save_to_s3()
+            else:
+                fb_ref_season.save_delta_to_s3()
         except Exception as e: # Some leagues may not have started (empty data can give rise to exceptions based on inferred types) 
             print(e)
             continue
-        fb_ref_season.save_to_s3()
-        time.sleep(3.2)
 
     return {
         "statusCode": 200,
@@ -586,27 +1325,32 @@ expected_columns = [
     'home_xg',
     'away_xg',
     'date_dt',
+    'home_football_data',
+    'away_football_data',
 ]
 
 
-def standardise_current_xg_results_files_handler(event, context):
+def standardise_xg_results_file(bucket_name: str, file_key: str):
     """
-    Lambda function handler that checks for missing or inconsistent
-    columns, missing data handling before writing to (league, season)
-    partitioned s3 buckets in the Parquet format
-    Args:
-        event:
-        context:
+    Check a raw xg results file for missing or inconsistent columns,
+    handle missing data and write it to the (league, season) partitioned
+    clean bucket in the Parquet format.
 
-    Returns:
+    Delta files merged into their season file (and deleted) before or while
+    they're standardised are skipped, so no orphan parquet file is left.
 
+    Args:
+        bucket_name: raw xg results bucket
+        file_key: key of the raw csv file
     """
-    bucket_name = event['Records'][0]['s3']['bucket']['name']
-    file_key = event['Records'][0]['s3']['object']['key']
-    # Decoding the file key
-    file_key = urllib.parse.unquote_plus(file_key)
-
-    csv_obj = s3.get_object(Bucket=bucket_name, Key=file_key)
+    try:
+        csv_obj = s3.get_object(Bucket=bucket_name, Key=file_key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchKey" and _is_xg_results_delta(file_key):
+            # already merged into its season file by a full rewrite, which deleted it
+            print(f"Skipping {file_key}, the delta file has been merged into its season file.")
+            return
+        raise
     body = csv_obj['Body'].read().decode('utf-8')
 
     df = pd.read_csv(io.StringIO(body))
@@ -619,7 +1363,7 @@ def standardise_current_xg_results_files_handler(event, context):
 
     # we should partition by season and league name , in the folder structure
     league_name = df['league_name'].values[0]
-    season_code = '-'.join([d for d in file_key.split('-') if d.isdigit() and len(d) == 4])  # i only want 'year' digits to be caught here
+    season_code = SEASON_CODE_PATTERN.match(file_key).group(0)
 
     df.drop(columns=['league_name'], inplace=True)
     df['attendance'] = df['attendance'].astype(float)
@@ -627,10 +1371,18 @@ def standardise_current_xg_results_files_handler(event, context):
     df['time'] = df['time'].fillna('missing')
     df['venue'] = df['venue'].fillna('missing')
 
-    # clean penalty shootout affected scorelines (from MLS)
-    pattern = r'\([^)]*\)'
-    df['away_goals'] = df['away_goals'].apply(lambda x: int(re.sub(pattern, '', x).strip()))
-    df['home_goals'] = df['home_goals'].apply(lambda x: int(re.sub(pattern, '', x).strip()))
+    # clean penalty shootout affected scorelines (from MLS), older files kept them in the score and goals
+    scores = parse_scores(df['score'].astype('string'))
+    df['score'] = strip_shootout_scores(df['score'], scores)
+    df['home_goals'] = scores['home_goals']
+    df['away_goals'] = scores['away_goals']
+
+    # football-data.co.uk names of the teams, which the match results are joined to the xg results on
+    team_name_resolver = team_names.fb_ref_to_football_data()
+    # as strings even when no name resolved, so every parquet file has the same schema
+    df['home_football_data'] = team_name_resolver.resolve(df['home']).astype('string')
+    df['away_football_data'] = team_name_resolver.resolve(df['away']).astype('string')
+    team_name_resolver.report_unresolved(pd.concat([df['home'], df['away']]).dropna().unique())
 
     output_columns = expected_columns
     output_buffer = io.BytesIO()
@@ -638,9 +1390,32 @@ def standardise_current_xg_results_files_handler(event, context):
     df[output_columns].to_parquet(output_buffer, index=False)
     output_buffer.seek(0)
 
-    # adopt the '=' in the folders to help Glue infer the partition key column names:
-    s3.put_object(Bucket='football-xg-results-clean', Key=f"league={league_name}/season={season_code}/{file_key}.parquet",
-                  Body=output_buffer.getvalue())
+    clean_key = _clean_xg_results_key(league_name, season_code, file_key)
+    s3.put_object(Bucket=CLEAN_XG_RESULTS_BUCKET, Key=clean_key, Body=output_buffer.getvalue())
+    if _is_xg_results_delta(file_key) and not _object_exists(bucket_name, file_key):
+        # a full rewrite merged and deleted the delta file while it was being standardised,
+        # after deleting its parquet file, so its matches would be in the clean bucket twice
+        s3.delete_object(Bucket=CLEAN_XG_RESULTS_BUCKET, Key=clean_key)
+        print(f"Deleted {clean_key}, the delta file has been merged into its season file.")
+
+
+def standardise_current_xg_results_files_handler(event, context):
+    """
+    Lambda function handler that checks for missing or inconsistent
+    columns, missing data handling before writing to (league, season)
+    partitioned s3 buckets in the Parquet format.
+
+    Every record in the event is processed, so batched S3 events and S3 events
+    forwarded through SQS can standardise many files per invocation.
+
+    Args:
+        event: S3 put event(s) from the football-xg-results bucket, directly or via SQS
+        context:
+
+    Returns:
+        response with any SQS 'batchItemFailures'
+    """
+    return s3_utils.process_s3_event(event, standardise_xg_results_file)
 
 
 class FbrefLeagueHomePageCrawler:
@@ -656,30 +1431,46 @@ class FbrefLeagueHomePageCrawler:
     we can build the url containing the specific data that
     we are interested in, e.g: for goal logs, the required url is
     https://fbref.com/en/squads/7c21e445/2023-2024/goallogs/all_comps/West-Ham-United-Goal-Logs-All-Competitions
+
+    Past seasons' stats pages work the same way, e.g:
+    https://fbref.com/en/comps/9/2022-2023/2022-2023-Premier-League-Stats
     """
     def __init__(self, league_url: str):
         # TODO: it would be more natural to pass in the FBref-style league name, rather than demand the full url
         self.link = league_url
-        self.url_soup = self._get_soup_object(self.link)
+        self.html_tree = self._get_html_tree(self.link)
         self.team_name_map = self.build_display_name_full_name_mapper()
         self.team_squad_links = self.get_squad_links()
-        self.current_season_code = "2024-2025"   # TODO: see if you can reliably infer this
+        self.season_code = self.infer_season_code()
+        # a past season's page links to the next season
+        self.is_current_season = not self.html_tree.xpath(NEXT_SEASON_LINK_XPATH)
         
-    def _get_soup_object(self, link) -> bs:
+    def _get_html_tree(self, link):
         """
-        Get the BeautifulSoup object for the given season
-        level URL.
+        Get the lxml tree of the given URL, every element
+        and table of the page is read from this one parse.
 
         Returns:
-            url_soup
+            html_tree
         """
         print(f"Scraping: {link}")
-        response = requests.get(link)
-        time.sleep(3.2)
-        # can re-use this soup object for more efficient crawling, fewer requests
-        url_soup = bs(response.text, "html.parser")
-        return url_soup
-     
+        # can re-use this tree for more efficient crawling, fewer requests
+        return html_tables.parse_html(_get_page(link))
+
+    def infer_season_code(self) -> str:
+        """
+        Read the season code from the page's heading,
+        e.g: '2023-2024 Premier League Stats', or '2024 Major League Soccer Stats'.
+
+        Returns:
+            season code, e.g 2023-2024
+        """
+        for heading in self.html_tree.xpath(LEAGUE_HEADING_XPATH):
+            season_code = SEASON_CODE_PATTERN.search(heading.text_content())
+            if season_code is not None:
+                return season_code.group(0)
+        raise ValueError(f"Couldn't find the season of {self.link}")
+
     def build_display_name_full_name_mapper(self):
         """
         Build the dictionary that maps a teams abbreviated display 
@@ -688,12 +1479,12 @@ class FbrefLeagueHomePageCrawler:
 
         search_string = 'squads'
         # Find all 'tr' tags inside a 'tbody'
-        league_table = self.url_soup.find('table')
-        table_rows = league_table.select('tbody tr') if league_table else []
-        lookup = {link['href'].split("/")[-1].replace("-Stats", ""): link.text.replace(" vs","")
+        league_table = self.html_tree.find('.//table')
+        table_rows = league_table.xpath('.//tbody//tr') if league_table is not None else []
+        lookup = {link.attrib['href'].split("/")[-1].replace("-Stats", ""): link.text_content().replace(" vs","")
                           for row in table_rows
-                          for link in row.find_all('a', href=True)
-                          if search_string in link['href']}
+                          for link in row.iterfind('.//a[@href]')
+                          if search_string in link.attrib['href']}
         return lookup
 
     def get_squad_links(self) -> typing.List[str]:
@@ -705,12 +1496,12 @@ class FbrefLeagueHomePageCrawler:
         """
 
         # Find all 'tr' tags inside a 'tbody'
-        table_rows = self.url_soup.select('tbody tr')
+        table_rows = self.html_tree.xpath('//tbody//tr')
 
-        filtered_links = ["https://fbref.com"+link['href']
+        filtered_links = ["https://fbref.com"+link.attrib['href']
                           for row in table_rows
-                          for link in row.find_all('a', href=True)
-                          if 'squads' in link['href']]
+                          for link in row.iterfind('.//a[@href]')
+                          if 'squads' in link.attrib['href']]
 
         return list(set(filtered_links))
 
@@ -721,92 +1512,161 @@ class FbrefLeagueHomePageCrawler:
         """
         squad_base_url = "/".join(squad_url.split("/")[:-1])+"/"
         end_of_url = squad_url.split("/")[-1]
+        # past seasons' squad urls already contain their season code
+        squad_base_url = squad_base_url.replace(f"/{season_code}/", "/")
         goal_log_url = squad_base_url + season_code + "/goallogs/all_comps/" + end_of_url.replace("-Stats","-Goal-Logs-All-Competitions")
         return goal_log_url
-    
-    def extract_and_load_goal_log(self, squad_link, season_code):
+
+    def _get_goal_log_key(self, squad_link, season_code) -> str:
         """
-        Extract and load goal log data for the given squad, season
-        into S3.
+        The s3 key of the goal log of the given squad, season.
         """
-        goal_log_url = self._get_goal_log_url(squad_link, self.current_season_code)
         full_team_name = squad_link.split("/")[-1].replace("-Stats","")
         display_name = self.team_name_map[full_team_name] # we need this string as this is what's used to identify teams in the other fbref tables
-        goal_log_url_soup = self._get_soup_object(goal_log_url)
-        table = goal_log_url_soup.find_all("table")
-        
-        # in cases at start of seasons if no goals are recorded:
-        try:
-            goals_for = pd.read_html(str(table))[0]
-        except ValueError as exc:
-            if str(exc).strip() == "No tables found":
-                goals_for = pd.DataFrame(columns=GOAL_LOG_COLUMNS)
-        
-        for col in GOAL_LOG_COLUMNS:
-            if col.lower() not in [c.lower() for c in goals_for.columns.tolist()]:
-                goals_for[col] = None
-        goals_for['for_or_against'] = 'for'
+        return f"team={display_name}/{season_code}-{full_team_name}-goals-log.parquet"
 
+    def _is_goal_log_finalised(self, squad_link, season_code) -> bool:
+        """
+        Whether the goal log of the given squad, season is
+        already in s3 and was written after the season ended.
+        """
         try:
-            goals_against = pd.read_html(str(table))[1]
-        except ValueError as exc:
-            if str(exc).strip() == "No tables found":
-                goals_against = pd.DataFrame(columns=GOAL_LOG_COLUMNS)
-
-        for col in GOAL_LOG_COLUMNS:
-            if col.lower() not in [c.lower() for c in goals_against.columns.tolist()]:
-                goals_against[col] = None
-        goals_against['for_or_against'] = 'against'
-
-        df = pd.concat([goals_for[GOAL_LOG_COLUMNS], goals_against[GOAL_LOG_COLUMNS]])
-
-        for col in GOAL_LOG_COLUMNS:
-            if col.lower() == 'rk':
-                df[col] = df[col].astype(int)
-            elif col.lower() in ['xg','psxg', 'distance']:
-                df[col] = df[col].astype(float)
-            else:
-                df[col] = df[col].astype(str)
+            response = s3.head_object(Bucket=GOAL_LOGS_BUCKET, Key=self._get_goal_log_key(squad_link, season_code))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return response.get("Metadata", {}).get(GOAL_LOG_FINALISED_METADATA) == "true"
+    
+    def extract_and_load_goal_log(self, squad_link, season_code):
+        """
+        Extract and load goal log data for the given squad, season
+        into S3. The goal logs of past seasons are marked as
+        finalised, they won't change any more.
+        """
+        goal_log_url = self._get_goal_log_url(squad_link, season_code)
+        file_key = self._get_goal_log_key(squad_link, season_code)
+        print(f"Scraping: {goal_log_url}")
+        df = parse_goal_log(_get_page(goal_log_url))
 
         output_buffer = io.BytesIO()
         df.to_parquet(output_buffer, index=False)
         output_buffer.seek(0)
-        file_key = f"{season_code}-{full_team_name}-goals-log"
-        resp = s3.put_object(Bucket='football-goal-logs-raw', 
-                      Key=f"team={display_name}/{file_key}.parquet",
-                      Body=output_buffer.getvalue())        
+        finalised = not self.is_current_season
+        resp = s3.put_object(Bucket=GOAL_LOGS_BUCKET, 
+                      Key=file_key,
+                      Body=output_buffer.getvalue(),
+                      Metadata={GOAL_LOG_FINALISED_METADATA: str(finalised).lower()})
         if resp['ResponseMetadata']['HTTPStatusCode'] == 200:
-            print(f"Uploaded {file_key}.parquet to s3")
+            print(f"Uploaded {file_key} to s3")
         return
         
-    def extract_and_load_all_teams_goal_logs(self):
+    def extract_and_load_all_teams_goal_logs(self, max_workers: int = GOAL_LOG_FETCH_WORKERS) -> typing.List[str]:
         """
-        Extract and load the goal logs for each team
-        for this current season.
+        Extract and load the goal logs for each team for the page's
+        season, skipping the teams whose goal log is already finalised.
+        The goal logs are fetched concurrently through the module's
+        shared client, so still at its rate limit.
+
+        Args:
+            max_workers: goal logs fetched and parsed concurrently
+
+        Returns:
+            squad links whose goal log failed to load
         """
-        for squad_link in self.team_squad_links:
-            self.extract_and_load_goal_log(squad_link, self.current_season_code)
-            time.sleep(3.5)
-    
+        def load(squad_link) -> str:
+            try:
+                if self._is_goal_log_finalised(squad_link, self.season_code):
+                    return "finalised"
+                self.extract_and_load_goal_log(squad_link, self.season_code)
+                return "loaded"
+            except Exception as e:
+                print(f"Failed to load the {self.season_code} goal log of {squad_link}: {e!r}")
+                return "failed"
+
+        squad_links = self.team_squad_links
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(load, squad_links))
+        skipped = outcomes.count("finalised")
+        if skipped:
+            print(f"Skipped {skipped} finalised {self.season_code} goal logs.")
+        return [squad_link for squad_link, outcome in zip(squad_links, outcomes) if outcome == "failed"]
+
+
+def _generate_league_stats_url(comp_no, league_name, year=None):
+    """
+    The league's stats home page url for the season ending in the
+    given year, or for the current season if no year is given.
+    """
+    if year is None:
+        return f"https://fbref.com/en/comps/{comp_no}/{league_name}-Stats"
+    season_code = create_season_code(league_name, year)
+    return f"https://fbref.com/en/comps/{comp_no}/{season_code}/{season_code}-{league_name}-Stats"
+
+
+def crawl_goal_logs(
+    leagues: typing.Optional[typing.List[str]] = None,
+    years: typing.Optional[typing.List[typing.Optional[int]]] = None,
+    max_workers: int = GOAL_LOG_FETCH_WORKERS,
+) -> typing.List[str]:
+    """
+    Extract and load the goal logs of every team of the given
+    leagues and seasons, skipping the finalised ones.
+
+    Args:
+        leagues: league names, defaults to every league of COMPETITION_NUMBER_LEAGUE_MAP
+        years: years the seasons end in, None for the current season, defaults to the current season only
+        max_workers: goal logs fetched and parsed concurrently
+
+    Returns:
+        the league stats and squad links that failed to load
+    """
+    if years is None:
+        years = [None]
+    failed = []
+    for comp_no, league_name in COMPETITION_NUMBER_LEAGUE_MAP.items():
+        if leagues is not None and league_name not in leagues:
+            continue
+        for year in years:
+            league_url = _generate_league_stats_url(comp_no, league_name, year)
+            try:
+                crawler = FbrefLeagueHomePageCrawler(league_url)
+            except Exception as e:
+                print(f"Failed to read the teams of {league_url}: {e!r}")
+                failed.append(league_url)
+                continue
+            failed.extend(crawler.extract_and_load_all_teams_goal_logs(max_workers=max_workers))
+    print(f"Goal logs crawled, {len(failed)} failures.")
+    return failed
+
 
 def extract_and_load_current_season_goal_log_handler(event, context):
     """
-    Lambda handler function that scrapes the current season 
-    goal logs for each team and loads to the s3 location.
+    Lambda handler function that scrapes the goal logs of
+    each team and loads them to the s3 location. By default
+    the current season of every league, the event can narrow
+    the leagues and ask for past seasons, e.g:
+    {"leagues": ["Premier-League"], "years": [2023, 2024]}
+
+    Every league's current season takes about 10 minutes at
+    the rate limit, so it's scheduled as one invocation per
+    league, staggered to keep to the rate limit (see
+    terraform/cloudwatch.tf).
     """
 
-    crawler = FbrefLeagueHomePageCrawler("https://fbref.com/en/comps/9/Premier-League-Stats")
-    crawler.extract_and_load_all_teams_goal_logs()
+    event = event or {}
+    failed = crawl_goal_logs(leagues=event.get("leagues"), years=event.get("years"))
 
     return {
         "statusCode": 200,
         "headers": {
             "Content-Type": "application/json"},
+        "body": json.dumps({"failed": failed}),
     }
 
 
 if __name__ == "__main__":
-    valid_functions = ["xg", "lineups"]
+    valid_functions = ["xg", "lineups", "replay-xg", "replay-lineups", "compact-lineups", "goal-logs"]
 
     if len(sys.argv) < 2:
         print(f"Please provide a function name as an argument. Valid options are: {', '.join(valid_functions)}")
@@ -818,5 +1678,13 @@ if __name__ == "__main__":
         scrape_xg_result_seasons()
     elif func_name == "lineups":
         scrape_team_lineups()
+    elif func_name == "replay-xg":
+        replay_xg_result_seasons()
+    elif func_name == "replay-lineups":
+        replay_team_lineups()
+    elif func_name == "compact-lineups":
+        compact_team_lineups()
+    elif func_name == "goal-logs":
+        crawl_goal_logs(years=[None] + list(range(2024, 2013, -1)))
     else:
         raise ValueError(f"Please provide one of {', '.join(valid_functions)} for the function name to call.")
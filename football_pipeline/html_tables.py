@@ -0,0 +1,204 @@
+"""
+Targeted extraction of html tables into DataFrames, straight from an
+lxml tree of the page.
+
+pd.read_html parses a whole document and builds a DataFrame for every
+table in it. The functions here read only the selected tables, while
+reproducing pd.read_html's parsing of each table (hidden elements, header
+row inference, colspan/rowspan expansion, whitespace and type handling),
+so the frames are identical to pd.read_html(...)[i] of the same tables.
+"""
+
+import copy
+import csv
+import io
+import re
+import typing
+
+import lxml.html
+import pandas as pd
+from pandas.errors import EmptyDataError
+
+# same as pd.read_html
+_RE_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
+_RE_NAMESPACE = {"re": "http://exslt.org/regular-expressions"}
+_HAS_TEXT_XPATH = ".//text()[re:test(., '.+')]"
+
+
+def parse_html(html: str) -> lxml.html.HtmlElement:
+    """
+    Parse a html page into an lxml tree.
+
+    Args:
+        html: page html
+
+    Returns:
+        root element of the page
+    """
+    return lxml.html.document_fromstring(html)
+
+
+def _is_hidden(element) -> bool:
+    return "display:none" in element.attrib.get("style", "").replace(" ", "")
+
+
+def _cells(row) -> list:
+    # direct <td>/<th> children only, the row may be a <thead> missing its <tr>
+    return [cell for cell in row if cell.tag == "td" or cell.tag == "th"]
+
+
+def _header_rows(table) -> list:
+    rows = []
+    for thead in table.iterfind(".//thead"):
+        rows.extend(thead.iterfind("tr"))
+        if _cells(thead):
+            rows.append(thead)
+    return rows
+
+
+def _expand_colspan_rowspan(rows) -> typing.List[list]:
+    """
+    Text of the cells of each row, with the text of cells spanning several
+    columns or rows repeated in each of them.
+    """
+    all_texts = []
+    remainder = []  # (column index, text, rows left) of cells spanning down from previous rows
+
+    for tr in rows:
+        texts = []
+        next_remainder = []
+        index = 0
+        for td in _cells(tr):
+            while remainder and remainder[0][0] <= index:
+                prev_i, prev_text, prev_rowspan = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_i, prev_text, prev_rowspan - 1))
+                index += 1
+
+            text = _RE_WHITESPACE.sub(" ", td.text_content()).strip()
+            rowspan = int(td.get("rowspan") or 1)
+            colspan = int(td.get("colspan") or 1)
+            for _ in range(colspan):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+
+        for prev_i, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_i, prev_text, prev_rowspan - 1))
+
+        all_texts.append(texts)
+        remainder = next_remainder
+
+    while remainder:
+        next_remainder = []
+        texts = []
+        for prev_i, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_i, prev_text, prev_rowspan - 1))
+        all_texts.append(texts)
+        remainder = next_remainder
+
+    return all_texts
+
+
+def read_table(table) -> pd.DataFrame:
+    """
+    Read a single html table into a DataFrame, exactly like pd.read_html would.
+
+    Args:
+        table: lxml <table> element
+
+    Returns:
+        the table's DataFrame
+
+    Raises:
+        ValueError: the table is hidden, has no text or no cells
+    """
+    if _is_hidden(table) or not table.xpath(_HAS_TEXT_XPATH, namespaces=_RE_NAMESPACE):
+        raise ValueError("No tables found")
+    hidden_elements = [element for element in table.iterfind(".//*[@style]") if _is_hidden(element)]
+    if hidden_elements:
+        # pd.read_html drops hidden elements, work on a copy to leave the page's tree intact
+        table = copy.deepcopy(table)
+        for element in [element for element in table.iterfind(".//*[@style]") if _is_hidden(element)]:
+            element.getparent().remove(element)
+
+    header_rows = _header_rows(table)
+    body_rows = list(table.iterfind(".//tbody//tr")) + list(table.iterfind("tr"))
+    footer_rows = list(table.iterfind(".//tfoot//tr"))
+    if not header_rows:
+        # no <thead>, the top rows of only <th> cells are the header
+        while body_rows and all(cell.tag == "th" for cell in _cells(body_rows[0])):
+            header_rows.append(body_rows.pop(0))
+
+    head = _expand_colspan_rowspan(header_rows)
+    body = _expand_colspan_rowspan(body_rows)
+    foot = _expand_colspan_rowspan(footer_rows)
+
+    header = None
+    if head:
+        body = head + body
+        if len(head) == 1:
+            header = 0
+        else:
+            # ignore all-empty-text rows
+            header = [i for i, row in enumerate(head) if any(text for text in row)]
+    body += foot
+
+    # pad out ragged rows
+    if body:
+        width = max(len(row) for row in body)
+        body = [row + [""] * (width - len(row)) for row in body]
+
+    # pd.read_html hands the cells to the python csv parser, parse them with the same (public) read_csv options
+    csv_buffer = io.StringIO()
+    csv.writer(csv_buffer, lineterminator="\n").writerows(body)
+    csv_buffer.seek(0)
+    try:
+        return pd.read_csv(csv_buffer, header=header, thousands=",", decimal=".", engine="python")
+    except EmptyDataError:
+        raise ValueError("No tables found")
+
+
+def read_tables(tables: typing.Iterable, limit: typing.Optional[int] = None) -> typing.List[pd.DataFrame]:
+    """
+    Read html tables into DataFrames, skipping the tables pd.read_html would
+    skip (hidden, without text or cells).
+
+    Args:
+        tables: lxml <table> elements, e.g. from an xpath query of the page
+        limit: stop after reading this many tables
+
+    Returns:
+        the tables' DataFrames
+    """
+    frames = []
+    for table in tables:
+        if limit is not None and len(frames) >= limit:
+            break
+        try:
+            frames.append(read_table(table))
+        except ValueError:
+            continue
+    return frames
+
+
+def read_first_table(doc, xpath: str) -> typing.Optional[pd.DataFrame]:
+    """
+    Read the first readable table matching an xpath expression, e.g.
+    '//table[@id="goallogs_for"]'.
+
+    Args:
+        doc: lxml tree of the page
+        xpath: xpath expression selecting <table> elements
+
+    Returns:
+        the table's DataFrame, None if there is no such table
+    """
+    frames = read_tables(doc.xpath(xpath), limit=1)
+    return frames[0] if frames else None
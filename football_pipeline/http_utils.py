@@ -0,0 +1,209 @@
+"""
+Shared helpers for making polite HTTP requests to the
+data provider websites from the scrapers.
+"""
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import threading
+import time
+import typing
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Responses worth retrying: rate limited or a transient server error
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens are added at a steady `rate` per second up to `capacity`, and
+    every request spends one. Callers reserve their token up front and
+    then sleep for their own share of the wait, so concurrent callers are
+    released in order and at exactly the configured rate.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: tokens (requests) allowed per second
+            capacity: maximum burst of requests allowed after an idle period
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until the requested number of tokens is available.
+
+        Returns:
+            seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """
+        Hold back every caller for at least the given number of seconds,
+        e.g. after the server asked us to back off.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class HostRateLimiter:
+    """
+    Keeps a separate token bucket per host, so that requests to
+    each website are rate limited independently of each other.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, host_rates: typing.Optional[typing.Dict[str, float]] = None):
+        """
+        Args:
+            rate: default requests per second allowed for any host
+            capacity: maximum burst of requests per host
+            host_rates: optional per-host overrides of `rate`, keyed by host name
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.host_rates = host_rates or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.host_rates.get(host, self.rate), self.capacity)
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """
+        Block until a request to the host of the given url is allowed.
+
+        Returns:
+            seconds spent waiting
+        """
+        return self._get_bucket(urlparse(url).netloc).acquire()
+
+    def pause(self, url: str, seconds: float):
+        """Hold back every request to the host of the given url for the given number of seconds."""
+        self._get_bucket(urlparse(url).netloc).pause(seconds)
+
+
+def parse_retry_after(response: requests.Response) -> typing.Optional[float]:
+    """
+    Seconds to wait before retrying, from the Retry-After header of the
+    response, which is either a number of seconds or an HTTP date.
+
+    Returns:
+        seconds to wait, None if the header is missing or invalid
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpClient:
+    """
+    Rate limited HTTP client for the scrapers.
+
+    Requests go through one pooled keep-alive requests.Session, so repeat
+    requests to a website re-use its connections instead of paying for a
+    new TCP/TLS handshake each time. Every request (including retries) is
+    paced by a per-host rate limiter, and rate limited (429) or transient
+    server error (5xx) responses and connection errors are retried with
+    exponential backoff, waiting at least as long as the server's Retry-After.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: HostRateLimiter,
+        max_retries: int = 4,
+        backoff_factor: float = 5.0,
+        max_retry_wait: float = 300.0,
+        timeout: float = 30.0,
+        pool_maxsize: int = 10,
+    ):
+        """
+        Args:
+            rate_limiter: limiter pacing the requests to each host
+            max_retries: maximum number of retries of a request
+            backoff_factor: seconds to wait before the first retry, doubled for each further retry
+            max_retry_wait: longest wait before a retry, if the server asks for a longer
+                wait the request isn't retried
+            timeout: connect/read timeout of each request in seconds
+            pool_maxsize: number of keep-alive connections kept per host
+        """
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_retry_wait = max_retry_wait
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Rate limited GET request, retried on 429/5xx responses and connection errors.
+
+        Args:
+            url: url to request
+            kwargs: passed on to requests.Session.get, e.g. headers
+
+        Returns:
+            the response, which is the last failed response if the retries ran out
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                wait = self.backoff_factor * 2 ** attempt
+                print(f"Request to {url} failed ({e!r}), retrying in {wait:.1f}s.")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                wait = max(self.backoff_factor * 2 ** attempt, parse_retry_after(response) or 0.0)
+                if wait > self.max_retry_wait:
+                    print(f"Request to {url} returned {response.status_code}, asked to wait {wait:.0f}s, giving up.")
+                    return response
+                print(f"Request to {url} returned {response.status_code}, retrying in {wait:.1f}s.")
+            # back off every request to the host, not just this one
+            self.rate_limiter.pause(url, wait)
+            attempt += 1
@@ -5,25 +5,53 @@ processing of data from football-data.co.uk.
 Author: Padraig Cleary
 """
 
-from datetime import datetime
+import codecs
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 import io
 import json
+import os
 import time
 from functools import cached_property
 import re
 import sys
+import typing
 from urllib.parse import urljoin
 import urllib.parse
 
-import awswrangler as wr
 import boto3
+from botocore.exceptions import ClientError
 from bs4 import BeautifulSoup
 import pandas as pd
-import requests
+import pyarrow as pa
 
-from football_pipeline import common, s3_utils
+from football_pipeline import http_utils, s3_utils
 
 RAW_FOOTBALL_DATA_CO_UK_BUCKET = 'football-data-co-uk-raw'
+CLEAN_FOOTBALL_DATA_CO_UK_BUCKET = 'football-data-co-uk-clean'
+
+# Politeness budget towards football-data.co.uk, shared by every download in this process.
+# Defaults to the one request every 1.5 seconds that the sequential loader used to sleep for.
+REQUESTS_PER_SECOND = float(os.environ.get('FOOTBALL_DATA_CO_UK_REQUESTS_PER_SECOND', 1 / 1.5))
+DEFAULT_MAX_WORKERS = 4
+
+# Outcomes of loading a season file to the raw bucket
+LOADED = 'loaded'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+rate_limiter = http_utils.HostRateLimiter(rate=REQUESTS_PER_SECOND)
+# Pooled client for every request to football-data.co.uk, with a timeout and retries of
+# rate limited/5xx responses and connection errors, paced by the rate limiter
+http_client = http_utils.HttpClient(rate_limiter, pool_maxsize=DEFAULT_MAX_WORKERS)
+
+# Persisted catalog of the season files listed on each country page, see FootballDataSeasonCatalog
+SEASON_CATALOG_BUCKET = 'football-misc'
+SEASON_CATALOG_KEY = 'football_data_co_uk_season_catalog.json'
+SEASON_CATALOG_MAX_AGE = timedelta(days=float(os.environ.get('FOOTBALL_DATA_CO_UK_CATALOG_MAX_AGE_DAYS', 7)))
+
+s3 = boto3.client('s3')
 
 CLEAN_FOOTBALL_DATA_CO_UK_COLUMNS = [
     'Div', 'Date', 'Time', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'FTR', 'HTHG', 'HTAG',
@@ -39,6 +67,29 @@ CLEAN_FOOTBALL_DATA_CO_UK_COLUMNS = [
     'PCAHH', 'PCAHA', 'MaxCAHH', 'MaxCAHA', 'AvgCAHH', 'AvgCAHA'
 ]
 
+# Explicit types of the clean parquet files, every other clean column is a price/handicap (float32)
+DICTIONARY_COLUMNS = ['Div', 'HomeTeam', 'AwayTeam', 'FTR', 'HTR']
+STRING_COLUMNS = ['Time', 'Referee']
+GOAL_AND_CARD_COLUMNS = ['FTHG', 'FTAG', 'HTHG', 'HTAG', 'HY', 'AY', 'HR', 'AR']
+MATCH_STAT_COLUMNS = ['HS', 'AS', 'HST', 'AST', 'HF', 'AF', 'HC', 'AC']
+
+
+def _clean_column_type(col: str) -> pa.DataType:
+    if col == 'Date':
+        return pa.date32()
+    if col in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    if col in STRING_COLUMNS:
+        return pa.string()
+    if col in GOAL_AND_CARD_COLUMNS:
+        return pa.int8()
+    if col in MATCH_STAT_COLUMNS:
+        return pa.int16()
+    return pa.float32()
+
+
+CLEAN_FOOTBALL_DATA_CO_UK_SCHEMA = pa.schema([(col, _clean_column_type(col)) for col in CLEAN_FOOTBALL_DATA_CO_UK_COLUMNS])
+
 COUNTRY_URL_LOOKUP = {
     'England': 'https://www.football-data.co.uk/englandm.php',
     'Scotland': 'https://www.football-data.co.uk/scotlandm.php',
@@ -74,50 +125,209 @@ def custom_date_parser(date_str: str) -> datetime.date:
     return datetime.strptime(date_str, date_format).date()
 
 
+def parse_dates(dates: pd.Series) -> pd.Series:
+    """
+    Vectorised equivalent of applying custom_date_parser to every
+    value of a date column. A season only has a few dozen distinct
+    match days, so each distinct date string is parsed once and the
+    results are mapped back onto the whole column.
+
+    Args:
+        dates: raw 'Date' column of a football-data.co.uk file
+
+    Returns:
+        Series of datetime.date objects, aligned with the input
+    """
+    parsed_dates = {date_str: custom_date_parser(date_str) for date_str in dates.unique()}
+    return dates.map(parsed_dates)
+
+
+def flip_referee_names(referees: pd.Series) -> pd.Series:
+    """
+    Vectorised clean up of referee names written as 'Surname, Forename',
+    flipping the comma separated parts into 'Forename Surname'.
+
+    Args:
+        referees: 'Referee' column, already cast to str
+
+    Returns:
+        cleaned referee names
+    """
+    has_comma = referees.str.contains(",", regex=False)
+    if has_comma.any():
+        referees = referees.copy()
+        referees[has_comma] = referees[has_comma].str.split(",").str[::-1].str.join(" ")
+    return referees
+
+
 def is_valid_col(s):
     is_not_empty = bool(s.strip()) and any(char.isalnum() for char in s)
     return is_not_empty
 
 
-def clean_excess_delimiters(full_s3_path, encoding) -> pd.DataFrame:
+def detect_encoding(file_bytes: bytes) -> str:
+    """
+    Sniff the encoding of a raw football-data.co.uk file from its bytes.
+    Files are either utf-8 (occasionally with a BOM) or Windows-encoded;
+    cp1252 is the only other encoding used that I've seen so far.
+
+    Args:
+        file_bytes: raw contents of the file
+
+    Returns:
+        encoding name to decode the file with
+    """
+    if file_bytes.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    # validate in chunks, so the whole file is never held decoded in memory
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    file_view = memoryview(file_bytes)
+    chunk_size = 1 << 20
+    try:
+        for i in range(0, len(file_view), chunk_size):
+            decoder.decode(file_view[i:i + chunk_size])
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return 'cp1252'
+    return 'utf-8'
+
+
+def header_columns(header_line: str) -> typing.List[str]:
+    """
+    Column names of the header row of a raw file, without the trailing
+    run of empty column names left behind by excess comma delimiters.
+    Empty names between real columns are kept, they name a real column.
+    """
+    column_list = header_line.split(',')
+    while column_list and not is_valid_col(column_list[-1]):
+        column_list.pop()
+    return column_list
+
+
+def has_excess_delimiters(header_line: str) -> bool:
+    """
+    Check the header row of a raw file for the trailing empty column
+    names left behind by excess comma delimiters, and only those: a
+    header with empty names between its real columns is read as is.
+    """
+    column_list = header_columns(header_line)
+    return len(column_list) < len(header_line.split(',')) and all(is_valid_col(c) for c in column_list)
+
+
+class ExcessDelimiterReader:
+    """
+    Read-only, file-like view over a raw football-data.co.uk csv file
+    that repairs excess comma delimiters as the csv parser consumes it.
+
+    The expected number of columns is inferred from the header row, less
+    its trailing empty column names. The rest of the file is decoded a
+    block at a time and every row is clipped to that many fields, so no
+    repaired copy of the whole file is built in memory.
+    """
+
+    def __init__(self, text_stream: typing.TextIO, block_size: int = 1 << 20):
+        """
+        Args:
+            text_stream: decoded text stream of the raw file, with universal newlines
+            block_size: number of characters to decode and repair at a time
+        """
+        self._stream = text_stream
+        self._block_size = block_size
+        header_line = text_stream.readline().rstrip('\n')
+        column_list = header_columns(header_line)  # infer the expected number of columns from row 1
+        self.expected_column_count = len(column_list)
+        # matches the first expected_column_count fields of a row; quicker than split/join on ~100 column rows
+        self._leading_fields = re.compile(r"(?:[^,]*,){%d}[^,]*" % max(self.expected_column_count - 1, 0))
+        self._buffer = ','.join(column_list) + '\n'
+        self._partial_line = ''
+
+    def _read_block(self) -> str:
+        block = self._stream.read(self._block_size)
+        if not block:
+            lines = [self._partial_line] if self._partial_line else []
+            self._partial_line = ''
+        else:
+            lines = (self._partial_line + block).split('\n')
+            self._partial_line = lines.pop()  # may be cut off mid-row, carry over to the next block
+        if not lines:
+            return ''
+
+        expected_column_count = self.expected_column_count
+        clipped_lines = []
+        for line in lines:
+            line = line.strip()
+            if line.count(',') >= expected_column_count:  # could a row ever have fewer columns than expected?
+                line = self._leading_fields.match(line).group()
+            clipped_lines.append(line)
+        return '\n'.join(clipped_lines) + '\n'
+
+    def read(self, size: int = -1) -> str:
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            block = self._read_block()
+            if not block and not self._partial_line:
+                break
+            chunks.append(block)
+            length += len(block)
+        data = ''.join(chunks)
+        if size < 0:
+            size = len(data)
+        self._buffer = data[size:]
+        return data[:size]
+
+    def __iter__(self):
+        return iter(io.StringIO(self.read()))
+
+
+def clean_excess_delimiters(file_bytes: bytes, encoding) -> pd.DataFrame:
     """
     Function to clean up any excess comma delimiter issues in the 
     raw football-data.co.uk csv files.
 
+    The file is decoded and repaired a block at a time as it is parsed,
+    rather than materialising decoded and cleaned copies of the whole file.
+
     Args:
-        full_s3_path: the full s3 path to the file, e.g: s3://my-bucket/my-folder/my-file.csv
+        file_bytes: raw contents of the file
         encoding: the encoding to use when reading the file
     """
-
-    # download the s3 object to a buffer object
-    buffer = io.BytesIO()
-    wr.s3.download(path=full_s3_path, local_file=buffer)
-
-    with io.BytesIO() as outfile:
-        i = 0
-        for line in buffer.getvalue().decode(encoding).splitlines():
-
-            if i == 0:
-                column_list = [c for c in line.split(',') if is_valid_col(c)] # infer the expected number of columns from row 1
-                expected_column_count = len(column_list)
-                cleaned_header_line = ','.join(column_list)
-                if '\n' not in cleaned_header_line:
-                    cleaned_header_line = cleaned_header_line+'\n'
-                outfile.write(cleaned_header_line.encode('utf-8'))
-            else:
-                columns = line.strip().split(',')
-                if len(columns) > expected_column_count:  # could len(columns) ever be < expected_column_count?
-                    columns = columns[:expected_column_count]
-                cleaned_line = ','.join(columns) + '\n'
-                outfile.write(cleaned_line.encode('utf-8'))
-            i = i+1
-
-        # If this fails; throw the error 
-        outfile.seek(0)
-        df = pd.read_csv(outfile)
+    with io.TextIOWrapper(io.BytesIO(file_bytes), encoding=encoding) as text_stream:
+        # If this fails; throw the error
+        df = pd.read_csv(ExcessDelimiterReader(text_stream))
     return df
 
 
+def read_raw_football_data_co_uk_csv_file(bucket_name, file_key) -> pd.DataFrame:
+    """
+    Read a raw football-data.co.uk csv file from S3 into a dataframe.
+
+    The object is downloaded once; the encoding is sniffed from the bytes
+    and the header is checked for excess delimiters before parsing from
+    the in-memory buffer, rather than re-downloading the file for every
+    encoding/delimiter fallback.
+
+    Args:
+        bucket_name: raw files bucket
+        file_key: key of the raw csv file
+
+    Returns:
+        df: raw dataframe
+    """
+    file_bytes = s3_utils.get_object_bytes(bucket_name, file_key)
+    encoding = detect_encoding(file_bytes)
+
+    header_line = file_bytes.split(b'\n', 1)[0].decode(encoding)
+    if has_excess_delimiters(header_line):
+        return clean_excess_delimiters(file_bytes, encoding)
+
+    try:
+        return pd.read_csv(io.BytesIO(file_bytes), encoding=encoding)
+    except pd.errors.ParserError:
+        # indicative of the excess comma issue in the data rows only
+        return clean_excess_delimiters(file_bytes, encoding)
+
+
 def clean_raw_football_data_co_uk_csv_file(bucket_name, file_key) -> pd.DataFrame:
     """
     Function to remove null/empty rows, clean up the dates and delimiters in 
@@ -126,20 +336,7 @@ def clean_raw_football_data_co_uk_csv_file(bucket_name, file_key) -> pd.DataFram
     Returns:
 
     """
-    s3_bucket_path = f"s3://{bucket_name}/{file_key}"
-    try:
-        df = wr.s3.read_csv(s3_bucket_path, encoding='utf-8')
-    except UnicodeDecodeError:
-        try:
-            df = wr.s3.read_csv(s3_bucket_path, encoding='cp1252') # this is the only other encoding used that I've seen so far
-        except pd.errors.ParserError:
-            # indicative of the excess comma issue present in some files
-            df = clean_excess_delimiters(s3_bucket_path, encoding='cp1252')
-    except pd.errors.ParserError:
-        try:
-            df = clean_excess_delimiters(s3_bucket_path, encoding='utf-8')
-        except UnicodeDecodeError:
-            df = clean_excess_delimiters(s3_bucket_path, encoding='cp1252')
+    df = read_raw_football_data_co_uk_csv_file(bucket_name, file_key)
 
     # Drop null rows
     df.dropna(subset=['Div'], inplace=True)
@@ -147,10 +344,10 @@ def clean_raw_football_data_co_uk_csv_file(bucket_name, file_key) -> pd.DataFram
     # Occasional files have inconsistent use of commas in Referee names, seems to have been a 2001/2002 season issue (all English divs)
     if 'Referee' in df.columns:
         df['Referee'] = df['Referee'].astype(str)  # bugfix for cases where Referee column is read in as object
-        df['Referee'] = df.apply(lambda row: " ".join(row['Referee'].split(',')[::-1]) if ',' in row['Referee'] else row['Referee'], axis=1)
+        df['Referee'] = flip_referee_names(df['Referee'])
     
-    # This is preferable to the previous method of hardcoding date formats based on season. Use custom parser to determine if it's %y or %Y
-    df['Date'] = df['Date'].apply(custom_date_parser)
+    # This is preferable to the previous method of hardcoding date formats based on season. Determine per date if it's %y or %Y
+    df['Date'] = parse_dates(df['Date'])
 
     df['HomeTeam'] = df['HomeTeam'].str.strip()
     df['AwayTeam'] = df['AwayTeam'].str.strip()
@@ -165,7 +362,50 @@ def clean_raw_football_data_co_uk_csv_file(bucket_name, file_key) -> pd.DataFram
         df.drop(columns=unwanted_columns, inplace=True)
 
     return df
-    
+
+
+def to_clean_football_data_co_uk_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Convert a cleaned football-data.co.uk dataframe to an arrow table
+    with the CLEAN_FOOTBALL_DATA_CO_UK_SCHEMA types. Values that can't
+    be parsed as numbers in the numeric columns become nulls.
+
+    Args:
+        df: output of clean_raw_football_data_co_uk_csv_file
+
+    Returns:
+        typed arrow table, ready to be written as parquet
+    """
+    typed_columns = {}
+    for field in CLEAN_FOOTBALL_DATA_CO_UK_SCHEMA:
+        col = df[field.name]
+        if field.name == 'Date':
+            typed_columns[field.name] = col.astype(object).where(col.notna(), None)
+        elif pa.types.is_dictionary(field.type) or pa.types.is_string(field.type):
+            typed_columns[field.name] = col.astype('string')
+        elif pa.types.is_integer(field.type):
+            typed_columns[field.name] = pd.to_numeric(col, errors='coerce').astype(f"Int{field.type.bit_width}")
+        else:
+            typed_columns[field.name] = pd.to_numeric(col, errors='coerce').astype('float32')
+    return pa.Table.from_pandas(pd.DataFrame(typed_columns), schema=CLEAN_FOOTBALL_DATA_CO_UK_SCHEMA, preserve_index=False)
+
+
+def clean_and_load_football_data_co_uk_file(bucket_name: str, file_key: str):
+    """
+    Clean a raw football-data.co.uk csv file and load it to the
+    clean bucket as a typed parquet file.
+
+    Args:
+        bucket_name: raw files bucket
+        file_key: key of the raw csv file
+    """
+    cleaned_df = clean_raw_football_data_co_uk_csv_file(bucket_name, file_key)
+    # keep the country=/league=/season= partitions of the raw file key
+    output_file_key = f"{os.path.splitext(file_key)[0]}.parquet"
+    s3_utils.upload_table_to_s3(CLEAN_FOOTBALL_DATA_CO_UK_BUCKET, output_file_key,
+                                to_clean_football_data_co_uk_table(cleaned_df))
+    print(f"{file_key} cleaned and loaded to s3 as {output_file_key}.")
+
 
 def clean_footballdata_handler(event, context):
     """
@@ -175,23 +415,17 @@ def clean_footballdata_handler(event, context):
     their own data quirks that will probably need further hand-crafted cleaning
     tools.
 
+    Every record in the event is processed, so batched S3 events and S3 events
+    forwarded through SQS can clean many files per invocation.
+
     Args:
-        event: an S3 put event from football-data-co-uk-raw bucket
+        event: S3 put event(s) from football-data-co-uk-raw bucket, directly or via SQS
         context:
 
     Returns:
-
+        response with any SQS 'batchItemFailures'
     """
-    bucket_name = event['Records'][0]['s3']['bucket']['name']
-    file_key = event['Records'][0]['s3']['object']['key']
-    # Decoding the file key
-    file_key = urllib.parse.unquote_plus(file_key)
-    cleaned_df = clean_raw_football_data_co_uk_csv_file(bucket_name, file_key)
-    s3_utils.upload_df_to_s3('football-data-co-uk-clean', file_key=file_key, df=cleaned_df[CLEAN_FOOTBALL_DATA_CO_UK_COLUMNS])
-    print(f"{file_key} cleaned and loaded to s3.")
-    return {
-        'statusCode': 200,
-    }
+    return s3_utils.process_s3_event(event, clean_and_load_football_data_co_uk_file)
 
 
 class FootballDataCountry:
@@ -201,7 +435,13 @@ class FootballDataCountry:
     data from football-data.co.uk
     """
 
-    def __init__(self, country_name: str):
+    def __init__(self, country_name: str, season_urls: typing.Optional[typing.List[str]] = None):
+        """
+        Args:
+            country_name: key of COUNTRY_URL_LOOKUP
+            season_urls: already known season file urls for the country, e.g. from the
+                season catalog; the country page is only scraped when not given
+        """
 
         try:
             self._country_url = COUNTRY_URL_LOOKUP[country_name]
@@ -210,7 +450,7 @@ class FootballDataCountry:
             raise
 
         self._soup = None
-        self._all_season_urls = None
+        self._all_season_urls = season_urls
         self._all_seasons = None
         self._current_seasons = None
         self._country = country_name
@@ -221,13 +461,14 @@ class FootballDataCountry:
 
     @cached_property
     def soup(self):
-        response = requests.get(self._country_url)
-        self._soup = BeautifulSoup(response.content, 'html.parser')
+        response = http_client.get(self._country_url)
+        self._soup = BeautifulSoup(response.content, 'lxml')
         return self._soup
 
     @cached_property
     def all_season_urls(self):
-        self._all_season_urls = self._get_season_level_urls()
+        if self._all_season_urls is None:
+            self._all_season_urls = self._get_season_level_urls()
         return self._all_season_urls
 
     @cached_property
@@ -235,7 +476,7 @@ class FootballDataCountry:
         self._all_seasons = [FootballDataSeason(url, self.country) for url in self.all_season_urls]
         return self._all_seasons
 
-    @property
+    @cached_property
     def current_seasons(self):
         latest_year = max([s.year for s in self.all_seasons])
         self._current_seasons = [s for s in self.all_seasons if s.year == latest_year]
@@ -255,19 +496,14 @@ class FootballDataCountry:
     def _get_country_string(self):
         return self.country_url.split('/')[-1].replace('m.php', '').capitalize()
 
-    def load_current_seasons(self):
+    def load_current_seasons(self, max_workers: int = DEFAULT_MAX_WORKERS):
         """To be used for weekly/daily update jobs."""
-        if self.current_seasons is not []:
-            for season in self.current_seasons:
-                season.upload_to_s3()
-        return
+        return load_seasons(self.current_seasons, max_workers=max_workers)
 
-    def load_all_seasons(self):
+    def load_all_seasons(self, max_workers: int = DEFAULT_MAX_WORKERS):
         """Useful for backfill jobs"""
         print(f"Starting load of {self.country}...")
-        for season in self.all_seasons:
-            season.upload_to_s3()
-            time.sleep(1.5)  # precaution measure to avoid hammering the server
+        return load_seasons(self.all_seasons, max_workers=max_workers)
 
 
 class FootballDataSeason:
@@ -333,16 +569,277 @@ class FootballDataSeason:
 
         return finish_year
 
-    def upload_to_s3(self):
-        file_content = requests.get(self.season_url).content
-        s3 = boto3.resource("s3")
-        key_str = f"country={self.country}/league={self.league_code}/season={self.season_code}/{self.league_code}.csv"
-        print(f"Start loading {key_str} to s3...")
+    @property
+    def s3_key(self) -> str:
+        return f"country={self.country}/league={self.league_code}/season={self.season_code}/{self.league_code}.csv"
+
+    def _get_loaded_file_metadata(self) -> dict:
+        """User metadata stored with the previously loaded raw file, if any."""
+        try:
+            return s3.head_object(Bucket=RAW_FOOTBALL_DATA_CO_UK_BUCKET, Key=self.s3_key)['Metadata']
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return {}
+            raise
+
+    def upload_to_s3(self, force: bool = False) -> str:
+        """
+        Download the season file and load it to the raw bucket, unless it
+        hasn't changed since it was last loaded.
+
+        The HTTP validators (ETag/Last-Modified) and a sha256 of the content are
+        stored as metadata on the raw object. The next download is a conditional
+        request using those validators, and the content hash catches unchanged
+        files the server sends again in full, whose new validators are stored
+        without loading the file again. Skipping the put also means the clean
+        Lambda isn't triggered for an unchanged file.
+
+        Args:
+            force: load the file even if it is unchanged
+
+        Returns:
+            LOADED, UNCHANGED or FAILED
+        """
+        key_str = self.s3_key
         try:
-            s3.Bucket(RAW_FOOTBALL_DATA_CO_UK_BUCKET).put_object(Key=key_str, Body=file_content)
+            previous_metadata = {} if force else self._get_loaded_file_metadata()
+            headers = {}
+            if 'source-etag' in previous_metadata:
+                headers['If-None-Match'] = previous_metadata['source-etag']
+            if 'source-last-modified' in previous_metadata:
+                headers['If-Modified-Since'] = previous_metadata['source-last-modified']
+
+            response = http_client.get(self.season_url, headers=headers)
+            if response.status_code == 304:
+                print(f"{key_str} not modified, skipping.")
+                return UNCHANGED
+            response.raise_for_status()
+
+            file_content = response.content
+            metadata = {
+                'content-sha256': hashlib.sha256(file_content).hexdigest(),
+                'source-etag': response.headers.get('ETag'),
+                'source-last-modified': response.headers.get('Last-Modified'),
+            }
+            metadata = {k: v for k, v in metadata.items() if v}
+            if previous_metadata.get('content-sha256') == metadata['content-sha256']:
+                if previous_metadata != metadata:
+                    # same content under new validators, store them so the next request can be a 304.
+                    # The copy onto the key triggers the clean Lambda, only for this one validators change
+                    print(f"{key_str} unchanged, refreshing its validators.")
+                    s3.copy_object(Bucket=RAW_FOOTBALL_DATA_CO_UK_BUCKET, Key=key_str,
+                                   CopySource={'Bucket': RAW_FOOTBALL_DATA_CO_UK_BUCKET, 'Key': key_str},
+                                   Metadata=metadata, MetadataDirective='REPLACE')
+                else:
+                    print(f"{key_str} unchanged, skipping.")
+                return UNCHANGED
+
+            print(f"Start loading {key_str} to s3...")
+            s3.put_object(Bucket=RAW_FOOTBALL_DATA_CO_UK_BUCKET, Key=key_str, Body=file_content,
+                          Metadata=metadata)
             print("Load succeeded.")
+            return LOADED
         except Exception as e:
             print(e)
+            return FAILED
+
+
+class FootballDataSeasonCatalog:
+    """
+    Persisted catalog of the season files (country, league, season, url)
+    available on football-data.co.uk, stored as a json object in S3.
+
+    Country pages are only re-scraped once their entry is older than
+    SEASON_CATALOG_MAX_AGE, so regular update jobs can go straight to the
+    current season files without fetching and parsing every country page.
+    """
+
+    def __init__(self, countries: typing.Optional[dict] = None):
+        """
+        Args:
+            countries: catalog entries keyed by country name, each of the form
+                {'refreshed_at': iso timestamp, 'seasons': [{'league', 'season_code', 'year', 'url'}]}
+        """
+        self._countries = countries or {}
+        self._modified = False
+
+    @classmethod
+    def load(cls, bucket_name: str = SEASON_CATALOG_BUCKET, file_key: str = SEASON_CATALOG_KEY):
+        """Load the catalog from S3, starting an empty one if it doesn't exist yet."""
+        try:
+            countries = json.loads(s3_utils.get_object_bytes(bucket_name, file_key))
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'NoSuchKey':
+                raise
+            countries = {}
+        return cls(countries)
+
+    def save(self, bucket_name: str = SEASON_CATALOG_BUCKET, file_key: str = SEASON_CATALOG_KEY):
+        """Write the catalog back to S3, if it has been refreshed since it was loaded."""
+        if self._modified:
+            s3.put_object(Bucket=bucket_name, Key=file_key, Body=json.dumps(self._countries, indent=1))
+            self._modified = False
+
+    @property
+    def countries(self) -> typing.List[str]:
+        return list(self._countries)
+
+    def is_fresh(self, country_name: str, max_age: timedelta = SEASON_CATALOG_MAX_AGE) -> bool:
+        """Check if the country has been refreshed within max_age."""
+        entry = self._countries.get(country_name)
+        if not entry:
+            return False
+        refreshed_at = datetime.fromisoformat(entry['refreshed_at'])
+        return datetime.now(timezone.utc) - refreshed_at < max_age
+
+    def update_country(self, country: 'FootballDataCountry'):
+        """Replace the catalog entry of the given country with its scraped season files."""
+        self._countries[country.country] = {
+            'refreshed_at': datetime.now(timezone.utc).isoformat(),
+            'seasons': [
+                {'league': s.league_code, 'season_code': s.season_code, 'year': s.year, 'url': s.season_url}
+                for s in country.all_seasons
+            ],
+        }
+        self._modified = True
+
+    def get_country(self, country_name: str, max_age: timedelta = SEASON_CATALOG_MAX_AGE) -> 'FootballDataCountry':
+        """
+        Get the FootballDataCountry for the given country, built from the catalog
+        if its entry is fresh, otherwise scraped from the country page and
+        updated in the catalog.
+        """
+        if self.is_fresh(country_name, max_age):
+            season_urls = [season['url'] for season in self._countries[country_name]['seasons']]
+            return FootballDataCountry(country_name, season_urls=season_urls)
+        country = FootballDataCountry(country_name)
+        self.update_country(country)
+        return country
+
+    def refresh(self, country_names: typing.Optional[typing.List[str]] = None,
+                max_age: timedelta = SEASON_CATALOG_MAX_AGE):
+        """Re-scrape the pages of the given countries (default: all) whose entries are stale."""
+        for country_name in country_names or list(COUNTRY_URL_LOOKUP):
+            self.get_country(country_name, max_age)
+
+    def seasons(self, country: typing.Optional[str] = None, league: typing.Optional[str] = None,
+                year: typing.Optional[int] = None) -> typing.List[FootballDataSeason]:
+        """
+        Query the catalogued season files.
+
+        Args:
+            country: country name to filter on
+            league: league code to filter on, e.g 'E0'
+            year: season finish year to filter on, e.g 2024 for 2023-2024
+
+        Returns:
+            matching FootballDataSeason objects
+        """
+        return [
+            FootballDataSeason(season['url'], country_name)
+            for country_name, entry in self._countries.items() if country in (None, country_name)
+            for season in entry['seasons']
+            if league in (None, season['league']) and year in (None, season['year'])
+        ]
+
+    def current_seasons(self, country: typing.Optional[str] = None) -> typing.List[FootballDataSeason]:
+        """The season files of the latest year of each (or the given) country."""
+        current_seasons = []
+        for country_name in ([country] if country else self.countries):
+            seasons = self._countries.get(country_name, {}).get('seasons')
+            if seasons:
+                current_seasons += self.seasons(country_name, year=max(season['year'] for season in seasons))
+        return current_seasons
+
+
+def load_seasons(seasons: typing.List[FootballDataSeason], max_workers: int = DEFAULT_MAX_WORKERS,
+                 force: bool = False) -> dict:
+    """
+    Download and load the given season files concurrently. Requests to
+    football-data.co.uk are paced by the shared rate limiter, so the worker
+    threads overlap the HTTP fetches with the s3 uploads rather than
+    increasing the request rate.
+
+    Args:
+        seasons: season files to load
+        max_workers: number of concurrent downloads/uploads
+        force: load the files even if they are unchanged
+
+    Returns:
+        report of the files loaded, unchanged, failed and the throughput
+    """
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        season_futures = {executor.submit(season.upload_to_s3, force): season for season in seasons}
+        return _load_report(season_futures, start_time)
+
+
+def load_countries(country_names: typing.List[str], mode: str = 'update', max_workers: int = DEFAULT_MAX_WORKERS,
+                   force: bool = False, catalog: typing.Optional[FootballDataSeasonCatalog] = None) -> dict:
+    """
+    Load the season files of several countries in parallel. Each country page
+    is scraped in the worker pool and its season files are queued for loading
+    as soon as it is parsed, so different countries are processed concurrently
+    within the same politeness budget.
+
+    Args:
+        country_names: keys of COUNTRY_URL_LOOKUP
+        mode: 'backfill' to load every season, 'update' for current seasons only
+        max_workers: number of concurrent downloads/uploads
+        force: load the files even if they are unchanged
+        catalog: season catalog to look up the country season files in, instead
+            of scraping each country page; stale entries are refreshed in place
+
+    Returns:
+        report of the files loaded, unchanged, failed and the throughput
+    """
+    start_time = time.perf_counter()
+    failed_urls = []
+
+    def get_country_seasons(country_name):
+        country = catalog.get_country(country_name) if catalog else FootballDataCountry(country_name)
+        return country.all_seasons if mode == 'backfill' else country.current_seasons
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        country_futures = {executor.submit(get_country_seasons, name): name for name in country_names}
+        season_futures = {}
+        for future in as_completed(country_futures):
+            try:
+                country_seasons = future.result()
+            except Exception as e:
+                print(f"Failed to get the seasons for {country_futures[future]}: {e}")
+                failed_urls.append(COUNTRY_URL_LOOKUP[country_futures[future]])
+                continue
+            season_futures.update({executor.submit(season.upload_to_s3, force): season for season in country_seasons})
+
+        return _load_report(season_futures, start_time, failed_urls)
+
+
+def _load_report(season_futures: dict, start_time: float, failed_urls: typing.Optional[list] = None) -> dict:
+    """Wait for the season uploads to finish and summarise the load."""
+    failed_urls = failed_urls or []
+    loaded = unchanged = 0
+    for future, season in season_futures.items():
+        outcome = future.result()
+        if outcome == LOADED:
+            loaded += 1
+        elif outcome == UNCHANGED:
+            unchanged += 1
+        else:
+            failed_urls.append(season.season_url)
+
+    elapsed = time.perf_counter() - start_time
+    report = {
+        'files_loaded': loaded,
+        'files_unchanged': unchanged,
+        'files_failed': len(failed_urls),
+        'failed_urls': failed_urls,
+        'seconds': round(elapsed, 2),
+        'files_per_second': round((loaded + unchanged) / elapsed, 3) if elapsed else 0.0,
+    }
+    print(f"Processed {loaded + unchanged} files in {elapsed:.1f}s ({report['files_per_second']} files/s): "
+          f"{loaded} loaded, {unchanged} unchanged, {len(failed_urls)} failed.")
+    return report
 
 
 def scrape_results_handler(event, context):
@@ -359,24 +856,18 @@ def scrape_results_handler(event, context):
 
     """
     mode = event.get('mode', 'update')  # Default to 'update' if mode isn't specified
-
-    if mode == 'backfill':
-        for country_url in COUNTRY_URL_LOOKUP:
-            country = FootballDataCountry(country_url)
-            country.load_all_seasons()
-            time.sleep(0.5)
-        return {
-            'statusCode': 200,
-            'body': json.dumps('Backfill mode executed successfully')
-        }
-
-    elif mode == 'update':
-        for country_url in COUNTRY_URL_LOOKUP:
-            country = FootballDataCountry(country_url)
-            country.load_current_seasons()
+    max_workers = int(event.get('max_workers', DEFAULT_MAX_WORKERS))
+    force = bool(event.get('force', False))  # reload files even if they haven't changed
+    refresh_catalog = bool(event.get('refresh_catalog', False))  # re-scrape the country pages even if the catalog is fresh
+
+    if mode in ('backfill', 'update'):
+        catalog = FootballDataSeasonCatalog() if refresh_catalog else FootballDataSeasonCatalog.load()
+        report = load_countries(list(COUNTRY_URL_LOOKUP), mode=mode, max_workers=max_workers, force=force,
+                                catalog=catalog)
+        catalog.save()
         return {
             'statusCode': 200,
-            'body': json.dumps('Update mode executed successfully')
+            'body': json.dumps({'message': f'{mode.capitalize()} mode executed successfully', **report})
         }
     else:
         return {
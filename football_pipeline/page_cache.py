@@ -0,0 +1,189 @@
+"""
+Cache of the html pages downloaded by the scrapers, so that re-runs and
+parser changes can re-use pages that were already downloaded instead of
+crawling the website again.
+
+Page bodies are stored gzip compressed and content-addressed (keyed by
+the sha256 of the html), and a small json index entry per url points to
+the body and records when the page was fetched and when it expires.
+The cache lives in a local directory or under an s3 prefix.
+"""
+
+from datetime import datetime, timedelta, timezone
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+import typing
+
+import boto3
+from botocore.exceptions import ClientError
+
+from football_pipeline import s3_utils
+
+INDEX_PREFIX = "urls/"
+PAGES_PREFIX = "pages/"
+
+
+class PageNotCachedError(Exception):
+    """Raised for a url missing from the cache when the cache is in replay (offline) mode."""
+
+
+class LocalPageStore:
+    """Cache storage in a local directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        try:
+            return (self.root / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, body: bytes):
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write then rename, so concurrent readers never see a partial file
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+            f.write(body)
+        os.replace(f.name, path)
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).exists()
+
+    def list_keys(self, prefix: str) -> typing.Iterator[str]:
+        for path in sorted((self.root / prefix).rglob("*")):
+            if path.is_file() and not path.name.startswith("tmp"):
+                yield path.relative_to(self.root).as_posix()
+
+
+class S3PageStore:
+    """Cache storage under an s3 bucket prefix."""
+
+    def __init__(self, bucket_name: str, prefix: str = ""):
+        self.bucket_name = bucket_name
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.s3 = boto3.client("s3")
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        try:
+            return s3_utils.get_object_bytes(self.bucket_name, self.prefix + key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def put(self, key: str, body: bytes):
+        self.s3.put_object(Bucket=self.bucket_name, Key=self.prefix + key, Body=body)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.bucket_name, Key=self.prefix + key)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def list_keys(self, prefix: str) -> typing.Iterator[str]:
+        for key in s3_utils.list_object_keys(self.bucket_name, prefix=self.prefix + prefix):
+            yield key[len(self.prefix):]
+
+
+class PageCache:
+    """
+    Url keyed cache of html pages with a per-url time to live.
+
+    In replay mode the cache never goes to the network: expired pages are
+    still served and a page that isn't cached raises PageNotCachedError.
+    """
+
+    def __init__(self, location: str, replay: bool = False):
+        """
+        Args:
+            location: local directory, or s3://bucket/prefix
+            replay: serve only cached pages, including expired ones
+        """
+        self.location = location
+        self.replay = replay
+        if location.startswith("s3://"):
+            bucket_name, _, prefix = location[len("s3://"):].partition("/")
+            self.store = S3PageStore(bucket_name, prefix)
+        else:
+            self.store = LocalPageStore(location)
+
+    @staticmethod
+    def _index_key(url: str) -> str:
+        return f"{INDEX_PREFIX}{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    @staticmethod
+    def _page_key(content_sha256: str) -> str:
+        return f"{PAGES_PREFIX}{content_sha256[:2]}/{content_sha256}.html.gz"
+
+    def _get_entry(self, url: str) -> typing.Optional[dict]:
+        entry = self.store.get(self._index_key(url))
+        return json.loads(entry) if entry is not None else None
+
+    def get(self, url: str) -> typing.Optional[str]:
+        """
+        Get the cached html of a page.
+
+        Args:
+            url: page url
+
+        Returns:
+            page html, None if the page isn't cached or has expired
+
+        Raises:
+            PageNotCachedError: the page isn't cached and the cache is in replay mode
+        """
+        entry = self._get_entry(url)
+        if entry is not None and (self.replay or not self._is_expired(entry)):
+            body = self.store.get(self._page_key(entry["content_sha256"]))
+            if body is not None:
+                return gzip.decompress(body).decode("utf-8")
+        if self.replay:
+            raise PageNotCachedError(f"{url} is not in the page cache at {self.location}")
+        return None
+
+    def put(self, url: str, html: str, ttl: typing.Optional[timedelta] = None):
+        """
+        Cache the html of a page.
+
+        Args:
+            url: page url
+            html: page html
+            ttl: how long the cached page stays valid, None if it never expires
+        """
+        body = html.encode("utf-8")
+        content_sha256 = hashlib.sha256(body).hexdigest()
+        page_key = self._page_key(content_sha256)
+        # identical pages are only stored once
+        if not self.store.exists(page_key):
+            self.store.put(page_key, gzip.compress(body))
+
+        fetched_at = datetime.now(timezone.utc)
+        entry = {
+            "url": url,
+            "content_sha256": content_sha256,
+            "fetched_at": fetched_at.isoformat(),
+            "expires_at": (fetched_at + ttl).isoformat() if ttl is not None else None,
+        }
+        self.store.put(self._index_key(url), json.dumps(entry).encode("utf-8"))
+
+    @staticmethod
+    def _is_expired(entry: dict) -> bool:
+        if entry["expires_at"] is None:
+            return False
+        return datetime.fromisoformat(entry["expires_at"]) <= datetime.now(timezone.utc)
+
+    def urls(self) -> typing.Iterator[str]:
+        """
+        Iterate over the urls of every cached page, e.g. to replay a crawl.
+        """
+        for index_key in self.store.list_keys(INDEX_PREFIX):
+            if index_key.endswith(".json"):
+                yield json.loads(self.store.get(index_key))["url"]
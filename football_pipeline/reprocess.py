@@ -0,0 +1,208 @@
+"""
+Engine to re-process every file in a bucket with one of the pipeline's
+per-file Lambda steps (e.g. after changing the cleaning logic), either
+locally in a process pool or as a batched fan-out to the deployed Lambda
+function, with bounded concurrency, progress reporting and a final
+report of the succeeded and failed keys.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import importlib
+import json
+import multiprocessing
+import time
+import traceback
+import typing
+import urllib.parse
+
+import boto3
+from botocore.config import Config
+
+from football_pipeline import s3_utils
+
+# Per-file functions that can be re-run, the Lambda function that runs them
+# in AWS and the raw bucket that triggers them.
+JOBS = {
+    "standardise-xg": {
+        "function": "football_pipeline.expected_goals.fb_ref.standardise_xg_results_file",
+        "lambda_function_name": "standardise-raw-xg-csvs",
+        "bucket": "football-xg-results",
+        "suffix": ".csv",
+    },
+    "clean-football-data": {
+        "function": "football_pipeline.match_results.football_data_co_uk.clean_and_load_football_data_co_uk_file",
+        "lambda_function_name": "clean_football_data_co_uk",
+        "bucket": "football-data-co-uk-raw",
+        "suffix": ".csv",
+    },
+}
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_BATCH_SIZE = 25
+
+
+def _run_job(job_name: str, bucket_name: str, file_key: str) -> typing.Optional[str]:
+    """
+    Run the job's per-file function on one object.
+
+    Returns:
+        None on success, the formatted exception otherwise
+    """
+    module_name, function_name = JOBS[job_name]["function"].rsplit(".", 1)
+    process_object = getattr(importlib.import_module(module_name), function_name)
+    try:
+        process_object(bucket_name, file_key)
+        return None
+    except Exception:
+        return traceback.format_exc(limit=3)
+
+
+def _run_lambda_batch(lambda_client, job_name: str, bucket_name: str, file_keys: typing.List[str]) -> dict:
+    """
+    Invoke the job's Lambda function synchronously on a batch of objects.
+
+    The batch is sent as SQS-style records wrapping S3 notifications, with the
+    object key as the message id, so the handler reports the failed keys as
+    partial batch failures instead of failing the whole invocation. The keys
+    are url encoded as in real S3 notifications, which the handlers decode.
+
+    Returns:
+        errors keyed by the failed object keys
+    """
+    event = {
+        "Records": [
+            {
+                "eventSource": "aws:sqs",
+                "messageId": file_key,
+                "body": json.dumps({"Records": [{"s3": {
+                    "bucket": {"name": bucket_name},
+                    "object": {"key": urllib.parse.quote_plus(file_key, safe="/")},
+                }}]}),
+            }
+            for file_key in file_keys
+        ]
+    }
+    response = lambda_client.invoke(
+        FunctionName=JOBS[job_name]["lambda_function_name"],
+        InvocationType="RequestResponse",
+        Payload=json.dumps(event),
+    )
+    payload = json.loads(response["Payload"].read() or "null")
+    if "FunctionError" in response:
+        return {file_key: json.dumps(payload) for file_key in file_keys}
+    return {failure["itemIdentifier"]: "failed in lambda" for failure in payload.get("batchItemFailures", [])}
+
+
+class _Progress:
+    """Progress and throughput readout for a re-processing run."""
+
+    def __init__(self, total: int, print_every: int = 25):
+        self.total = total
+        self.print_every = print_every
+        self.done = 0
+        self.failed = 0
+        self.start_time = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    @property
+    def files_per_second(self) -> float:
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+    def update(self, done: int, failed: int):
+        previous = self.done
+        self.done += done
+        self.failed += failed
+        if self.done == self.total or self.done // self.print_every > previous // self.print_every:
+            print(f"[{self.done}/{self.total}] {self.files_per_second:.2f} files/s, {self.failed} failed, "
+                  f"{self.elapsed:.0f}s elapsed")
+
+
+def reprocess_bucket(
+    job_name: str,
+    bucket_name: typing.Optional[str] = None,
+    prefix: str = "",
+    file_keys: typing.Optional[typing.List[str]] = None,
+    mode: str = "local",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    use_processes: bool = True,
+    lambda_client=None,
+) -> dict:
+    """
+    Re-process every file under a bucket prefix with one of the JOBS.
+
+    Args:
+        job_name: key of JOBS
+        bucket_name: bucket of the files to re-process, defaults to the job's raw bucket
+        prefix: only re-process keys starting with this prefix
+        file_keys: explicit keys to re-process, instead of listing the bucket
+        mode: 'local' to run the job in this machine's worker pool, 'lambda' to fan
+            batches of files out to the deployed Lambda function
+        max_workers: number of concurrent worker processes, or concurrent Lambda invocations
+        batch_size: number of files per Lambda invocation
+        use_processes: run local jobs in a process pool (CPU bound cleaning);
+            False uses threads, e.g. to run against an in-process S3 mock
+        lambda_client: boto3 Lambda client for the 'lambda' mode, a new one by default
+
+    Returns:
+        report of the succeeded and failed keys and the throughput
+    """
+    job = JOBS[job_name]
+    bucket_name = bucket_name or job["bucket"]
+    if file_keys is None:
+        file_keys = list(s3_utils.list_object_keys(bucket_name, prefix=prefix, suffix=job["suffix"]))
+    print(f"Re-processing {len(file_keys)} files from s3://{bucket_name}/{prefix} with {job_name} ({mode}).")
+
+    progress = _Progress(len(file_keys))
+    failed = {}
+
+    if mode == "local":
+        if use_processes:
+            # spawn rather than fork, boto3 clients created in this process aren't fork safe
+            executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        with executor:
+            futures = {executor.submit(_run_job, job_name, bucket_name, file_key): file_key for file_key in file_keys}
+            for future in as_completed(futures):
+                error = future.result()
+                if error is not None:
+                    failed[futures[future]] = error
+                progress.update(1, int(error is not None))
+
+    elif mode == "lambda":
+        if lambda_client is None:
+            lambda_client = boto3.client("lambda", config=Config(read_timeout=900, retries={"max_attempts": 0}))
+        batches = [file_keys[i:i + batch_size] for i in range(0, len(file_keys), batch_size)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_run_lambda_batch, lambda_client, job_name, bucket_name, batch): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    batch_failures = future.result()
+                except Exception as e:
+                    batch_failures = {file_key: repr(e) for file_key in batch}
+                failed.update(batch_failures)
+                progress.update(len(batch), len(batch_failures))
+
+    else:
+        raise ValueError(f"mode must be one of: local, lambda (got {mode})")
+
+    report = {
+        "job": job_name,
+        "bucket": bucket_name,
+        "prefix": prefix,
+        "succeeded": [file_key for file_key in file_keys if file_key not in failed],
+        "failed": failed,
+        "seconds": round(progress.elapsed, 2),
+        "files_per_second": round(progress.files_per_second, 3),
+    }
+    print(f"Finished: {len(report['succeeded'])} succeeded, {len(failed)} failed in {report['seconds']}s "
+          f"({report['files_per_second']} files/s).")
+    return report
@@ -1,14 +1,26 @@
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from itertools import islice
+import json
 import logging
-from typing import Set
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+import urllib.parse
 
 import boto3
 from botocore.exceptions import NoCredentialsError
 from botocore.exceptions import ClientError
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 s3 = boto3.client("s3")
 
+# Bound on the number of S3 objects processed concurrently per Lambda invocation
+S3_EVENT_MAX_WORKERS = 4
+# Concurrent GETs, and objects per DataFrame, when reading many objects into DataFrames
+CONSOLIDATE_MAX_WORKERS = 16
+CONSOLIDATE_CHUNK_SIZE = 500
+
 
 def upload_df_to_s3(bucket_name: str, file_key: str, df: pd.DataFrame):
     csv_buffer = StringIO()
@@ -23,6 +35,52 @@ def upload_df_to_s3(bucket_name: str, file_key: str, df: pd.DataFrame):
     return response
 
 
+def upload_table_to_s3(bucket_name: str, file_key: str, table: pa.Table, compression: str = "zstd"):
+    """
+    Write an arrow table to S3 as a parquet file.
+
+    Args:
+        bucket_name: destination bucket
+        file_key: destination key, e.g: league=Premier-League/season=2023-2024/file.parquet
+        table: table to write, with its final column types
+        compression: parquet compression codec
+    """
+    parquet_buffer = BytesIO()
+    pq.write_table(table, parquet_buffer, compression=compression)
+
+    response = s3.put_object(
+        Body=parquet_buffer.getvalue(), Bucket=bucket_name, Key=file_key
+    )
+    print(response)
+
+    return response
+
+
+def get_object_bytes(bucket_name: str, file_key: str) -> bytes:
+    """Download the full body of an S3 object with a single GET request."""
+    obj = s3.get_object(Bucket=bucket_name, Key=file_key)
+    return obj["Body"].read()
+
+
+def list_object_keys(bucket_name: str, prefix: str = "", suffix: str = "") -> Iterator[str]:
+    """
+    Page through all the object keys under a prefix of a bucket.
+
+    Args:
+        bucket_name: bucket to list
+        prefix: only list keys starting with this prefix
+        suffix: only list keys ending with this suffix, e.g: .csv
+
+    Returns:
+        object keys
+    """
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith(suffix):
+                yield obj["Key"]
+
+
 def get_scraped_urls(
     bucket_name="football-misc", file_key="scraped_links.txt"
 ) -> Set:
@@ -155,35 +213,182 @@ def update_team_lineups_file(bucket_name, file_key, new_urls):
     s3.put_object(Body=updated_content, Bucket=bucket_name, Key=file_key)
 
 
+def _read_object_frame(bucket_name: str, file_key: str, file_format: str,
+                       columns: Optional[List[str]], dtype) -> pd.DataFrame:
+    body = BytesIO(get_object_bytes(bucket_name, file_key))
+    if file_format == "csv":
+        return pd.read_csv(body, usecols=columns, dtype=dtype)
+    if file_format == "parquet":
+        df = pd.read_parquet(body, columns=columns)
+        return df.astype(dtype) if dtype is not None else df
+    raise ValueError(f"Unsupported file format {file_format!r}, expected 'csv' or 'parquet'.")
+
+
+def iter_object_frames(
+    bucket_name: str,
+    file_keys: Iterable[str],
+    file_format: str = "csv",
+    columns: Optional[List[str]] = None,
+    dtype=None,
+    key_column: Optional[str] = None,
+    max_workers: int = CONSOLIDATE_MAX_WORKERS,
+    chunk_size: int = CONSOLIDATE_CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read S3 objects of the same schema with concurrent GETs, yielding one
+    DataFrame per chunk of objects, so only a chunk is held in memory at a time.
+
+    Args:
+        bucket_name: bucket of the objects
+        file_keys: keys of the objects, e.g. from list_object_keys
+        file_format: 'csv' or 'parquet'
+        columns: only read these columns
+        dtype: column type(s), as for pd.read_csv, e.g: {'home_player': 'string'}
+        key_column: add a column of each row's object key, with this name
+        max_workers: maximum number of concurrent GETs
+        chunk_size: number of objects per yielded DataFrame
+
+    Returns:
+        DataFrames of the rows of consecutive chunks of objects, in key order
+    """
+    def read(file_key):
+        df = _read_object_frame(bucket_name, file_key, file_format, columns, dtype)
+        if key_column is not None:
+            df[key_column] = file_key
+        return df
+
+    file_keys = iter(file_keys)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            chunk = list(islice(file_keys, chunk_size))
+            if not chunk:
+                return
+            yield pd.concat(executor.map(read, chunk), ignore_index=True)
+
+
+def iter_bucket_frames(
+    bucket: str,
+    s3_prefix: str = "",
+    file_format: str = "csv",
+    **kwargs,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read every csv or parquet object under a prefix of a bucket, in chunks.
+
+    Args:
+        bucket: bucket to read
+        s3_prefix: only read objects under this prefix
+        file_format: 'csv' or 'parquet', only objects with this extension are read
+        kwargs: columns, dtype, key_column, max_workers and chunk_size of iter_object_frames
+
+    Returns:
+        DataFrames of the rows of consecutive chunks of objects
+    """
+    file_keys = list_object_keys(bucket, prefix=s3_prefix, suffix=f".{file_format}")
+    return iter_object_frames(bucket, file_keys, file_format=file_format, **kwargs)
+
+
 def consolidate_all_bucket_csvs(
     bucket: str = "football_pipeline-lineups-and-managers",
     s3_prefix: str = "Premier-League/",
+    columns: Optional[List[str]] = None,
+    dtype=None,
+    file_format: str = "csv",
+    key_column: Optional[str] = "season",
+    max_workers: int = CONSOLIDATE_MAX_WORKERS,
 ) -> pd.DataFrame:
     """
-    Take an s3 bucket, having .csv objects of all the same schema,
-    return a consolidated pandas dataframe from all the csv files.
+    Take an s3 bucket, having .csv (or .parquet) objects of all the same schema,
+    return a consolidated pandas dataframe from all the files.
+
+    The objects are downloaded concurrently and concatenated once at the end,
+    use iter_bucket_frames to process them in chunks instead.
+
     Args:
-        bucket:
-        s3_prefix:
+        bucket: bucket to read
+        s3_prefix: only read objects under this prefix
+        columns: only read these columns
+        dtype: column type(s), as for pd.read_csv
+        file_format: 'csv' or 'parquet'
+        key_column: name of the column of each row's object key, None for no such column
+        max_workers: maximum number of concurrent GETs
 
     Returns:
+        rows of every file
+    """
+    frames = list(iter_bucket_frames(bucket, s3_prefix, file_format=file_format, columns=columns, dtype=dtype,
+                                     key_column=key_column, max_workers=max_workers))
+    if not frames:
+        return pd.DataFrame(columns=(columns or []) + ([key_column] if key_column else []))
+    return pd.concat(frames, ignore_index=True)
+
 
+def get_s3_event_objects(event: dict) -> Iterator[Tuple[str, str, str]]:
     """
-    data = pd.DataFrame()
+    Get every object referenced in a Lambda event, either an S3 notification
+    event or an SQS event whose messages are forwarded S3 notifications.
 
-    kwargs = {"Bucket": bucket, "Prefix": s3_prefix}
-    while True:
-        response = s3.list_objects_v2(**kwargs)
-        for obj in response["Contents"]:
-            if obj["Key"].endswith(".csv"):
-                csv_obj = s3.get_object(Bucket=kwargs["Bucket"], Key=obj["Key"])
-                body = csv_obj["Body"].read().decode("utf-8")
-                df = pd.read_csv(StringIO(body))
-                df["season"] = str(obj["Key"])
-                data = pd.concat([data, df])
-        try:
-            kwargs["ContinuationToken"] = response["NextContinuationToken"]
-        except KeyError:
-            break
+    Args:
+        event: Lambda event
+
+    Returns:
+        (item identifier, bucket name, decoded object key) for each object, where
+        the item identifier is the SQS message id, or the object key for S3 events
+    """
+    for record in event.get('Records', []):
+        if record.get('eventSource') == 'aws:sqs':
+            s3_records = json.loads(record['body']).get('Records', [])  # S3 test events don't have any records
+            item_identifier = record['messageId']
+        else:
+            s3_records = [record]
+            item_identifier = None
+        for s3_record in s3_records:
+            bucket_name = s3_record['s3']['bucket']['name']
+            file_key = urllib.parse.unquote_plus(s3_record['s3']['object']['key'])
+            yield item_identifier or file_key, bucket_name, file_key
+
+
+def process_s3_event(
+    event: dict,
+    process_object: Callable[[str, str], None],
+    max_workers: int = S3_EVENT_MAX_WORKERS,
+) -> dict:
+    """
+    Apply process_object(bucket_name, file_key) to every object in an S3 or
+    SQS-forwarded S3 Lambda event, using a bounded thread pool for the S3 I/O.
 
-    return data
+    Failures are reported per record: SQS message ids are returned as partial
+    batch failures so only those messages are retried, while failures in a
+    direct S3 event are raised once every object has been attempted.
+
+    Args:
+        event: Lambda event
+        process_object: function to apply to each object
+        max_workers: maximum number of objects processed concurrently
+
+    Returns:
+        Lambda response with the 'batchItemFailures' of the SQS messages
+    """
+    objects = list(get_s3_event_objects(event))
+
+    def process(s3_object):
+        item_identifier, bucket_name, file_key = s3_object
+        try:
+            process_object(bucket_name, file_key)
+            return None
+        except Exception as e:
+            print(f"Failed to process s3://{bucket_name}/{file_key}: {e!r}")
+            return item_identifier
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        failed_items = [item for item in executor.map(process, objects) if item is not None]
+
+    is_sqs_event = any(record.get('eventSource') == 'aws:sqs' for record in event.get('Records', []))
+    if failed_items and not is_sqs_event:
+        raise RuntimeError(f"Failed to process {len(failed_items)} of {len(objects)} objects: {failed_items}")
+
+    print(f"Processed {len(objects) - len(failed_items)} of {len(objects)} objects.")
+    return {
+        'statusCode': 200,
+        'batchItemFailures': [{'itemIdentifier': item} for item in dict.fromkeys(failed_items)],
+    }
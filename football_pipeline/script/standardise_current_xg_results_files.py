@@ -1,53 +1,50 @@
 """
-Script to manually retrigger the lambda cleaning
-function on the football-xg-results raw s3 bucket.
+Script to manually re-run the standardise/clean step over
+a whole raw s3 bucket (by default the football-xg-results
+bucket), either locally or via the deployed lambda function.
+
+Run it as a module from the repository root, so football_pipeline can be imported, e.g:
+    python -m football_pipeline.script.standardise_current_xg_results_files --mode local --workers 8
+    python -m football_pipeline.script.standardise_current_xg_results_files --job clean-football-data --mode lambda --batch-size 25
 """
 
+import argparse
 import json
-import os
-
-import boto3
-import requests
-
-s3 = boto3.client('s3')
-lambda_client = boto3.client('lambda')
-
-bucket = 'football-xg-results'
-lambda_function_name = 'standardise-raw-xg-csvs'
-
-paginator = s3.get_paginator('list_objects_v2')
-pages = paginator.paginate(Bucket=bucket)
-
-for page in pages:
-    for obj in page['Contents']:
-        key = obj['Key']
-
-        # Prepare the input for the Lambda function
-        lambda_input = {
-            "Records": [
-                {
-                    "s3": {
-                        "bucket": {
-                            "name": bucket
-                        },
-                        "object": {
-                            "key": key
-                        }
-                    }
-                }
-            ]
-        }
-        # I have set local env IS_LOCAL variable to true, so it should hit local running docker container
-        #if os.getenv("IS_LOCAL"):
-        #    response = requests.post("http://localhost:9000/2015-03-31/functions/function/invocations",
-        #                             headers={"Content-Type": "application/json"},
-        #                             data=json.dumps(lambda_input))
-        #    response = response.json()
-        #else:
-        # Invoke the Lambda function
-        response = lambda_client.invoke(
-            FunctionName=lambda_function_name,
-            InvocationType='Event',
-            Payload=json.dumps(lambda_input)
-        )
-        print(f"{key} processed.")
+import sys
+
+from football_pipeline import reprocess
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--job", choices=list(reprocess.JOBS), default="standardise-xg")
+    parser.add_argument("--bucket", help="bucket to re-process, defaults to the job's raw bucket")
+    parser.add_argument("--prefix", default="", help="only re-process keys under this prefix")
+    parser.add_argument("--mode", choices=["local", "lambda"], default="local")
+    parser.add_argument("--workers", type=int, default=reprocess.DEFAULT_MAX_WORKERS,
+                        help="worker processes (local) or concurrent invocations (lambda)")
+    parser.add_argument("--batch-size", type=int, default=reprocess.DEFAULT_BATCH_SIZE,
+                        help="files per lambda invocation")
+    parser.add_argument("--report", help="path to write the json report of succeeded/failed keys to")
+    args = parser.parse_args()
+
+    report = reprocess.reprocess_bucket(
+        args.job,
+        bucket_name=args.bucket,
+        prefix=args.prefix,
+        mode=args.mode,
+        max_workers=args.workers,
+        batch_size=args.batch_size,
+    )
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    for file_key, error in report["failed"].items():
+        print(f"FAILED {file_key}:\n{error}")
+
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
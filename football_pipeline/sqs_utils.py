@@ -0,0 +1,146 @@
+"""
+Buffered SQS producer, sending messages with send_message_batch.
+"""
+
+import time
+import typing
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+# SQS limits of a send_message_batch call
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+
+class BatchedQueueProducer:
+    """
+    Buffer messages and send them to an SQS queue in batches of up to 10
+    messages / 256 KB, one call per batch instead of one per message.
+
+    The buffer is flushed when the next message wouldn't fit in the batch,
+    when a message is sent more than max_wait_seconds after the oldest
+    buffered one, and on flush()/leaving the with block. The age of the
+    buffer is only checked when a message is sent, there's no background
+    timer: a message can wait up to max_wait_seconds plus the time until
+    the next send() (or flush()), so a slow producer should flush itself.
+
+    Entries the batch call reports as failed, and whole batches whose call
+    raised (throttling, timeouts, endpoint errors), are retried with a
+    backoff. Those still failing after max_retries are added to failed_keys,
+    rather than raised from whichever send() triggered the flush.
+
+    e.g:
+        with BatchedQueueProducer(queue_url, on_sent=ledger.add_many) as producer:
+            producer.send(json.dumps(message), key=message["match_link"])
+    """
+
+    def __init__(
+        self,
+        queue_url: str,
+        on_sent: typing.Optional[typing.Callable[[typing.List[str]], None]] = None,
+        max_wait_seconds: float = 20.0,
+        max_retries: int = 3,
+        backoff_factor: float = 1.0,
+        sqs_client=None,
+    ):
+        """
+        Args:
+            queue_url: url of the SQS queue
+            on_sent: called with the keys of the messages of each batch SQS acknowledged
+            max_wait_seconds: longest a message waits in the buffer while more are sent
+            max_retries: retries of a failed entry before giving up on it
+            backoff_factor: seconds before the first retry, doubled for each retry
+            sqs_client: boto3 SQS client, a new one by default
+        """
+        self.queue_url = queue_url
+        self.on_sent = on_sent
+        self.max_wait_seconds = max_wait_seconds
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.sqs = sqs_client or boto3.client("sqs")
+        self._buffer = []  # (key, body) of the messages waiting to be sent
+        self._buffer_bytes = 0
+        self._oldest = None
+        self.sent_count = 0
+        self.failed_keys = []
+        self.batch_calls = 0
+
+    def __enter__(self) -> "BatchedQueueProducer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def __contains__(self, key: str) -> bool:
+        """Whether a message with this key is waiting in the buffer."""
+        return any(buffered_key == key for buffered_key, _ in self._buffer)
+
+    def send(self, body: str, key: str):
+        """
+        Add a message to the buffer, flushing the buffer first if the message
+        doesn't fit in the batch or the oldest message has waited too long.
+
+        Args:
+            body: message body
+            key: identifies the message to on_sent, e.g. the url it was scraped from
+
+        Raises:
+            ValueError: the message is larger than SQS allows
+        """
+        size = len(body.encode("utf-8"))
+        if size > MAX_BATCH_BYTES:
+            raise ValueError(f"Message for {key} is {size} bytes, larger than SQS's {MAX_BATCH_BYTES} bytes.")
+        if self._buffer and (
+            len(self._buffer) >= MAX_BATCH_ENTRIES
+            or self._buffer_bytes + size > MAX_BATCH_BYTES
+            or time.monotonic() - self._oldest >= self.max_wait_seconds
+        ):
+            self.flush()
+        if not self._buffer:
+            self._oldest = time.monotonic()
+        self._buffer.append((key, body))
+        self._buffer_bytes += size
+        if len(self._buffer) >= MAX_BATCH_ENTRIES:
+            self.flush()
+
+    def flush(self):
+        """Send the buffered messages."""
+        if not self._buffer:
+            return
+        entries = {str(i): message for i, message in enumerate(self._buffer)}
+        self._buffer = []
+        self._buffer_bytes = 0
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    time.sleep(self.backoff_factor * 2 ** (attempt - 1))
+                self.batch_calls += 1
+                try:
+                    response = self.sqs.send_message_batch(
+                        QueueUrl=self.queue_url,
+                        Entries=[{"Id": entry_id, "MessageBody": body} for entry_id, (_, body) in entries.items()],
+                    )
+                except (BotoCoreError, ClientError) as e:
+                    print(f"Failed to send a batch of {len(entries)} messages: {e!r}")
+                    continue
+                sent = [entries.pop(result["Id"])[0] for result in response.get("Successful", [])]
+                self.sent_count += len(sent)
+                if sent and self.on_sent is not None:
+                    self.on_sent(sent)
+
+                for failure in response.get("Failed", []):
+                    if failure.get("SenderFault"):
+                        # the message itself is invalid, retrying won't help
+                        key, _ = entries.pop(failure["Id"])
+                        self.failed_keys.append(key)
+                        print(f"Failed to send {key}: {failure.get('Code')} {failure.get('Message')}")
+                if not entries:
+                    return
+        finally:
+            # out of retries, or an unexpected error: the messages of the batch that weren't sent are
+            # reported rather than silently dropped with the buffer
+            for key, _ in entries.values():
+                self.failed_keys.append(key)
+                print(f"Failed to send {key}.")
@@ -0,0 +1,223 @@
+"""
+Resolver to translate team names between the fbref.com and
+football-data.co.uk naming conventions, compiled once from the
+dbt seed mapping (dbt_transformations/seeds/fb_ref_football_data_co_uk_mapping.csv).
+"""
+
+import csv
+import difflib
+import functools
+import os
+from pathlib import Path
+import re
+import typing
+import unicodedata
+
+import pandas as pd
+
+SEED_PATH = os.environ.get(
+    "TEAM_NAME_MAPPING_PATH",
+    str(Path(__file__).resolve().parents[1] / "dbt_transformations" / "seeds" / "fb_ref_football_data_co_uk_mapping.csv"),
+)
+FB_REF_NAME_COLUMN = "fb_ref_name"
+FOOTBALL_DATA_NAME_COLUMN = "football_data_name"
+
+# Words that one site includes and the other drops, e.g. 'Stoke City' vs 'Stoke'.
+# Names are only matched without them when that can't confuse two clubs, see TeamNameResolver.
+NOISE_WORDS = {"afc", "fc", "city", "united", "town"}
+# Abbreviations spelled out before comparing names, e.g. 'Sheffield Utd' vs 'Sheffield United'
+ABBREVIATIONS = {"utd": "united"}
+# Minimum difflib similarity ratio for a fuzzy match to be accepted
+FUZZY_MATCH_CUTOFF = 0.8
+
+
+def _team_name_words(name: str) -> typing.List[str]:
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).casefold()
+    name = re.sub(r"['’.]", "", name)
+    return [ABBREVIATIONS.get(word, word) for word in re.split(r"[^0-9a-z]+", name) if word]
+
+
+def normalize_team_name(name: str, strip_noise_words: bool = False) -> str:
+    """
+    Reduce a team name to a key that is equal for the common spelling
+    variations of the same club between the two sites.
+
+    Casefolds, strips accents, apostrophes and punctuation and spells out
+    abbreviations, optionally dropping noise words like 'City', e.g:
+        "Nott'ham Forest" -> 'nottham forest'
+        'Sheffield Utd' -> 'sheffield united'
+        'Stoke City' -> 'stoke', with strip_noise_words
+
+    Args:
+        name: team name
+        strip_noise_words: also drop the NOISE_WORDS
+
+    Returns:
+        normalized key
+    """
+    words = _team_name_words(name)
+    if strip_noise_words:
+        words = [word for word in words if word not in NOISE_WORDS]
+    return " ".join(words)
+
+
+def _unique_keys(names: typing.Dict[str, str],
+                 key: typing.Callable[[str], str]) -> typing.Tuple[typing.Dict[str, str], typing.Set[str]]:
+    """Index of the names' targets by key without the keys shared by different clubs, and those shared keys."""
+    index = {}
+    ambiguous = set()
+    for name, target in names.items():
+        name_key = key(name)
+        if index.get(name_key, target) != target:
+            ambiguous.add(name_key)
+        index[name_key] = target
+    return {name_key: target for name_key, target in index.items() if name_key not in ambiguous}, ambiguous
+
+
+class TeamNameResolver:
+    """
+    Resolves team names from one site's naming convention to the other's.
+
+    Lookups try, in order:
+        - the exact mapping
+        - the normalized-key index, for spelling variations of a mapped name
+        - the index of the keys without noise words, only where a key belongs
+          to a single club and the name's noise words don't contradict the
+          club's, so 'Oxford City' isn't taken for 'Oxford United'
+        - a fuzzy match against the normalized keys, unless the name without
+          its noise words is shared by several clubs
+    Results are cached per distinct name. Names matched without their noise
+    words or fuzzy matched, and names not matched at all, are recorded so
+    report_unresolved can list them for the seed.
+    """
+
+    def __init__(self, mapping: typing.Dict[str, str]):
+        """
+        Args:
+            mapping: source name -> target name
+        """
+        self.mapping = dict(mapping)
+        # Target names resolve to themselves, unless they're also a different source name
+        self._exact = {target: target for target in self.mapping.values()}
+        self._exact.update(self.mapping)
+
+        # Keys shared by different clubs (e.g. 'Man City' and 'Man United' -> 'man') are unusable
+        self._normalized, _ = _unique_keys(self._exact, normalize_team_name)
+        self._normalized_keys = list(self._normalized)
+        self._stripped, self._ambiguous_stripped = _unique_keys(
+            self._exact, lambda name: normalize_team_name(name, strip_noise_words=True))
+        self._noise_words = {}
+        for name, target in self._exact.items():
+            self._noise_words.setdefault(target, set()).update(NOISE_WORDS.intersection(_team_name_words(name)))
+
+        self._cache = {}
+        self.fuzzy_matches = {}
+        self.unresolved = set()
+
+    def _resolve_without_noise_words(self, name: str) -> typing.Optional[str]:
+        target = self._stripped.get(normalize_team_name(name, strip_noise_words=True))
+        if target is None:
+            return None
+        noise_words = NOISE_WORDS.intersection(_team_name_words(name))
+        target_noise_words = self._noise_words[target]
+        if noise_words - target_noise_words and target_noise_words - noise_words:
+            # e.g. 'Oxford City' against 'Oxford United', a different club of the same town
+            return None
+        return target
+
+    def resolve_name(self, name: str) -> typing.Optional[str]:
+        """
+        Resolve a single team name.
+
+        Args:
+            name: team name in the source naming convention
+
+        Returns:
+            team name in the target naming convention, None if it couldn't be resolved
+        """
+        if name in self._cache:
+            return self._cache[name]
+
+        resolved = self._exact.get(name)
+        if resolved is None:
+            resolved = self._normalized.get(normalize_team_name(name))
+        if resolved is None:
+            resolved = self._resolve_without_noise_words(name)
+            # e.g. 'Manchester', which could be either Manchester club, isn't guessed
+            ambiguous = normalize_team_name(name, strip_noise_words=True) in self._ambiguous_stripped
+            if resolved is None and not ambiguous:
+                close_matches = difflib.get_close_matches(normalize_team_name(name), self._normalized_keys,
+                                                          n=1, cutoff=FUZZY_MATCH_CUTOFF)
+                if close_matches:
+                    resolved = self._normalized[close_matches[0]]
+            if resolved is None:
+                self.unresolved.add(name)
+            else:
+                self.fuzzy_matches[name] = resolved
+
+        self._cache[name] = resolved
+        return resolved
+
+    def resolve(self, names: pd.Series) -> pd.Series:
+        """
+        Resolve a whole column of team names, looking up each distinct name only once.
+
+        Args:
+            names: team names in the source naming convention
+
+        Returns:
+            team names in the target naming convention, NaN where a name couldn't be resolved
+        """
+        lookup = {name: self.resolve_name(name) for name in names.dropna().unique()}
+        return names.map({name: resolved for name, resolved in lookup.items() if resolved is not None})
+
+    def report_unresolved(self, names: typing.Optional[typing.Iterable[str]] = None) -> dict:
+        """
+        Print and return the names seen so far that aren't in the mapping,
+        i.e. the rows to add to the seed.
+
+        Args:
+            names: only report these names, e.g. the ones of the file just resolved
+
+        Returns:
+            dict of the fuzzy matched names (name -> guessed target) and unresolved names
+        """
+        fuzzy_matches = dict(self.fuzzy_matches)
+        unresolved = set(self.unresolved)
+        if names is not None:
+            names = set(names)
+            fuzzy_matches = {name: target for name, target in fuzzy_matches.items() if name in names}
+            unresolved &= names
+        for name, target in sorted(fuzzy_matches.items()):
+            print(f"Fuzzy matched team name '{name}' to '{target}', consider adding it to the mapping.")
+        for name in sorted(unresolved):
+            print(f"Couldn't resolve team name '{name}', add it to the mapping.")
+        return {"fuzzy_matches": fuzzy_matches, "unresolved": sorted(unresolved)}
+
+
+def _read_seed(seed_path: str) -> typing.List[typing.Tuple[str, str]]:
+    with open(seed_path, newline="", encoding="utf-8") as f:
+        return [(row[FB_REF_NAME_COLUMN], row[FOOTBALL_DATA_NAME_COLUMN]) for row in csv.DictReader(f)]
+
+
+@functools.lru_cache(maxsize=None)
+def fb_ref_to_football_data(seed_path: str = SEED_PATH) -> TeamNameResolver:
+    """
+    Resolver from fbref.com team names to football-data.co.uk team names,
+    built once per seed file.
+    """
+    return TeamNameResolver(dict(_read_seed(seed_path)))
+
+
+@functools.lru_cache(maxsize=None)
+def football_data_to_fb_ref(seed_path: str = SEED_PATH) -> TeamNameResolver:
+    """
+    Resolver from football-data.co.uk team names to fbref.com team names,
+    built once per seed file.
+    """
+    mapping = {}
+    for fb_ref_name, football_data_name in _read_seed(seed_path):
+        # keep the first fbref name if several map to the same football-data name
+        mapping.setdefault(football_data_name, fb_ref_name)
+    return TeamNameResolver(mapping)
@@ -0,0 +1,279 @@
+"""
+Ledger of the urls the scrapers have already processed, kept in s3.
+
+New urls are appended as small, immutable segment files (one put per
+batch, no read-modify-write of a growing file, so concurrent writers
+can't overwrite each other). Compaction periodically merges the segments
+into sorted url shards and a membership index of 64-bit url fingerprints,
+so loading the ledger is one get of 8 bytes per url plus the few segments
+written since, and membership checks are a binary search of the index.
+
+PendingUrlIndex tracks the urls sent to a queue and not yet processed.
+"""
+
+from datetime import datetime, timedelta, timezone
+import hashlib
+import typing
+import uuid
+
+import boto3
+from botocore.exceptions import ClientError
+import numpy as np
+
+from football_pipeline import s3_utils
+
+SCRAPED_LINKS_BUCKET = "football-misc"
+SCRAPED_LINKS_PREFIX = "scraped_links/"
+# the single file the ledger replaces, imported on first load
+LEGACY_SCRAPED_LINKS_KEY = "scraped_links.txt"
+
+# urls are spread over 2 ** SHARD_BITS compacted shard files by fingerprint
+SHARD_BITS = 4
+# compact once this many segments have been written since the last compaction
+MAX_SEGMENTS = 100
+
+
+def url_fingerprint(url: str) -> int:
+    """
+    64-bit fingerprint of a url. The chance of two of a million urls
+    sharing a fingerprint is about 3 in 100 million.
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _fingerprints(urls: typing.Iterable[str]) -> np.ndarray:
+    return np.fromiter((url_fingerprint(url) for url in urls), dtype=np.uint64)
+
+
+class ScrapedUrlLedger:
+    """
+    Append-only, compacted set of processed urls in s3.
+
+    s3 layout under the prefix:
+        segments/<timestamp>-<uuid>.txt  urls added since the last compaction
+        shards/<shard>.txt               compacted, sorted urls by fingerprint shard
+        index.bin                        sorted uint64 fingerprints of the compacted urls
+    """
+
+    def __init__(self, bucket_name: str = SCRAPED_LINKS_BUCKET, prefix: str = SCRAPED_LINKS_PREFIX):
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.s3 = boto3.client("s3")
+        self._index = np.empty(0, dtype=np.uint64)
+        self._recent = set()  # fingerprints of the uncompacted segments and of urls added since loading
+        self._segment_keys = []
+        self._loaded = False
+
+    def _get(self, key: str) -> typing.Optional[bytes]:
+        try:
+            return s3_utils.get_object_bytes(self.bucket_name, key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def _list_segment_keys(self) -> typing.List[str]:
+        return sorted(s3_utils.list_object_keys(self.bucket_name, prefix=f"{self.prefix}segments/", suffix=".txt"))
+
+    def load(self) -> "ScrapedUrlLedger":
+        """
+        Load the membership index and the segments written since the last
+        compaction. The first load imports the legacy scraped_links.txt file.
+
+        Returns:
+            the ledger, e.g. ledger = ScrapedUrlLedger().load()
+        """
+        index = self._get(f"{self.prefix}index.bin")
+        if index is None:
+            legacy_urls = self._get(LEGACY_SCRAPED_LINKS_KEY)
+            if legacy_urls is not None:
+                print(f"Importing {LEGACY_SCRAPED_LINKS_KEY} into the scraped links ledger.")
+                self.add_many(legacy_urls.decode("utf-8").splitlines())
+                self.compact()
+                index = self._get(f"{self.prefix}index.bin")
+        self._index = np.frombuffer(index, dtype="<u8").astype(np.uint64) if index else np.empty(0, dtype=np.uint64)
+
+        self._segment_keys = self._list_segment_keys()
+        self._recent = set()
+        for key in self._segment_keys:
+            self._recent.update(url_fingerprint(url) for url in self._get(key).decode("utf-8").splitlines() if url)
+        self._loaded = True
+        return self
+
+    def _check_loaded(self):
+        if not self._loaded:
+            raise RuntimeError("Call load() before checking the ledger's membership.")
+
+    def __contains__(self, url: str) -> bool:
+        self._check_loaded()
+        fingerprint = url_fingerprint(url)
+        if fingerprint in self._recent:
+            return True
+        i = np.searchsorted(self._index, np.uint64(fingerprint))
+        return bool(i < len(self._index) and self._index[i] == fingerprint)
+
+    def __len__(self) -> int:
+        self._check_loaded()
+        recent = np.fromiter(self._recent, dtype=np.uint64, count=len(self._recent))
+        return len(self._index) + int(np.count_nonzero(~np.isin(recent, self._index)))
+
+    def filter_new(self, urls: typing.Iterable[str]) -> typing.List[str]:
+        """
+        The urls that aren't in the ledger, in their original order.
+        """
+        self._check_loaded()
+        urls = list(urls)
+        fingerprints = _fingerprints(urls)
+        positions = np.searchsorted(self._index, fingerprints).clip(max=max(len(self._index) - 1, 0))
+        in_index = self._index[positions] == fingerprints if len(self._index) else np.zeros(len(urls), dtype=bool)
+        return [url for url, seen, fingerprint in zip(urls, in_index, fingerprints.tolist())
+                if not seen and fingerprint not in self._recent]
+
+    def add_many(self, urls: typing.Iterable[str]):
+        """
+        Append urls to the ledger, as one new segment.
+
+        Args:
+            urls: processed urls
+        """
+        urls = [url for url in urls if url]
+        if not urls:
+            return
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        key = f"{self.prefix}segments/{timestamp}-{uuid.uuid4().hex}.txt"
+        self.s3.put_object(Bucket=self.bucket_name, Key=key, Body="\n".join(urls).encode("utf-8"))
+        self._segment_keys.append(key)
+        self._recent.update(url_fingerprint(url) for url in urls)
+
+    def add(self, url: str):
+        """Append a single url to the ledger."""
+        self.add_many([url])
+
+    def compact(self):
+        """
+        Merge the segments into the sorted url shards, rewrite the membership
+        index and delete the merged segments. Segments written while compacting
+        are left for the next compaction. Run from one process at a time.
+        """
+        segment_keys = self._list_segment_keys()
+        if not segment_keys:
+            return
+        new_urls_by_shard = {}
+        for key in segment_keys:
+            for url in self._get(key).decode("utf-8").splitlines():
+                if url:
+                    shard = url_fingerprint(url) >> (64 - SHARD_BITS)
+                    new_urls_by_shard.setdefault(shard, set()).add(url)
+
+        for shard, new_urls in new_urls_by_shard.items():
+            shard_key = f"{self.prefix}shards/{shard:02x}.txt"
+            existing = self._get(shard_key)
+            urls = set(existing.decode("utf-8").splitlines()) if existing else set()
+            if not new_urls - urls:
+                continue
+            urls |= new_urls
+            self.s3.put_object(Bucket=self.bucket_name, Key=shard_key, Body="\n".join(sorted(urls)).encode("utf-8"))
+
+        all_urls = []
+        for shard in range(2 ** SHARD_BITS):
+            shard_urls = self._get(f"{self.prefix}shards/{shard:02x}.txt")
+            if shard_urls:
+                all_urls.extend(shard_urls.decode("utf-8").splitlines())
+        index = np.unique(_fingerprints(all_urls))
+        self.s3.put_object(Bucket=self.bucket_name, Key=f"{self.prefix}index.bin", Body=index.astype("<u8").tobytes())
+
+        for i in range(0, len(segment_keys), 1000):
+            self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in segment_keys[i:i + 1000]], "Quiet": True},
+            )
+        print(f"Compacted {len(segment_keys)} segments into the scraped links ledger of {len(index)} urls.")
+        if self._loaded:
+            self.load()
+
+    def compact_if_needed(self, max_segments: int = MAX_SEGMENTS):
+        """Compact when more than max_segments segments have been written since the last compaction."""
+        if len(self._list_segment_keys()) > max_segments:
+            self.compact()
+
+
+# SQS's default message retention, a pending url older than this can't still be queued
+PENDING_URL_TTL = timedelta(days=4)
+
+
+class PendingUrlIndex:
+    """
+    Urls pushed to a queue and not yet processed by its consumer, one empty
+    marker object per url under the prefix, named by the url's sha256.
+
+    The producer marks each url it sends and the consumer clears the mark
+    once it has processed the message, so the producer can skip queued urls
+    without receiving (and so hiding) the queue's messages. Loading is one
+    list request per 1000 pending urls, whatever the depth of the history.
+    """
+
+    def __init__(self, bucket_name: str = SCRAPED_LINKS_BUCKET, prefix: str = "pending_links/",
+                 ttl: timedelta = PENDING_URL_TTL):
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.ttl = ttl
+        self.s3 = boto3.client("s3")
+        self._pending = set()
+
+    def _key(self, url: str) -> str:
+        return f"{self.prefix}{hashlib.sha256(url.encode('utf-8')).hexdigest()}"
+
+    def load(self) -> "PendingUrlIndex":
+        """
+        List the pending urls. Marks older than the ttl, left by messages that
+        were never processed, are deleted so their urls can be sent again.
+
+        Returns:
+            the index, e.g. pending = PendingUrlIndex().load()
+        """
+        oldest = datetime.now(timezone.utc) - self.ttl
+        self._pending = set()
+        expired = []
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                if obj["LastModified"] < oldest:
+                    expired.append(obj["Key"])
+                else:
+                    self._pending.add(obj["Key"])
+        for i in range(0, len(expired), 1000):
+            self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in expired[i:i + 1000]], "Quiet": True},
+            )
+        if expired:
+            print(f"Expired {len(expired)} pending urls.")
+        return self
+
+    def __contains__(self, url: str) -> bool:
+        return self._key(url) in self._pending
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add_many(self, urls: typing.Iterable[str]):
+        """
+        Mark urls as pending, after sending them to the queue.
+
+        Args:
+            urls: urls sent to the queue
+        """
+        for url in urls:
+            key = self._key(url)
+            self.s3.put_object(Bucket=self.bucket_name, Key=key, Body=b"")
+            self._pending.add(key)
+
+    def add(self, url: str):
+        """Mark a single url as pending."""
+        self.add_many([url])
+
+    def remove(self, url: str):
+        """Clear the mark of a processed url. Clearing a url that isn't pending does nothing."""
+        key = self._key(url)
+        self.s3.delete_object(Bucket=self.bucket_name, Key=key)
+        self._pending.discard(key)
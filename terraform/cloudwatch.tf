@@ -30,12 +30,30 @@ resource "aws_cloudwatch_event_target" "trigger_daily_update_of_fbref" {
   })
 }
 
+# One goal logs invocation per league, 5 minutes apart: all the leagues in one invocation
+# take close to the lambda timeout at the fbref.com rate limit, and concurrent invocations
+# would each make requests at the full rate limit. Keep in sync with COMPETITION_NUMBER_LEAGUE_MAP.
+locals {
+  goal_log_leagues = [
+    "Premier-League", "Championship", "La-Liga", "Major-League-Soccer",
+    "Ligue-1", "Bundesliga", "Serie-A", "League-One",
+  ]
+}
+
+resource "aws_cloudwatch_event_rule" "daily_goal_logs" {
+  for_each            = { for i, league in local.goal_log_leagues : league => i }
+  name                = "trigger-goal-logs-daily-${lower(each.key)}"
+  description         = "Trigger the ${each.key} goal logs lambda every day from 11pm"
+  schedule_expression = "cron(${5 * each.value} 23 * * ? *)"
+}
+
 resource "aws_cloudwatch_event_target" "trigger_daily_update_of_fbref_goal_logs" {
-  rule      = aws_cloudwatch_event_rule.daily_11pm.name
+  for_each  = aws_cloudwatch_event_rule.daily_goal_logs
+  rule      = each.value.name
   target_id = "extract-and-load-current-season-goal-logs"
   arn       = aws_lambda_function.extract-and-load-current-season-goal-logs.arn
   input = jsonencode({
-    # Add any other payload keys/values you want to send to the lambda
+    leagues = [each.key]
   })
 }
 
@@ -56,9 +74,27 @@ resource "aws_lambda_permission" "fbref_loader_allow_cloudwatch" {
 }
 
 resource "aws_lambda_permission" "goal_logs_loader_allow_cloudwatch" {
-  statement_id  = "AllowExecutionFromCloudWatch"
+  for_each      = aws_cloudwatch_event_rule.daily_goal_logs
+  statement_id  = "AllowExecutionFromCloudWatch-${each.key}"
   action        = "lambda:InvokeFunction"
   function_name = aws_lambda_function.extract-and-load-current-season-goal-logs.function_name
   principal     = "events.amazonaws.com"
+  source_arn    = each.value.arn
+}
+
+resource "aws_cloudwatch_event_target" "trigger_daily_compaction_of_team_lineups" {
+  rule      = aws_cloudwatch_event_rule.daily_11pm.name
+  target_id = "compact-team-lineups"
+  arn       = aws_lambda_function.compact-team-lineups.arn
+  input = jsonencode({
+    # Add any other payload keys/values you want to send to the lambda
+  })
+}
+
+resource "aws_lambda_permission" "compact_team_lineups_allow_cloudwatch" {
+  statement_id  = "AllowExecutionFromCloudWatch"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.compact-team-lineups.function_name
+  principal     = "events.amazonaws.com"
   source_arn    = aws_cloudwatch_event_rule.daily_11pm.arn
-}
\ No newline at end of file
+}
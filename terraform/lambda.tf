@@ -96,3 +96,16 @@ resource "aws_s3_bucket_notification" "raw_xg_results_bucket_notification" {
     # filter_suffix       = ".log"
   }
 }
+
+# Compact the per-match team lineups files into (league, season) partitioned parquet files
+resource "aws_lambda_function" "compact-team-lineups" {
+  function_name = "compact-team-lineups"
+  image_uri     = "${aws_ecr_repository.football_repository.repository_url}:aws_ingestion_lambda_tasks"
+  role          = aws_iam_role.lambda_ex.arn
+  memory_size   = 1000
+  package_type  = "Image"
+  image_config {
+    command = ["fb_ref.compact_team_lineups_handler"]
+  }
+  timeout = 900
+}
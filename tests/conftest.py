@@ -0,0 +1,33 @@
+"""
+Shared test setup. The pipeline's modules create boto3 clients when they
+are imported, so fake credentials are set and moto is imported here,
+before any test module imports them, so those clients are routed to
+moto's in-memory AWS inside the aws fixture and never reach real AWS.
+"""
+
+import os
+from pathlib import Path
+
+os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+os.environ["AWS_SESSION_TOKEN"] = "testing"
+os.environ.pop("AWS_PROFILE", None)
+
+from moto import mock_aws  # noqa: E402
+import boto3  # noqa: E402
+import pytest  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def aws():
+    """In-memory S3 and SQS, torn down after the test."""
+    with mock_aws():
+        yield
+
+
+@pytest.fixture
+def s3(aws):
+    return boto3.client("s3")
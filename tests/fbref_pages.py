@@ -0,0 +1,204 @@
+"""
+Hand-made html pages mimicking the structure of the fbref.com pages the
+scrapers read (season scores & fixtures, match report, squad goal logs
+and league stats pages), so the parsing can be tested and benchmarked
+offline.
+"""
+
+import random
+
+TEAMS = [
+    "Arsenal", "Aston Villa", "Bournemouth", "Brentford", "Brighton", "Chelsea", "Crystal Palace", "Everton",
+    "Fulham", "Leeds United", "Leicester City", "Liverpool", "Manchester City", "Manchester Utd",
+    "Newcastle Utd", "Nott'ham Forest", "Southampton", "Tottenham", "West Ham", "Wolves",
+]
+
+GOAL_LOG_HEADERS = [
+    'Rk', 'Date', 'Comp', 'Round', 'Venue', 'Scorer', 'Opponent', 'Start', 'xG', 'PSxG', 'Body Part',
+    'Distance', 'Minute', 'Score', 'Goalkeeper', 'Assist', 'GCA1', 'Type', 'GCA2', 'Type', 'Notes',
+]
+
+# site navigation, scripts and styles that come before the content on every page
+PAGE_HEADER = (
+    '<!DOCTYPE html><html><head><meta charset="utf-8"><title>FBref.com</title>'
+    '<script>var tip = "<table>not a table</table>";</script><style>.poptip{}</style></head><body>'
+    '<div id="header"><ul>'
+    + "".join(f'<li><a href="/en/comps/{i}/">Competition {i}</a></li>' for i in range(200))
+    + "</ul></div>"
+)
+PAGE_FOOTER = "</body></html>"
+
+
+def _stats_table(table_id: str, rnd: random.Random, n_rows: int = 16, n_cols: int = 20) -> str:
+    """Player/squad stats table with a two row header, like the ones filling most fbref pages."""
+    over_header = '<tr class="over_header"><th colspan="6"></th><th colspan="7">Performance</th><th colspan="7">Expected</th></tr>'
+    header = "<tr>" + "".join(f'<th data-stat="c{c}">C{c}</th>' for c in range(n_cols)) + "</tr>"
+    rows = "".join(
+        "<tr>" + f'<th data-stat="player"><a href="/en/players/{r}">Player {r}</a></th>'
+        + "".join(f'<td data-stat="c{c}">{rnd.randint(0, 99)}</td>' for c in range(1, n_cols)) + "</tr>"
+        for r in range(n_rows)
+    )
+    return (f'<div class="table_container"><table id="{table_id}" class="stats_table">'
+            f"<thead>{over_header}{header}</thead><tbody>{rows}</tbody></table></div>")
+
+
+def season_page(season: str = "2022-2023", current: bool = False, n_played: int = 380, n_fixtures: int = 0,
+                xg: bool = True, comp_no: int = 9, seed: int = 0) -> str:
+    """
+    Season scores & fixtures page, with spacer and repeated header rows in the schedule table.
+
+    Args:
+        season: season code, e.g. '2022-2023'
+        current: current season page, i.e. without a 'Next Season' link
+        n_played: number of played matches
+        n_fixtures: number of matches yet to be played
+        xg: include the xG columns (missing for older seasons and some leagues)
+        comp_no: fbref competition number
+        seed: random seed of the generated scores
+    """
+    rnd = random.Random(seed)
+    nav = '<div class="prevnext"><a href="/en/comps/9/2021-2022/schedule/2021-2022-Premier-League-Scores-and-Fixtures" class="button2 prev">Previous Season</a>'
+    if not current:
+        nav += '<a href="/en/comps/9/2023-2024/schedule/2023-2024-Premier-League-Scores-and-Fixtures" class="button2 next">Next Season</a>'
+    nav += "</div>"
+
+    columns = [("gameweek", "Wk"), ("dayofweek", "Day"), ("date", "Date"), ("start_time", "Time"), ("home_team", "Home")]
+    columns += [("home_xg", "xG")] if xg else []
+    columns += [("score", "Score")]
+    columns += [("away_xg", "xG")] if xg else []
+    columns += [("away_team", "Away"), ("attendance", "Attendance"), ("venue", "Venue"), ("referee", "Referee"),
+                ("match_report", "Match Report"), ("notes", "Notes")]
+    header = "<tr>" + "".join(f'<th aria-label="{label}" data-stat="{stat}" scope="col" class=" poptip">{label}</th>'
+                              for stat, label in columns) + "</tr>"
+
+    rows = []
+    for i in range(n_played + n_fixtures):
+        played = i < n_played
+        if i and i % 10 == 0:
+            rows.append(f'<tr class="spacer partial_table result_all"><td colspan="{len(columns)}"></td></tr>')
+        if i and i % 50 == 0:
+            rows.append('<tr class="thead">' + "".join(f'<th data-stat="{stat}">{label}</th>' for stat, label in columns) + "</tr>")
+        home, away = rnd.sample(TEAMS, 2)
+        month = 8 + (i // 10) // 4
+        date = f"{2022 + (month > 12)}-{(month - 1) % 12 + 1:02d}-{rnd.randint(1, 28):02d}" if played else "2099-05-01"
+        values = {
+            "dayofweek": "Sat",
+            "date": f'<a href="/en/matches/{date}">{date}</a>',
+            "start_time": '<span class="venuetime" data-venue-time="15:00">15:00</span> <span class="localtime">(15:00)</span>',
+            "home_team": f'<a href="/en/squads/{i:08x}/{home}-Stats">{home}</a>',
+            "home_xg": f"{rnd.random() * 3:.1f}" if played else "",
+            "score": f'<a href="/en/matches/{i:08x}/{home}-{away}-Premier-League">{rnd.randint(0, 4)}&ndash;{rnd.randint(0, 4)}</a>' if played else "",
+            "away_xg": f"{rnd.random() * 3:.1f}" if played else "",
+            "away_team": f'<a href="/en/squads/{i:08x}/{away}-Stats">{away}</a>',
+            "attendance": f"{rnd.randint(10000, 75000):,}" if played and i % 17 else "",
+            "venue": f"{home} Stadium",
+            "referee": "Michael Oliver" if played else "",
+            "match_report": f'<a href="/en/matches/{i:08x}/{home}-{away}">{"Match Report" if played else "Head-to-Head"}</a>',
+            "notes": "Match awarded" if i == 5 else "",
+        }
+        cells = [f'<th scope="row" class="right" data-stat="gameweek">{i // 10 + 1}</th>']
+        for stat, _ in columns[1:]:
+            css_class = "center" if stat == "score" else "left"
+            cells.append(f'<td class="{css_class}" data-stat="{stat}">{values[stat]}</td>')
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+
+    table = (f'<table class="stats_table sortable min_width" id="sched_{season}_{comp_no}_1">'
+             f"<caption>Scores &amp; Fixtures Table</caption><thead>{header}</thead><tbody>{''.join(rows)}</tbody></table>")
+    return (PAGE_HEADER
+            + f'<div id="info"><h1>{season} Premier League Scores &amp; Fixtures</h1>{nav}</div>'
+            + f'<div id="all_sched"><div class="section_heading"><h2><span>{season} Premier League</span> Scores &amp; Fixtures</h2></div>'
+            + f'<div class="table_container">{table}</div></div>'
+            + "".join(_stats_table(f"extra_{t}", rnd, n_rows=30, n_cols=2) for t in range(3))
+            + PAGE_FOOTER)
+
+
+def _lineup_table(team: str, formation: str) -> str:
+    rows = [f'<tr><th colspan="2">{team} ({formation})</th></tr>']
+    rows += [f'<tr><td>{n + 1}</td><td><a href="/en/players/{n}">{team.split()[0]} Player {n}</a></td></tr>' for n in range(11)]
+    rows += ['<tr><th colspan="2">Bench</th></tr>']
+    rows += [f'<tr><td>{n + 12}</td><td><a href="/en/players/b{n}">{team.split()[0]} Sub {n}</a></td></tr>' for n in range(9)]
+    return f'<table>{"".join(rows)}</table>'
+
+
+def match_report(home: str = "Crystal Palace", away: str = "Arsenal", date: str = "2022-08-05",
+                 played: bool = True, seed: int = 0) -> str:
+    """
+    Match report page: scorebox, lineups and the ~20 player, keeper and shot stats tables.
+
+    Args:
+        home: home team
+        away: away team
+        date: match date
+        played: include the scores (match reports of future matches have none)
+        seed: random seed of the generated stats
+    """
+    rnd = random.Random(seed)
+    home_score = '<div class="scores"><div class="score">0</div><div class="score_xg">1.2</div></div>' if played else '<div class="scores"></div>'
+    away_score = home_score.replace(">0<", ">2<")
+    scorebox = (
+        '<div class="scorebox">'
+        f'<div><div><strong><a href="/en/squads/a/{home}-Stats">{home}</a></strong></div>{home_score}'
+        '<div class="datapoint"><strong>Manager</strong>:&nbsp;Patrick Vieira</div>'
+        '<div class="datapoint"><strong><a href="/en/players/c">Captain</a></strong>: Luka Milivojević</div></div>'
+        f'<div><div><strong><a href="/en/squads/b/{away}-Stats">{away}</a></strong></div>{away_score}'
+        '<div class="datapoint"><strong>Manager</strong>:&nbsp;Mikel Arteta</div>'
+        '<div class="datapoint"><strong>Captain</strong>: Martin Ødegaard</div></div>'
+        f'<div class="scorebox_meta"><div><span class="venuetime" data-venue-date="{date}" data-venue-time="20:00" '
+        'data-venue-epoch="1659726000">20:00</span> (<span class="localtime">local time</span>)</div>'
+        '<div><small>Premier League (Matchweek 1)</small></div><div><small><b>Attendance</b>: 25,286</small></div></div></div>'
+    )
+    tables = [
+        f'<div class="lineup" id="a">{_lineup_table(home, "4-3-3")}</div>',
+        f'<div class="lineup" id="b">{_lineup_table(away, "4-2-3-1")}</div>',
+        '<div id="team_stats"><table><tr><th colspan="2">Possession</th></tr><tr><td>35%</td><td>65%</td></tr></table></div>',
+    ]
+    for side in ("h", "a"):
+        tables += [_stats_table(f"stats_{side}_{kind}", rnd)
+                   for kind in ("summary", "passing", "passing_types", "defense", "possession", "misc")]
+        tables.append(_stats_table(f"keeper_stats_{side}", rnd, n_rows=1, n_cols=24))
+    tables += [_stats_table(f"shots_{shots}", rnd, n_rows=25, n_cols=12) for shots in ("all", "h", "a")]
+    return PAGE_HEADER + '<div id="content"><h1>Match Report</h1>' + scorebox + "".join(tables) + "</div>" + PAGE_FOOTER
+
+
+def _goal_log_table(table_id: str, n_goals: int, rnd: random.Random) -> str:
+    header = "<tr>" + "".join(f"<th>{column}</th>" for column in GOAL_LOG_HEADERS) + "</tr>"
+    rows = []
+    for r in range(n_goals):
+        values = ["2024-08-17", "Premier League", "Matchweek 1", "Home", f"Player {r}", "Arsenal", "Y",
+                  f"{rnd.random():.2f}", f"{rnd.random():.2f}", "Right Foot", str(rnd.randint(5, 30)),
+                  str(rnd.randint(1, 90)), "1–0", "Keeper", "Assister" if r % 2 else "", "Pass",
+                  "Pass (Live)", "Shot", "", "Penalty" if r == 3 else ""]
+        rows.append(f"<tr><th>{r + 1}</th>" + "".join(f"<td>{value}</td>" for value in values) + "</tr>")
+    return f'<table id="{table_id}" class="stats_table"><thead>{header}</thead><tbody>{"".join(rows)}</tbody></table>'
+
+
+def goal_log_page(n_goals_for: int = 30, n_goals_against: int = 20, season: str = "2024-2025", seed: int = 0) -> str:
+    """
+    Squad goal logs page, the goals for/against tables are left out when there are no goals.
+    """
+    rnd = random.Random(seed)
+    tables = ""
+    if n_goals_for:
+        tables += f'<div id="all_goallogs_for"><div class="table_container">{_goal_log_table("goallogs_for", n_goals_for, rnd)}</div></div>'
+    if n_goals_against:
+        tables += f'<div id="all_goallogs_against"><div class="table_container">{_goal_log_table("goallogs_against", n_goals_against, rnd)}</div></div>'
+    return (PAGE_HEADER + f'<div id="info"><h1>{season} West Ham United Goal Logs</h1>'
+            '<div class="prevnext"><a class="button2 prev" href="/en/squads/7c21e445/2023-2024/goallogs/all_comps/West-Ham-United-Goal-Logs-All-Competitions">Previous Season</a></div></div>'
+            + tables + PAGE_FOOTER)
+
+
+def league_stats_page(season: str = "2024-2025", seed: int = 0) -> str:
+    """
+    League stats home page, with the league table linking to each squad's stats page.
+    """
+    rnd = random.Random(seed)
+    rows = "".join(
+        f'<tr><th data-stat="rank">{i + 1}</th>'
+        f'<td data-stat="team"><a href="/en/squads/{i:08x}/{team.replace(" ", "-").replace(chr(39), "")}-Stats">{team}</a></td>'
+        f'<td data-stat="games">{rnd.randint(1, 38)}</td><td data-stat="last_5"><a href="/en/matches/{i:08x}">W</a></td></tr>'
+        for i, team in enumerate(TEAMS)
+    )
+    table = (f'<table id="results{season}91_overall" class="stats_table"><thead><tr><th>Rk</th><th>Squad</th>'
+             f'<th>MP</th><th>Last 5</th></tr></thead><tbody>{rows}</tbody></table>')
+    return (PAGE_HEADER + f'<div id="info"><h1>{season} Premier League Stats</h1></div>' + table
+            + _stats_table("stats_squads_standard_for", rnd) + PAGE_FOOTER)
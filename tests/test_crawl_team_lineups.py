@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import boto3
+import pytest
+
+from football_pipeline import url_ledger
+from football_pipeline.expected_goals import fb_ref
+from tests import fbref_pages
+
+SEASONS = [
+    ("https://fbref.com/en/comps/9/2021-2022/schedule/2021-2022-Premier-League-Scores-and-Fixtures",
+     "Premier-League", "2021-2022"),
+    ("https://fbref.com/en/comps/9/2022-2023/schedule/2022-2023-Premier-League-Scores-and-Fixtures",
+     "Premier-League", "2022-2023"),
+]
+
+
+@pytest.fixture
+def crawl(aws, monkeypatch):
+    """
+    Runs crawl_team_lineups on two past seasons of 4 matches each, served
+    from hand-made pages, with any match link in `failing` failing to fetch.
+    """
+    boto3.client("s3").create_bucket(Bucket=fb_ref.LINEUPS_CHECKPOINT_BUCKET)
+    queue_url = boto3.client("sqs").create_queue(QueueName="lineups")["QueueUrl"]
+    monkeypatch.setattr(fb_ref, "QUEUE_URL", queue_url)
+    monkeypatch.setattr(fb_ref, "html_cache", None)
+    monkeypatch.setattr(fb_ref, "scraped_links_ledger", url_ledger.ScrapedUrlLedger())
+    monkeypatch.setattr(fb_ref, "pending_lineup_links", url_ledger.PendingUrlIndex())
+
+    pages = {}
+    for i, (season_url, _, season_code) in enumerate(SEASONS):
+        # distinct match ids in each season
+        pages[season_url] = fbref_pages.season_page(season_code, n_played=4, seed=i).replace(
+            "/en/matches/0000", f"/en/matches/{i}000")
+    fetched = []
+    failing = set()
+
+    def get_page(url):
+        fetched.append(url)
+        if url in failing:
+            raise ConnectionError(f"couldn't fetch {url}")
+        return pages.get(url) or fbref_pages.match_report(seed=len(fetched))
+
+    monkeypatch.setattr(fb_ref, "_get_page", get_page)
+
+    def run(**kwargs):
+        fetched.clear()
+        asyncio.run(asyncio.wait_for(fb_ref.crawl_team_lineups(SEASONS, queue_size=1, **kwargs), timeout=30))
+        return fetched
+
+    run.failing = failing
+    run.queue_url = queue_url
+    run.match_links = lambda season_url: fb_ref.FBrefSeasonResultsPage(season_url, html=pages[season_url]).match_level_urls
+    return run
+
+
+def _checkpointed_seasons():
+    return {key.rsplit("/", 1)[-1][:-len(".json")]
+            for key in fb_ref._completed_lineups_seasons()}
+
+
+def _queued_links(queue_url):
+    sqs = boto3.client("sqs")
+    links = []
+    while True:
+        messages = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10).get("Messages", [])
+        if not messages:
+            return links
+        links += [json.loads(message["Body"])["match_link"] for message in messages]
+
+
+def test_failed_match_only_blocks_its_own_seasons_checkpoint(crawl):
+    first_season_links = crawl.match_links(SEASONS[0][0])
+    second_season_links = crawl.match_links(SEASONS[1][0])
+    failed_link = first_season_links[2]
+    crawl.failing.add(failed_link)
+
+    crawl()
+    assert _checkpointed_seasons() == {"2022-2023"}
+    assert sorted(_queued_links(crawl.queue_url)) == sorted(
+        [link for link in first_season_links if link != failed_link] + second_season_links)
+
+    # the rerun only reads the unfinished season, and fetches just the failed match
+    crawl.failing.clear()
+    assert crawl() == [SEASONS[0][0], failed_link]
+    assert _checkpointed_seasons() == {"2021-2022", "2022-2023"}
+    assert _queued_links(crawl.queue_url) == [failed_link]
+
+    assert crawl() == []
+
+
+def test_dead_stage_fails_the_crawl_instead_of_blocking(crawl, monkeypatch):
+    class ProgressBreakingThePublisher(fb_ref._SeasonProgress):
+        @property
+        def remaining(self):
+            return self._remaining
+
+        @remaining.setter
+        def remaining(self, value):
+            if hasattr(self, "_remaining"):
+                raise RuntimeError("publisher bug")
+            self._remaining = value
+
+    monkeypatch.setattr(fb_ref, "_SeasonProgress", ProgressBreakingThePublisher)
+    with pytest.raises(RuntimeError, match="publisher bug"):
+        crawl(fetch_workers=1, parse_workers=1)
+    assert _checkpointed_seasons() == set()
@@ -0,0 +1,66 @@
+"""
+Golden file tests of the xg results preprocessing and standardisation.
+After an intended change of their output, rewrite the golden files with:
+    UPDATE_GOLDEN_FILES=1 python -m pytest tests/test_fb_ref_xg_results.py
+and review their diff.
+"""
+
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from football_pipeline.expected_goals import fb_ref
+from tests.conftest import FIXTURES_DIR
+
+GOLDEN_DIR = FIXTURES_DIR / "golden"
+UPDATE_GOLDEN_FILES = os.environ.get("UPDATE_GOLDEN_FILES") == "1"
+SEASON_URL = "https://fbref.com/en/comps/22/2023/schedule/2023-Major-League-Soccer-Scores-and-Fixtures"
+
+
+def _check_golden(file_name: str, data: bytes):
+    golden_path = GOLDEN_DIR / file_name
+    if UPDATE_GOLDEN_FILES:
+        golden_path.write_bytes(data)
+    return golden_path.read_bytes()
+
+
+def test_preprocess_fbref_xg_results_matches_golden_file():
+    # a season table with spacer and header rows, a fixture and penalty shootout scores
+    html = (FIXTURES_DIR / "fbref_2023_mls_schedule.html").read_text()
+    season = fb_ref.FBrefSeasonResultsPage(SEASON_URL, html=html)
+    df = season.preprocess_fbref_xg_results()
+
+    assert df["home_goals"].dtype == df["away_goals"].dtype == "Int64"
+    assert not df["score"].str.contains(r"\(").any()
+    # as save_to_s3 writes it
+    raw_csv = df.to_csv(index=False).encode()
+    assert raw_csv == _check_golden(f"{season.output_file_name}.csv", raw_csv)
+
+
+@pytest.mark.parametrize("raw_file_path", [
+    # written by the current preprocessing
+    GOLDEN_DIR / "2023-Major-League-Soccer-Scores-and-Fixtures.csv",
+    # written before the shootout scores were parsed: no round column, float weeks,
+    # shootout scores with missing goals and the other goals read back as ints
+    FIXTURES_DIR / "2022-Major-League-Soccer-Scores-and-Fixtures.csv",
+], ids=["current", "old_format"])
+def test_standardise_xg_results_file_matches_golden_file(s3, raw_file_path):
+    for bucket_name in [fb_ref.XG_RESULTS_BUCKET, fb_ref.CLEAN_XG_RESULTS_BUCKET]:
+        s3.create_bucket(Bucket=bucket_name)
+    s3.put_object(Bucket=fb_ref.XG_RESULTS_BUCKET, Key=raw_file_path.name, Body=raw_file_path.read_bytes())
+
+    fb_ref.standardise_xg_results_file(fb_ref.XG_RESULTS_BUCKET, raw_file_path.name)
+
+    season_code = raw_file_path.name[:4]
+    clean_key = fb_ref._clean_xg_results_key("Major-League-Soccer", season_code, raw_file_path.name)
+    parquet = s3.get_object(Bucket=fb_ref.CLEAN_XG_RESULTS_BUCKET, Key=clean_key)["Body"].read()
+    df = pd.read_parquet(io.BytesIO(parquet))
+
+    assert df.columns.tolist() == fb_ref.expected_columns
+    assert df["home_goals"].dtype == df["away_goals"].dtype == "Int64"
+    assert df["home_goals"].notna().all() and df["away_goals"].notna().all()
+    assert not df["score"].str.contains(r"\(").any()
+    golden = pd.read_parquet(io.BytesIO(_check_golden(f"{raw_file_path.stem}.parquet", parquet)))
+    pd.testing.assert_frame_equal(df, golden)
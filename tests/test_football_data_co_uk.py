@@ -0,0 +1,81 @@
+import types
+
+import pytest
+import requests
+
+from football_pipeline.match_results import football_data_co_uk
+
+SEASON_URL = "https://www.football-data.co.uk/mmz4281/2324/E0.csv"
+FILE_CONTENT = b"Div,Date,HomeTeam,AwayTeam,FTHG,FTAG\r\nE0,11/08/2023,Burnley,Man City,0,3\r\n"
+
+
+def _response(status_code: int, content: bytes = b"", headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    response.url = SEASON_URL
+    return response
+
+
+@pytest.fixture
+def server(s3, monkeypatch):
+    """Stands in for football-data.co.uk, answering with the queued responses and recording the requests."""
+    s3.create_bucket(Bucket=football_data_co_uk.RAW_FOOTBALL_DATA_CO_UK_BUCKET)
+    responses, requests_made = [], []
+
+    def get(url, **kwargs):
+        requests_made.append(kwargs)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(football_data_co_uk.http_client.session, "get", get)
+    monkeypatch.setattr(football_data_co_uk.http_client, "backoff_factor", 0)
+    monkeypatch.setattr(football_data_co_uk.rate_limiter, "acquire", lambda url: 0.0)
+    monkeypatch.setattr(football_data_co_uk.rate_limiter, "pause", lambda url, seconds: None)
+    return types.SimpleNamespace(responses=responses, requests=requests_made)
+
+
+def _season():
+    return football_data_co_uk.FootballDataSeason(SEASON_URL, "England")
+
+
+def test_season_download_has_a_timeout_and_is_retried(server):
+    server.responses += [requests.ConnectTimeout("stalled"), _response(503), _response(200, FILE_CONTENT)]
+
+    assert _season().upload_to_s3() == football_data_co_uk.LOADED
+    assert len(server.requests) == 3
+    assert all(request["timeout"] == football_data_co_uk.http_client.timeout for request in server.requests)
+
+
+def _stored_metadata(s3) -> dict:
+    return s3.head_object(Bucket=football_data_co_uk.RAW_FOOTBALL_DATA_CO_UK_BUCKET, Key=_season().s3_key)["Metadata"]
+
+
+def test_unchanged_file_with_new_validators_has_them_refreshed(server, s3):
+    server.responses += [_response(200, FILE_CONTENT, {"ETag": '"v1"'}),
+                         _response(200, FILE_CONTENT, {"ETag": '"v2"', "Last-Modified": "Sat, 12 Aug 2023 06:00:00 GMT"}),
+                         _response(304)]
+
+    assert _season().upload_to_s3() == football_data_co_uk.LOADED
+    assert _season().upload_to_s3() == football_data_co_uk.UNCHANGED
+    assert _stored_metadata(s3)["source-etag"] == '"v2"'
+    assert _stored_metadata(s3)["source-last-modified"] == "Sat, 12 Aug 2023 06:00:00 GMT"
+
+    assert _season().upload_to_s3() == football_data_co_uk.UNCHANGED
+    assert server.requests[-1]["headers"] == {"If-None-Match": '"v2"',
+                                              "If-Modified-Since": "Sat, 12 Aug 2023 06:00:00 GMT"}
+    body = s3.get_object(Bucket=football_data_co_uk.RAW_FOOTBALL_DATA_CO_UK_BUCKET, Key=_season().s3_key)["Body"]
+    assert body.read() == FILE_CONTENT
+
+
+def test_unchanged_file_with_the_same_validators_is_not_copied(server, s3, monkeypatch):
+    server.responses += [_response(200, FILE_CONTENT, {"ETag": '"v1"'}), _response(200, FILE_CONTENT, {"ETag": '"v1"'})]
+    assert _season().upload_to_s3() == football_data_co_uk.LOADED
+
+    copies = []
+    monkeypatch.setattr(football_data_co_uk.s3, "copy_object", lambda **kwargs: copies.append(kwargs))
+    assert _season().upload_to_s3() == football_data_co_uk.UNCHANGED
+    assert copies == []
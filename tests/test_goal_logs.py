@@ -0,0 +1,49 @@
+import pytest
+
+from football_pipeline import s3_utils
+from football_pipeline.expected_goals import fb_ref
+from tests import fbref_pages
+
+LEAGUE_URL = "https://fbref.com/en/comps/9/Premier-League-Stats"
+
+
+@pytest.fixture
+def crawler(s3, monkeypatch):
+    s3.create_bucket(Bucket=fb_ref.GOAL_LOGS_BUCKET)
+    fetched = []
+
+    def get_page(url):
+        fetched.append(url)
+        if url == LEAGUE_URL:
+            return fbref_pages.league_stats_page()
+        return fbref_pages.goal_log_page(seed=len(fetched))
+
+    monkeypatch.setattr(fb_ref, "html_cache", None)
+    monkeypatch.setattr(fb_ref, "_get_page", get_page)
+    crawler = fb_ref.FbrefLeagueHomePageCrawler(LEAGUE_URL)
+    crawler.fetched = fetched
+    return crawler
+
+
+def _goal_log_keys():
+    return set(s3_utils.list_object_keys(fb_ref.GOAL_LOGS_BUCKET))
+
+
+def test_failing_squad_does_not_stop_the_others(crawler):
+    broken_squad, *squads = sorted(crawler.team_squad_links)
+    # its goal log key can't be built, so even the finalised check fails
+    del crawler.team_name_map[broken_squad.split("/")[-1].replace("-Stats", "")]
+
+    assert crawler.extract_and_load_all_teams_goal_logs(max_workers=2) == [broken_squad]
+    assert _goal_log_keys() == {crawler._get_goal_log_key(squad, crawler.season_code) for squad in squads}
+
+
+def test_finalised_goal_logs_are_skipped(crawler, s3):
+    finalised_squad = sorted(crawler.team_squad_links)[0]
+    s3.put_object(Bucket=fb_ref.GOAL_LOGS_BUCKET, Key=crawler._get_goal_log_key(finalised_squad, crawler.season_code),
+                  Body=b"", Metadata={fb_ref.GOAL_LOG_FINALISED_METADATA: "true"})
+    crawler.fetched.clear()
+
+    assert crawler.extract_and_load_all_teams_goal_logs(max_workers=2) == []
+    assert len(crawler.fetched) == len(crawler.team_squad_links) - 1
+    assert crawler._get_goal_log_url(finalised_squad, crawler.season_code) not in crawler.fetched
@@ -0,0 +1,63 @@
+from io import StringIO
+
+import pandas as pd
+import pytest
+
+from football_pipeline import html_tables
+from football_pipeline.expected_goals import fb_ref
+from tests import fbref_pages
+from tests.conftest import FIXTURES_DIR
+
+# tables pd.read_html and the targeted extraction must read identically
+EDGE_CASE_TABLES = {
+    "colspan_rowspan": """<table><thead><tr><th colspan="2">Match</th><th rowspan="2">Score</th></tr>
+        <tr><th>Home</th><th>Away</th></tr></thead>
+        <tbody><tr><td rowspan="2">Arsenal</td><td>Chelsea</td><td>2–1</td></tr>
+        <tr><td>Spurs</td><td colspan="1">0–0</td></tr></tbody></table>""",
+    "no_thead": """<table><tr><th>Rk</th><th>Squad</th><th>Attendance</th></tr>
+        <tr><td>1</td><td>Arsenal</td><td>60,123</td></tr><tr><td>2</td><td>Chelsea</td><td></td></tr></table>""",
+    "hidden_and_ragged": """<table><thead><tr><th>Player</th><th style="display: none">Id</th><th>Min</th>
+        <th>xG</th><th>xG</th></tr></thead><tbody>
+        <tr><td>Saka, Bukayo</td><td style="display:none">7</td><td>90</td><td>0.4</td><td>0.1</td></tr>
+        <tr><td>"Rice"\n  Declan</td><td style="display:none">8</td><td>45</td></tr></tbody>
+        <tfoot><tr><td>Total</td><td>135</td><td>1.5</td><td>0.3</td></tr></tfoot></table>""",
+    "empty_header_cells": """<table><thead><tr><th></th><th>Goals</th><th></th></tr></thead>
+        <tbody><tr><td>True</td><td>1</td><td>1.5</td></tr><tr><td>False</td><td>2</td><td>n/a</td></tr></tbody></table>""",
+}
+
+
+def _assert_read_like_pd_read_html(tables):
+    assert tables, "no tables selected"
+    expected = [pd.read_html(StringIO(html_tables.lxml.html.tostring(table, encoding="unicode")))[0]
+                for table in tables]
+    frames = html_tables.read_tables(tables)
+    assert len(frames) == len(expected)
+    for frame, expected_frame in zip(frames, expected):
+        pd.testing.assert_frame_equal(frame, expected_frame)
+
+
+@pytest.mark.parametrize("html, xpath", [
+    ((FIXTURES_DIR / "fbref_2023_mls_schedule.html").read_text(), fb_ref.SCHEDULE_TABLE_XPATH),
+    (fbref_pages.season_page(n_played=120, n_fixtures=30), fb_ref.SCHEDULE_TABLE_XPATH),
+    (fbref_pages.match_report(), fb_ref.LINEUP_TABLES_XPATH),
+    (fbref_pages.match_report(), "//table[starts-with(@id, 'stats_')]"),
+    (fbref_pages.goal_log_page(), fb_ref.GOALS_FOR_TABLE_XPATH),
+    (fbref_pages.goal_log_page(), fb_ref.GOALS_AGAINST_TABLE_XPATH),
+    (fbref_pages.league_stats_page(), "//table"),
+], ids=["mls_schedule_fixture", "season_page", "lineups", "match_stats", "goals_for", "goals_against",
+        "league_stats"])
+def test_fbref_tables_are_read_like_pd_read_html(html, xpath):
+    _assert_read_like_pd_read_html(html_tables.parse_html(html).xpath(xpath))
+
+
+@pytest.mark.parametrize("name", EDGE_CASE_TABLES)
+def test_edge_case_tables_are_read_like_pd_read_html(name):
+    _assert_read_like_pd_read_html(html_tables.parse_html(EDGE_CASE_TABLES[name]).xpath("//table"))
+
+
+def test_hidden_and_empty_tables_are_skipped():
+    doc = html_tables.parse_html('<table style="display: none"><tr><td>1</td></tr></table>'
+                                 '<table><tr><td> </td></tr></table>' + EDGE_CASE_TABLES["no_thead"])
+    frames = html_tables.read_tables(doc.xpath("//table"))
+    assert len(frames) == 1 and frames[0].columns.tolist() == ["Rk", "Squad", "Attendance"]
+    assert html_tables.read_first_table(doc, '//table[@id="missing"]') is None
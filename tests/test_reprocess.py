@@ -0,0 +1,73 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from football_pipeline import reprocess
+from football_pipeline.match_results import football_data_co_uk
+from tests.conftest import FIXTURES_DIR
+
+RAW_BUCKET = football_data_co_uk.RAW_FOOTBALL_DATA_CO_UK_BUCKET
+CLEAN_BUCKET = football_data_co_uk.CLEAN_FOOTBALL_DATA_CO_UK_BUCKET
+# keys S3 url encodes in its notifications
+FILE_KEYS = [
+    "country=England/league=E0/season=2023-2024/E0.csv",
+    "country=Germany/league=D1/season=2023-2024/Bayern+Munich.csv",
+    "country=England/league=E0/season=2023-2024/2023-2024 Premier League.csv",
+    "country=Spain/league=SP1/season=2023-2024/100% Alavés.csv",
+]
+
+
+class InProcessLambdaClient:
+    """Stands in for the boto3 Lambda client, running the job's handler in this process."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.invocations = 0
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        self.invocations += 1
+        response = self.handler(json.loads(Payload), None)
+        return {"StatusCode": 200, "Payload": io.BytesIO(json.dumps(response).encode("utf-8"))}
+
+
+@pytest.fixture
+def raw_files(s3):
+    s3.create_bucket(Bucket=RAW_BUCKET)
+    s3.create_bucket(Bucket=CLEAN_BUCKET)
+    body = (FIXTURES_DIR / "football_data_co_uk_E0.csv").read_bytes()
+    for file_key in FILE_KEYS:
+        s3.put_object(Bucket=RAW_BUCKET, Key=file_key, Body=body)
+    s3.put_object(Bucket=RAW_BUCKET, Key="country=England/league=E0/season=1999-2000/broken.csv", Body=b"not,a\nvalid")
+    return FILE_KEYS
+
+
+def _clean_keys(s3):
+    return sorted(obj["Key"] for obj in s3.list_objects_v2(Bucket=CLEAN_BUCKET).get("Contents", []))
+
+
+def _expected_clean_keys(file_keys):
+    return sorted(file_key[:-len(".csv")] + ".parquet" for file_key in file_keys)
+
+
+def test_reprocess_bucket_locally(s3, raw_files):
+    report = reprocess.reprocess_bucket("clean-football-data", max_workers=2, use_processes=False)
+
+    assert sorted(report["succeeded"]) == sorted(raw_files)
+    assert list(report["failed"]) == ["country=England/league=E0/season=1999-2000/broken.csv"]
+    assert _clean_keys(s3) == _expected_clean_keys(raw_files)
+    clean = pd.read_parquet(io.BytesIO(s3.get_object(Bucket=CLEAN_BUCKET, Key=_expected_clean_keys(raw_files)[0])["Body"].read()))
+    assert clean["HomeTeam"].tolist() == ["Burnley", "Arsenal", "Bournemouth", "Brighton"]
+
+
+def test_reprocess_bucket_through_lambda_decodes_keys_like_s3_notifications(s3, raw_files):
+    lambda_client = InProcessLambdaClient(football_data_co_uk.clean_footballdata_handler)
+
+    report = reprocess.reprocess_bucket("clean-football-data", prefix="country=", mode="lambda", batch_size=2,
+                                        max_workers=2, lambda_client=lambda_client)
+
+    assert lambda_client.invocations == 3
+    assert sorted(report["succeeded"]) == sorted(raw_files)
+    assert list(report["failed"]) == ["country=England/league=E0/season=1999-2000/broken.csv"]
+    assert _clean_keys(s3) == _expected_clean_keys(raw_files)
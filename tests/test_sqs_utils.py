@@ -0,0 +1,88 @@
+import boto3
+from botocore.exceptions import ClientError, EndpointConnectionError
+import pytest
+
+from football_pipeline import sqs_utils
+
+
+@pytest.fixture
+def queue_url(aws):
+    return boto3.client("sqs").create_queue(QueueName="lineups")["QueueUrl"]
+
+
+class FlakySqsClient:
+    """Wraps an SQS client, raising from the first `failures` send_message_batch calls."""
+
+    def __init__(self, sqs, failures, error):
+        self.sqs = sqs
+        self.failures = failures
+        self.error = error
+
+    def send_message_batch(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        return self.sqs.send_message_batch(**kwargs)
+
+
+def _received_bodies(queue_url):
+    sqs = boto3.client("sqs")
+    bodies = []
+    while True:
+        messages = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10).get("Messages", [])
+        if not messages:
+            return sorted(bodies)
+        bodies += [message["Body"] for message in messages]
+
+
+def test_messages_are_sent_in_batches(queue_url):
+    sent = []
+    with sqs_utils.BatchedQueueProducer(queue_url, on_sent=sent.extend) as producer:
+        for i in range(23):
+            producer.send(f"message {i:02d}", key=f"link {i:02d}")
+
+    assert producer.batch_calls == 3
+    assert producer.sent_count == 23 and producer.failed_keys == []
+    assert sorted(sent) == [f"link {i:02d}" for i in range(23)]
+    assert _received_bodies(queue_url) == [f"message {i:02d}" for i in range(23)]
+
+
+@pytest.mark.parametrize("error", [
+    ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "SendMessageBatch"),
+    EndpointConnectionError(endpoint_url="https://sqs.us-east-1.amazonaws.com"),
+])
+def test_batch_call_errors_are_retried(queue_url, error):
+    sqs = FlakySqsClient(boto3.client("sqs"), failures=2, error=error)
+    with sqs_utils.BatchedQueueProducer(queue_url, backoff_factor=0, sqs_client=sqs) as producer:
+        for i in range(5):
+            producer.send(f"message {i}", key=f"link {i}")
+
+    assert producer.sent_count == 5 and producer.failed_keys == []
+    assert producer.batch_calls == 3
+
+
+def test_messages_of_a_failing_batch_are_reported_not_dropped(queue_url):
+    error = ClientError({"Error": {"Code": "ServiceUnavailable", "Message": "down"}}, "SendMessageBatch")
+    sqs = FlakySqsClient(boto3.client("sqs"), failures=100, error=error)
+    sent = []
+    producer = sqs_utils.BatchedQueueProducer(queue_url, on_sent=sent.extend, max_retries=2, backoff_factor=0,
+                                              sqs_client=sqs)
+    for i in range(12):
+        producer.send(f"message {i}", key=f"link {i}")  # the 10th message's flush fails, without raising
+    producer.flush()
+
+    assert sent == [] and producer.sent_count == 0
+    assert sorted(producer.failed_keys) == sorted(f"link {i}" for i in range(12))
+    assert "link 11" not in producer  # nothing left waiting in the buffer
+
+
+def test_unexpected_errors_still_report_the_batch(queue_url):
+    def on_sent(keys):
+        raise RuntimeError("ledger unavailable")
+
+    producer = sqs_utils.BatchedQueueProducer(queue_url, on_sent=on_sent)
+    producer.send("message", key="link")
+    with pytest.raises(RuntimeError):
+        producer.flush()
+    # the message reached the queue, so it isn't reported as failed
+    assert producer.sent_count == 1 and producer.failed_keys == []
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from football_pipeline import team_names
+
+MAPPING = {
+    "Manchester City": "Man City",
+    "Manchester Utd": "Man United",
+    "Oxford United": "Oxford",
+    "Stoke City": "Stoke",
+    "Sheffield Utd": "Sheffield United",
+    "Nott'ham Forest": "Nott'm Forest",
+}
+
+
+@pytest.fixture
+def resolver():
+    return team_names.TeamNameResolver(MAPPING)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Manchester City", "Man City"),
+    ("Manchester Utd", "Man United"),
+    ("Manchester United", "Man United"),
+    ("Sheffield United", "Sheffield United"),
+    ("Nottham Forest", "Nott'm Forest"),
+    ("Man City", "Man City"),
+])
+def test_spelling_variations_resolve_silently(resolver, name, expected):
+    assert resolver.resolve_name(name) == expected
+    assert resolver.report_unresolved() == {"fuzzy_matches": {}, "unresolved": []}
+
+
+def test_names_only_matching_without_noise_words_are_reported(resolver):
+    assert resolver.resolve_name("Stoke City FC") == "Stoke"
+    assert resolver.report_unresolved()["fuzzy_matches"] == {"Stoke City FC": "Stoke"}
+
+
+def test_different_club_of_the_same_town_is_unresolved(resolver):
+    assert resolver.resolve_name("Oxford City") is None
+    assert resolver.report_unresolved() == {"fuzzy_matches": {}, "unresolved": ["Oxford City"]}
+
+
+def test_noise_words_shared_by_clubs_dont_resolve(resolver):
+    # 'manchester' is the key of both Manchester clubs once their noise words are dropped
+    assert resolver.resolve_name("Manchester") is None
+
+
+def test_resolve_column(resolver):
+    names = pd.Series(["Manchester City", "Oxford City", None, "Manchester City"])
+    resolved = resolver.resolve(names)
+    assert resolved[0] == resolved[3] == "Man City"
+    assert pd.isna(resolved[1]) and pd.isna(resolved[2])
+    assert resolver.report_unresolved(names=["Manchester City"]) == {"fuzzy_matches": {}, "unresolved": []}
+
+
+def test_seed_resolvers_keep_the_manchester_clubs_apart():
+    fb_ref_to_football_data = team_names.fb_ref_to_football_data()
+    assert fb_ref_to_football_data.resolve_name("Manchester City") == "Man City"
+    assert fb_ref_to_football_data.resolve_name("Manchester United") == "Man United"
+    assert team_names.football_data_to_fb_ref().resolve_name("Man United") == "Manchester Utd"
@@ -0,0 +1,51 @@
+import pytest
+
+from football_pipeline import s3_utils
+from football_pipeline.expected_goals import fb_ref
+from tests import fbref_pages
+
+SEASON_URL = "https://fbref.com/en/comps/9/2022-2023/schedule/2022-2023-Premier-League-Scores-and-Fixtures"
+DELTA_KEY = "2022-2023-Premier-League-Scores-and-Fixtures.csv.delta-20230101T000000000000Z.csv"
+CLEAN_DELTA_KEY = fb_ref._clean_xg_results_key("Premier-League", "2022-2023", DELTA_KEY)
+
+
+@pytest.fixture
+def buckets(s3):
+    for bucket_name in [fb_ref.XG_RESULTS_BUCKET, fb_ref.CLEAN_XG_RESULTS_BUCKET]:
+        s3.create_bucket(Bucket=bucket_name)
+    season = fb_ref.FBrefSeasonResultsPage(SEASON_URL, html=fbref_pages.season_page(n_played=4))
+    s3_utils.upload_df_to_s3(fb_ref.XG_RESULTS_BUCKET, DELTA_KEY, season.processed_xg_df)
+    return s3
+
+
+def _clean_keys():
+    return list(s3_utils.list_object_keys(fb_ref.CLEAN_XG_RESULTS_BUCKET))
+
+
+def test_delta_file_is_standardised(buckets):
+    fb_ref.standardise_xg_results_file(fb_ref.XG_RESULTS_BUCKET, DELTA_KEY)
+    assert _clean_keys() == [CLEAN_DELTA_KEY]
+
+
+def test_delta_file_merged_before_standardising_is_skipped(buckets):
+    buckets.delete_object(Bucket=fb_ref.XG_RESULTS_BUCKET, Key=DELTA_KEY)
+    fb_ref.standardise_xg_results_file(fb_ref.XG_RESULTS_BUCKET, DELTA_KEY)
+    assert _clean_keys() == []
+
+
+def test_delta_file_merged_while_standardising_leaves_no_orphan_parquet(buckets, monkeypatch):
+    put_object = fb_ref.s3.put_object
+
+    def merge_then_put_object(**kwargs):
+        # the full rewrite of the season deletes the delta file (and its parquet file, not written yet)
+        fb_ref._delete_xg_results_deltas("Premier-League", "2022-2023", [DELTA_KEY])
+        return put_object(**kwargs)
+
+    monkeypatch.setattr(fb_ref.s3, "put_object", merge_then_put_object)
+    fb_ref.standardise_xg_results_file(fb_ref.XG_RESULTS_BUCKET, DELTA_KEY)
+    assert _clean_keys() == []
+
+
+def test_missing_season_file_still_fails(buckets):
+    with pytest.raises(fb_ref.ClientError):
+        fb_ref.standardise_xg_results_file(fb_ref.XG_RESULTS_BUCKET, "2022-2023-Premier-League-Scores-and-Fixtures.csv")